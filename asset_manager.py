@@ -1,67 +1,92 @@
+import threading
 import pygame
+from perfilador import InformeArranque
 import settings as s
 
+# Recursos que se cargan en segundo plano: (tipo, nombre, ruta, volumen).
+MANIFIESTO = (
+    ('sonido', 'disparo', s.SOUND_SHOT, 0.4),
+    ('sonido', 'explosion', s.SOUND_EXPLOSION, 0.4),
+    ('sonido', 'motor', s.SOUND_ENGINE, 0.4),
+    ('sonido', 'golpe', s.SOUND_HIT, 0.4),
+    ('musica', 'musica', s.MUSIC_FILE, 0.3),
+)
+
 class AssetManager:
-    """Clase para cargar y gestionar todos los recursos del juego (sonidos, fuentes, etc.)."""
-    
-    def __init__(self):
-        """Inicializa el gestor de assets, preparando diccionarios para sonidos y fuentes."""
+    """
+    Clase para cargar y gestionar todos los recursos del juego (sonidos, fuentes, etc.).
+    Las fuentes se cargan al momento (hacen falta para el primer frame). El audio se carga según
+    el `MANIFIESTO`, en un hilo aparte si `en_segundo_plano`: cada sonido aparece en `sounds`
+    en cuanto está listo, así que el juego puede empezar sin esperar al mixer ni a la música.
+    """
+
+    def __init__(self, en_segundo_plano=False, informe=None, manifiesto=MANIFIESTO):
+        """Inicializa el gestor de assets y lanza la carga (en un hilo si `en_segundo_plano`)."""
         self.sounds = {}
         self.fonts = {}
         self.music_file = s.MUSIC_FILE  # Ruta al archivo de música de fondo.
-        self.load_all()
-
-    def load_all(self):
-        """Carga todos los recursos necesarios para el juego."""
-        self._load_sounds_and_music()
+        self.manifiesto = manifiesto
+        self.informe = informe if informe is not None else InformeArranque()
+        self.listo = threading.Event()  # Se activa al terminar la carga del audio
+        self._hilo = None
         self._load_fonts()
-        print("Todos los assets han sido cargados.")
+        self.informe.marcar('fuentes')
+        if en_segundo_plano:
+            self._hilo = threading.Thread(target=self._load_sounds_and_music, name="carga-assets", daemon=True)
+            self._hilo.start()
+        else:
+            self._load_sounds_and_music()
+            print("Todos los assets han sido cargados.")
+
+    def esperar(self, timeout=None):
+        """Espera a que termine la carga del audio. Devuelve True si ha terminado."""
+        return self.listo.wait(timeout)
 
     def _load_sounds_and_music(self):
-        """Inicializa el mixer, carga los efectos de sonido y la música."""
+        """
+        Inicializa el mixer y carga los efectos de sonido y la música del manifiesto.
+        Si un recurso falla se informa y se sigue con el resto: el juego suena con lo que se haya cargado.
+        """
         try:
-            # Inicializar el mixer de pygame
-            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-            
-            # Cargar efectos de sonido
-            self.sounds = {
-                'disparo': pygame.mixer.Sound(s.SOUND_SHOT),
-                'explosion': pygame.mixer.Sound(s.SOUND_EXPLOSION),
-                'motor': pygame.mixer.Sound(s.SOUND_ENGINE),
-                'golpe': pygame.mixer.Sound(s.SOUND_HIT)
-            }
-            # Ajustar volumen de los efectos
-            for sound in self.sounds.values():
-                sound.set_volume(0.4)
-            
-            # Cargar y reproducir la música de fondo en un bucle infinito (-1).
-            pygame.mixer.music.load(self.music_file)
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-            
-            print("Música y efectos de sonido cargados correctamente.")
-        except (pygame.error, FileNotFoundError) as e:
-            # Si hay un error (ej. no se encuentran los archivos), se informa en consola.
-            print(f"Error al cargar audio: {e}. El juego continuará sin sonido.")
-            # Se desactiva el mixer para evitar errores posteriores.
-            pygame.mixer.quit()
-            self.sounds = {}
+            try:
+                # Inicializar el mixer de pygame
+                pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+            except pygame.error as e:
+                print(f"Error al iniciar el mixer: {e}. El juego continuará sin sonido.")
+                return
+            self.informe.marcar('mixer')
+
+            errores = 0
+            for tipo, nombre, ruta, volumen in self.manifiesto:
+                try:
+                    if tipo == 'sonido':
+                        sonido = pygame.mixer.Sound(ruta)
+                        sonido.set_volume(volumen)
+                        self.sounds[nombre] = sonido  # Disponible para la simulación desde ya
+                    elif tipo == 'musica':
+                        # Cargar y reproducir la música de fondo en un bucle infinito (-1).
+                        pygame.mixer.music.load(ruta)
+                        pygame.mixer.music.set_volume(volumen)
+                        pygame.mixer.music.play(-1)
+                    self.informe.marcar(nombre)
+                except (pygame.error, FileNotFoundError) as e:
+                    # Si falta el archivo o no se puede leer, se informa y se salta solo este recurso.
+                    print(f"Error al cargar '{nombre}' ({e}): se continuará sin él.")
+                    errores += 1
+
+            if not errores:
+                print("Música y efectos de sonido cargados correctamente.")
+        finally:
+            self.informe.marcar('audio')
+            self.listo.set()
 
     def _load_fonts(self):
         """Carga todas las fuentes utilizadas en el juego."""
-        try:
-            # Carga fuentes de diferentes tamaños para la interfaz de usuario.
-            self.fonts = {
-                'grande': pygame.font.Font(None, 48),
-                'normal': pygame.font.Font(None, 36),
-                'pequena': pygame.font.Font(None, 24)
-            }
-            print("Fuentes cargadas correctamente.")
-        except pygame.error as e:
-            # Si las fuentes personalizadas fallan, Pygame usará su fuente por defecto.
-            print(f"No se pudieron cargar las fuentes: {e}. Usando fuentes por defecto.")
-            self.fonts = {
-                'grande': pygame.font.Font(None, 48),
-                'normal': pygame.font.Font(None, 36),
-                'pequena': pygame.font.Font(None, 24)
-            }
\ No newline at end of file
+        pygame.font.init()
+        # Carga fuentes de diferentes tamaños para la interfaz de usuario.
+        self.fonts = {
+            'grande': pygame.font.Font(None, 48),
+            'normal': pygame.font.Font(None, 36),
+            'pequena': pygame.font.Font(None, 24)
+        }
+        print("Fuentes cargadas correctamente.")
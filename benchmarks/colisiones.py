@@ -0,0 +1,78 @@
+"""
+Benchmark de colisiones contra obstáculos: búsqueda lineal vs. `RejillaEspacial`.
+
+Mide el tiempo por frame de las consultas que hace la simulación (2 tanques + N balas)
+al multiplicar el número de obstáculos. El área del mapa crece con el número de
+obstáculos para mantener la densidad del mapa original.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.colisiones [--balas 60] [--frames 300]
+"""
+import argparse
+import math
+import random
+import time
+import pygame
+from rejilla import RejillaEspacial
+import settings as s
+
+OBSTACULOS_BASE = s.NUM_ROCAS + s.NUM_ARBUSTOS + s.NUM_MUROS + s.NUM_CAJAS_MADERA
+
+
+class _Obstaculo:
+    """Obstáculo mínimo (solo `rect`) para el benchmark."""
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(x, y, 40, 40)
+
+
+def _crear_escenario(factor, num_balas, rng):
+    """Crea obstáculos, tanques y balas en un mapa `factor` veces más grande que la ventana."""
+    escala = math.sqrt(factor)
+    ancho, alto = int(s.ANCHO_VENTANA * escala), int(s.ALTO_VENTANA * escala)
+    obstaculos = [_Obstaculo(rng.randint(0, ancho - 40), rng.randint(0, alto - 40))
+                  for _ in range(OBSTACULOS_BASE * factor)]
+    tanques = [pygame.Rect(rng.randint(0, ancho - 30), rng.randint(0, alto - 30), 30, 30) for _ in range(2)]
+    balas = [pygame.Rect(rng.randint(0, ancho - 8), rng.randint(0, alto - 8), 8, 8) for _ in range(num_balas)]
+    return obstaculos, tanques + balas
+
+
+def _frame_lineal(obstaculos, consultas):
+    """Lo que hacía la simulación antes: revisar todos los obstáculos por cada consulta."""
+    for rect in consultas:
+        for obstaculo in obstaculos:
+            if rect.colliderect(obstaculo.rect):
+                break
+
+
+def _frame_rejilla(rejilla, consultas):
+    for rect in consultas:
+        rejilla.primera_colision(rect)
+
+
+def _medir(funcion, frames):
+    """Devuelve el tiempo medio por frame en milisegundos."""
+    inicio = time.perf_counter()
+    for _ in range(frames):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--balas", type=int, default=60, help="Balas vivas por frame")
+    parser.add_argument("--frames", type=int, default=300, help="Frames medidos por escenario")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    print(f"{'obstáculos':>11} {'lineal ms/frame':>16} {'rejilla ms/frame':>17}")
+    for factor in (1, 2, 5, 10):
+        obstaculos, consultas = _crear_escenario(factor, args.balas, rng)
+        rejilla = RejillaEspacial(obstaculos)
+        t_lineal = _medir(lambda: _frame_lineal(obstaculos, consultas), args.frames)
+        t_rejilla = _medir(lambda: _frame_rejilla(rejilla, consultas), args.frames)
+        print(f"{len(obstaculos):>11} {t_lineal:>16.3f} {t_rejilla:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
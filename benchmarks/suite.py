@@ -0,0 +1,297 @@
+"""
+Suite de benchmarks del juego con escenarios guionizados.
+
+Ejecuta el código real de `Juego`/`GameRenderer` con los drivers "dummy" de SDL (sin ventana
+ni audio) y mide, por escenario:
+  - percentiles (p50/p95/p99) del tiempo de actualización y de dibujado por frame
+    (mejor de varias pasadas),
+  - frames por segundo (actualización + dibujado),
+  - memoria: pico de memoria Python durante el escenario y bloques netos que quedan vivos.
+
+Los resultados se comparan con `benchmarks/baseline.json`; cualquier métrica de tiempo que
+empeore más que la tolerancia se marca como regresión y el proceso termina con código 1. También
+falla si un escenario no cabe en el presupuesto de un frame a 60 FPS (actualización + dibujado, p95).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.suite                       # ejecutar y comparar con la línea base
+    python -m benchmarks.suite --guardar-baseline    # ejecutar y guardar la nueva línea base
+    python -m benchmarks.suite --escenarios fuego_continuo --frames 300
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+import juego as modulo_juego
+from bot import ControladorBot
+from simulacion import Simulacion, EntradaTanque, SIN_ENTRADA
+import settings as s
+
+RUTA_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+METRICAS_TIEMPO = ("actualizar_p50", "actualizar_p95", "render_p50", "render_p95")
+
+
+# ---- ESCENARIOS ----
+# Cada escenario define `preparar(juego)` (antes de reiniciar la partida), `entradas(juego, frame)`
+# (entradas de los tanques en ese frame) y opcionalmente `por_frame(juego, frame)`.
+
+def _sin_entradas(juego, frame):
+    return [SIN_ENTRADA, SIN_ENTRADA]
+
+
+def _explosiones_al_maximo(juego, frame):
+    """Mantiene la lista de efectos llena a MAX_EFECTOS con explosiones repartidas por el mapa."""
+    sim = juego.simulacion
+    while len(sim.efectos) + 3 <= s.MAX_EFECTOS:
+        sim.crear_efecto_explosion(random.randint(50, s.ANCHO_VENTANA - 50),
+                                   random.randint(130, s.ALTO_VENTANA - 50))
+
+
+def _preparar_fuego_continuo(juego):
+    for tanque in juego.simulacion.tanques:
+        tanque.velocidad_disparo = 50  # Ráfaga: un disparo cada 50 ms por tanque
+
+
+def _entradas_fuego_continuo(juego, frame):
+    # Ambos tanques avanzan (y por tanto disparan) girando en círculos.
+    return [EntradaTanque(avanzar=True, izquierda=True), EntradaTanque(avanzar=True, derecha=True)]
+
+
+@contextlib.contextmanager
+def _obstaculos_x10(juego):
+    """Multiplica por 10 los NUM_* del mapa mientras dura el escenario (se colocan los que quepan)."""
+    nombres = ("NUM_ROCAS", "NUM_ARBUSTOS", "NUM_MUROS", "NUM_CAJAS_MADERA")
+    originales = {nombre: getattr(s, nombre) for nombre in nombres}
+    for nombre, valor in originales.items():
+        setattr(s, nombre, valor * 10)
+    try:
+        yield
+    finally:
+        for nombre, valor in originales.items():
+            setattr(s, nombre, valor)
+
+
+@contextlib.contextmanager
+def _arena_x16(juego):
+    """Partida en un mundo de 4×4 ventanas (con 16 veces más obstáculos) mientras dura el escenario."""
+    sim = juego.simulacion
+    original = sim.tamaño_mundo
+    sim.tamaño_mundo = (s.ANCHO_VENTANA * 4, s.ALTO_VENTANA * 4)
+    try:
+        yield
+    finally:
+        sim.tamaño_mundo = original
+
+
+def _todos_contra_todos(num_tanques):
+    """
+    Contexto de mapa de una partida de `num_tanques` en el mundo por defecto para ellos, como
+    `Juego(num_tanques=...)`: los tanques sin teclas en `CONTROLES` los lleva `ControladorBot`.
+    Los bots se crean con el mundo de la partida aún puesto, para que su mapa de navegación
+    (un observador de la simulación) se construya con ese tamaño.
+    """
+    @contextlib.contextmanager
+    def mapa(juego):
+        sim = juego.simulacion
+        originales = sim.num_tanques, sim.tamaño_mundo
+        sim.num_tanques, sim.tamaño_mundo = num_tanques, Simulacion.tamaño_para(num_tanques)
+        try:
+            yield
+            juego.bots = {i: ControladorBot(sim, i) for i in range(len(modulo_juego.CONTROLES), len(sim.tanques))}
+        finally:
+            sim.num_tanques, sim.tamaño_mundo = originales
+    return mapa
+
+
+def _entradas_bots(juego, frame):
+    # Como en `Juego.actualizar`: teclado (sin teclas pulsadas) y la decisión de cada bot, dentro del tiempo de actualización.
+    return juego.leer_entradas()
+
+
+ESCENARIOS = {
+    "arena_inactiva": dict(entradas=_sin_entradas),
+    "max_efectos": dict(entradas=_sin_entradas, por_frame=_explosiones_al_maximo),
+    "fuego_continuo": dict(preparar=_preparar_fuego_continuo, entradas=_entradas_fuego_continuo),
+    "mapa_obstaculos_x10": dict(entradas=_entradas_fuego_continuo, mapa=_obstaculos_x10),
+    # Mundo 16 veces mayor que la ventana: el coste debe depender de lo visible, no del mapa.
+    "arena_x16": dict(preparar=_preparar_fuego_continuo, entradas=_entradas_fuego_continuo, mapa=_arena_x16),
+    # Todos contra todos con bots: su coste por tick cuenta en la actualización.
+    "bots_32": dict(entradas=_entradas_bots, mapa=_todos_contra_todos(32)),
+    "bots_64": dict(entradas=_entradas_bots, mapa=_todos_contra_todos(64)),
+}
+
+
+# ---- EJECUCIÓN ----
+
+def _nueva_partida(juego, escenario, semilla):
+    """Reinicia la partida de forma reproducible con el mapa del escenario."""
+    random.seed(semilla)
+    contexto_mapa = escenario.get("mapa", lambda juego: contextlib.nullcontext())
+    # La generación de mapas densos avisa por consola si no caben todos los obstáculos.
+    with contexto_mapa(juego), contextlib.redirect_stdout(io.StringIO()):
+        juego.reiniciar_juego(semilla_mapa=semilla)
+    if "preparar" in escenario:
+        escenario["preparar"](juego)
+
+
+def _ejecutar_frames(juego, escenario, frames, tiempos=None):
+    dt = 1 / s.FPS
+    entradas = escenario["entradas"]
+    por_frame = escenario.get("por_frame")
+    for frame in range(frames):
+        if por_frame:
+            por_frame(juego, frame)
+        inicio = time.perf_counter()
+        juego.simulacion.zona_detalle = juego.renderer.camara.zona_activa()  # Como en `Juego.actualizar`
+        juego.simulacion.paso(entradas(juego, frame), dt)
+        medio = time.perf_counter()
+        juego.renderer.dibujar(juego)
+        fin = time.perf_counter()
+        if tiempos is not None:
+            tiempos.append((medio - inicio, fin - medio))
+
+
+def _pasada_tiempos(juego, escenario, frames, semilla):
+    """Una pasada cronometrada: devuelve (percentiles de actualización, de dibujado, segundos totales)."""
+    _nueva_partida(juego, escenario, semilla)
+    _ejecutar_frames(juego, escenario, min(30, frames))  # Calentamiento (cachés, sprites)
+    tiempos = []
+    inicio = time.perf_counter()
+    _ejecutar_frames(juego, escenario, frames, tiempos)
+    total = time.perf_counter() - inicio
+    ms = np.array(tiempos) * 1000
+    return np.percentile(ms[:, 0], (50, 95, 99)), np.percentile(ms[:, 1], (50, 95, 99)), total
+
+
+def medir_escenario(juego, nombre, frames, semilla, repeticiones=3):
+    """
+    Ejecuta un escenario y devuelve sus métricas. Los tiempos se repiten `repeticiones` veces
+    y se queda el mínimo de cada percentil, que es lo menos sensible a la carga de la máquina.
+    """
+    escenario = ESCENARIOS[nombre]
+
+    # Pasadas de tiempos
+    pasadas = [_pasada_tiempos(juego, escenario, frames, semilla) for _ in range(repeticiones)]
+    p_actualizar = np.min([pasada[0] for pasada in pasadas], axis=0)
+    p_render = np.min([pasada[1] for pasada in pasadas], axis=0)
+    total = min(pasada[2] for pasada in pasadas)
+
+    # Pasada de memoria (tracemalloc ralentiza mucho: no se mezcla con la de tiempos)
+    _nueva_partida(juego, escenario, semilla)
+    _ejecutar_frames(juego, escenario, min(30, frames))
+    bloques_antes = sys.getallocatedblocks()
+    tracemalloc.start()
+    _ejecutar_frames(juego, escenario, min(frames, 120))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bloques_netos = sys.getallocatedblocks() - bloques_antes
+
+    return {
+        "actualizar_p50": round(float(p_actualizar[0]), 4),
+        "actualizar_p95": round(float(p_actualizar[1]), 4),
+        "actualizar_p99": round(float(p_actualizar[2]), 4),
+        "render_p50": round(float(p_render[0]), 4),
+        "render_p95": round(float(p_render[1]), 4),
+        "render_p99": round(float(p_render[2]), 4),
+        "frames_por_segundo": round(frames / total, 1),
+        "memoria_pico_kb": round(pico / 1024, 1),
+        "bloques_netos": bloques_netos,
+    }
+
+
+def comparar(resultados, baseline, tolerancia, margen_ms):
+    """
+    Devuelve la lista de regresiones (escenario, métrica, valor, referencia).
+    Una métrica empeora si supera la referencia en más de `tolerancia` (relativa) y de `margen_ms`
+    (absoluto), para no marcar como regresión el ruido de tiempos de pocos microsegundos.
+    """
+    regresiones = []
+    for nombre, metricas in resultados.items():
+        referencia = baseline.get(nombre, {})
+        for metrica in METRICAS_TIEMPO:
+            if metrica not in referencia:
+                continue
+            valor, base = metricas[metrica], referencia[metrica]
+            if valor > base * (1 + tolerancia) and valor - base > margen_ms:
+                regresiones.append((nombre, metrica, valor, base))
+    return regresiones
+
+
+def fuera_de_presupuesto(resultados, presupuesto_ms):
+    """Devuelve [(escenario, ms)] de los escenarios cuyo p95 de actualización + dibujado supera `presupuesto_ms`."""
+    excesos = []
+    for nombre, metricas in resultados.items():
+        total = metricas["actualizar_p95"] + metricas["render_p95"]
+        if total > presupuesto_ms:
+            excesos.append((nombre, total))
+    return excesos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escenarios", nargs="+", choices=sorted(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--frames", type=int, default=600, help="Frames medidos por escenario")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Pasadas por escenario (se usa la mejor)")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--baseline", default=RUTA_BASELINE)
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Empeoramiento relativo permitido antes de marcar regresión (0.25 = 25%%)")
+    parser.add_argument("--margen-ms", type=float, default=0.25,
+                        help="Empeoramiento absoluto mínimo (ms) para marcar regresión (evita el ruido "
+                             "de los p95 de menos de 1 ms)")
+    parser.add_argument("--presupuesto-ms", type=float, default=1000 / s.FPS,
+                        help="Tiempo máximo por frame (p95 de actualización + dibujado) de cada escenario")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--salida", help="Guardar también los resultados en este JSON")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        juego = modulo_juego.Juego()
+        juego.assets.esperar()  # Medir siempre con el audio ya cargado
+
+    resultados = {}
+    print(f"{'escenario':<22}{'act p50':>9}{'act p95':>9}{'ren p50':>9}{'ren p95':>9}{'fps':>9}{'pico KB':>10}")
+    for nombre in args.escenarios:
+        m = resultados[nombre] = medir_escenario(juego, nombre, args.frames, args.semilla, args.repeticiones)
+        print(f"{nombre:<22}{m['actualizar_p50']:>9.3f}{m['actualizar_p95']:>9.3f}"
+              f"{m['render_p50']:>9.3f}{m['render_p95']:>9.3f}{m['frames_por_segundo']:>9.0f}{m['memoria_pico_kb']:>10.1f}")
+    print("(tiempos en ms por frame)")
+
+    if args.salida:
+        with open(args.salida, "w") as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    excesos = fuera_de_presupuesto(resultados, args.presupuesto_ms)
+    for nombre, total in excesos:
+        print(f"PRESUPUESTO {nombre}: {total:.3f} ms por frame (p95) > {args.presupuesto_ms:.3f} ms")
+
+    if args.guardar_baseline:
+        with open(args.baseline, "w") as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return 1 if excesos else 0
+
+    if not os.path.exists(args.baseline):
+        print("No hay línea base; ejecuta con --guardar-baseline para crearla.")
+        return 1 if excesos else 0
+    with open(args.baseline) as archivo:
+        baseline = json.load(archivo)
+    regresiones = comparar(resultados, baseline, args.tolerancia, args.margen_ms)
+    for nombre, metrica, valor, referencia in regresiones:
+        print(f"REGRESIÓN {nombre}.{metrica}: {valor:.3f} ms (línea base {referencia:.3f} ms, +{(valor / referencia - 1) * 100:.0f}%)")
+    if not regresiones:
+        print(f"Sin regresiones respecto a la línea base (tolerancia {args.tolerancia:.0%}).")
+    return 1 if regresiones or excesos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
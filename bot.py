@@ -0,0 +1,339 @@
+"""
+Tanques controlados por el ordenador.
+
+`MapaNavegacion` divide el mundo en celdas de `TAM_CELDA_NAV` píxeles y marca las que el centro
+de un tanque no puede ocupar (obstáculos ensanchados medio tanque, bordes y franja de la
+interfaz). Sobre esa rejilla calcula campos de distancias (BFS) hacia una celda objetivo y
+los guarda por celda, compartidos por todos los bots. Cuando un obstáculo se destruye, la
+rejilla se actualiza al momento y cada campo guardado se corrige, solo alrededor de las celdas
+liberadas, la próxima vez que se usa. Cada tick se expanden como mucho `MAX_CELDAS_BFS_POR_TICK`
+celdas entre todos los cálculos (campos nuevos o correcciones): un campo grande se termina en
+varios ticks y, mientras tanto, los bots siguen con su campo anterior, que sigue siendo válido
+aunque no aproveche los huecos nuevos.
+
+`ControladorBot` devuelve en cada tick la `EntradaTanque` de un tanque, la misma interfaz que
+el teclado: baja por el campo de distancias hacia el enemigo más cercano y, cuando lo tiene a
+tiro y solo lo tapan obstáculos destructibles (ver `vision.py`), gira hacia él y avanza
+(avanzar dispara), abriéndose paso a tiros si hace falta. Qué enemigo es el más cercano y si
+está a la vista se revisa uno de cada `TICKS_DECISION_BOT` ticks, escalonado por índice para
+que cada tick solo revise una parte de los bots; entre revisiones se reutiliza lo último.
+"""
+import math
+from collections import deque
+import numpy as np
+from simulacion import EntradaTanque, SIN_ENTRADA
+from vision import Vision
+import settings as s
+
+INALCANZABLE = 1 << 30
+
+
+class MapaNavegacion:
+    """
+    Rejilla de navegación y campos de distancias de una `Simulacion`.
+    Se registra como observador: se reconstruye con cada mapa y se parchea al destruirse un obstáculo.
+    """
+    # Ensanchado de los obstáculos: medio tanque (15 px) más un pequeño margen.
+    MARGEN = 18
+
+    def __init__(self, simulacion, tam_celda=None, max_campos=None, max_celdas_por_tick=None):
+        self.tam_celda = s.TAM_CELDA_NAV if tam_celda is None else tam_celda
+        self.max_campos = s.MAX_CAMPOS_NAV if max_campos is None else max_campos
+        self.max_celdas_por_tick = s.MAX_CELDAS_BFS_POR_TICK if max_celdas_por_tick is None else max_celdas_por_tick
+        self.campos = {}  # celda objetivo -> lista de distancias (en orden de uso)
+        self.en_curso = {}  # celda objetivo -> (distancias, cola) de un BFS a medias (en orden de petición)
+        self.pendientes = {}  # celda objetivo -> celdas liberadas que su campo aún no tiene en cuenta
+        self.relajando = {}  # celda objetivo -> cola de una corrección a medias de su campo
+        self.campos_calculados = 0  # BFS completos hechos (útil para perfilar)
+        self._tick_cupo = None  # Tick del cupo en curso y celdas que quedan por expandir en él
+        self._cupo = 0
+        simulacion.agregar_observador(self)
+
+    @classmethod
+    def de(cls, simulacion):
+        """Devuelve el mapa de navegación registrado en la simulación, creándolo si no existe."""
+        for observador in simulacion.observadores:
+            if isinstance(observador, cls):
+                return observador
+        return cls(simulacion)
+
+    # ---- OBSERVADOR DE LA SIMULACIÓN ----
+
+    def mapa_creado(self, simulacion):
+        """Construye la rejilla: cuántos obstáculos bloquean cada celda (0 = libre)."""
+        t = self.tam_celda
+        ancho, alto = simulacion.tamaño_mundo
+        # Una fila/columna bloqueada alrededor evita comprobar los bordes al recorrer vecinos.
+        self.columnas = math.ceil(ancho / t) + 2
+        self.filas = math.ceil(alto / t) + 2
+        self.bloqueos = np.zeros((self.filas, self.columnas), dtype=np.int32)
+        # Bordes del mundo y franja de la interfaz (el centro del tanque no puede estar a menos de 15 px).
+        centros_x = (np.arange(self.columnas) - 1) * t + t / 2
+        centros_y = (np.arange(self.filas) - 1) * t + t / 2
+        fuera_x = (centros_x < 15) | (centros_x > ancho - 16)
+        fuera_y = (centros_y < 80 + 15) | (centros_y > alto - 16)
+        self.bloqueos[fuera_y, :] += 1
+        self.bloqueos[:, fuera_x] += 1
+        for obstaculo in simulacion.obstaculos:
+            self._marcar(obstaculo, 1)
+        self.libre = (self.bloqueos == 0).ravel().tolist()
+        self.campos.clear()
+        self.en_curso.clear()
+        self.pendientes.clear()
+        self.relajando.clear()
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        """Al destruirse un obstáculo se liberan sus celdas; los campos guardados se corregirán al usarse."""
+        if not destruido:
+            return
+        filas, columnas = self._celdas(obstaculo)
+        self.bloqueos[filas, columnas] -= 1
+        liberadas = [f * self.columnas + c
+                     for f in range(filas.start, filas.stop) for c in range(columnas.start, columnas.stop)
+                     if self.bloqueos[f, c] == 0 and not self.libre[f * self.columnas + c]]
+        for celda in liberadas:
+            self.libre[celda] = True
+        if liberadas:
+            for objetivo in (*self.campos, *self.en_curso):
+                self.pendientes.setdefault(objetivo, []).extend(liberadas)
+
+    # ---- REJILLA ----
+
+    def _celdas(self, obstaculo):
+        """Slices de filas y columnas cuyos centros caen en el obstáculo ensanchado."""
+        t = self.tam_celda
+        rect = obstaculo.rect.inflate(self.MARGEN * 2, self.MARGEN * 2)
+        # Centro de la celda (columna c) = (c - 1) * t + t / 2
+        c0 = max(0, math.ceil((rect.left - t / 2) / t) + 1)
+        c1 = min(self.columnas, math.floor((rect.right - 1 - t / 2) / t) + 2)
+        f0 = max(0, math.ceil((rect.top - t / 2) / t) + 1)
+        f1 = min(self.filas, math.floor((rect.bottom - 1 - t / 2) / t) + 2)
+        return slice(f0, max(f0, f1)), slice(c0, max(c0, c1))
+
+    def _marcar(self, obstaculo, cantidad):
+        filas, columnas = self._celdas(obstaculo)
+        self.bloqueos[filas, columnas] += cantidad
+
+    def celda(self, x, y):
+        """Índice (plano) de la celda que contiene el punto (x, y) del mundo."""
+        columna = min(self.columnas - 1, max(0, int(x // self.tam_celda) + 1))
+        fila = min(self.filas - 1, max(0, int(y // self.tam_celda) + 1))
+        return fila * self.columnas + columna
+
+    def centro(self, celda):
+        """Centro en el mundo de una celda."""
+        fila, columna = divmod(celda, self.columnas)
+        return ((columna - 1) * self.tam_celda + self.tam_celda / 2,
+                (fila - 1) * self.tam_celda + self.tam_celda / 2)
+
+    def vecinos(self, celda):
+        c = self.columnas
+        return (celda - 1, celda + 1, celda - c, celda + c)
+
+    # ---- CAMPOS DE DISTANCIAS ----
+
+    def _cupo_de(self, tick):
+        """Celdas que aún se pueden expandir en el tick `tick` (sin tick, sin límite)."""
+        if tick is None:
+            return INALCANZABLE
+        if tick != self._tick_cupo:
+            self._tick_cupo, self._cupo = tick, self.max_celdas_por_tick
+        return self._cupo
+
+    def _gastar(self, tick, celdas):
+        if tick is not None:
+            self._cupo -= celdas
+
+    def campo_hacia(self, objetivo, tick=None):
+        """
+        Distancias (en celdas) de cada celda a la celda `objetivo`. Se calcula una vez y se guarda.
+        Con `tick` se respeta el cupo de celdas de ese tick: un campo nuevo se va calculando a
+        trozos en los ticks en que se pida (devuelve None hasta terminarlo) y uno con celdas
+        liberadas pendientes se corrige también a trozos (mientras, se devuelve a medio corregir:
+        sus distancias son las de caminos reales, aunque no siempre los más cortos).
+        """
+        campo = self.campos.pop(objetivo, None)
+        if campo is not None:
+            cupo = self._cupo_de(tick)
+            if cupo > 0 and (objetivo in self.pendientes or objetivo in self.relajando):
+                cola = self.relajando.pop(objetivo, None) or deque()
+                self._sembrar(campo, self.pendientes.pop(objetivo, ()), cola)
+                self._gastar(tick, self._propagar(campo, cola, cupo))
+                if cola:
+                    self.relajando[objetivo] = cola
+            self.campos[objetivo] = campo
+            return campo
+
+        cupo = self._cupo_de(tick)
+        if cupo <= 0:
+            return None
+        campo, cola = self.en_curso.pop(objetivo, None) or self._empezar_bfs(objetivo)
+        self._gastar(tick, self._propagar(campo, cola, cupo))
+        if cola:
+            # Sin terminar: se sigue desde aquí la próxima vez que se pida.
+            self.en_curso[objetivo] = (campo, cola)
+            if len(self.en_curso) > self.max_campos:
+                descartado = next(iter(self.en_curso))  # El pedido hace más tiempo
+                del self.en_curso[descartado]
+                self.pendientes.pop(descartado, None)
+            return None
+        self.campos_calculados += 1
+        if len(self.campos) >= self.max_campos:
+            descartado = next(iter(self.campos))  # El usado hace más tiempo
+            del self.campos[descartado]
+            self.pendientes.pop(descartado, None)
+            self.relajando.pop(descartado, None)
+        self.campos[objetivo] = campo
+        return campo
+
+    def _empezar_bfs(self, objetivo):
+        campo = [INALCANZABLE] * len(self.libre)
+        campo[objetivo] = 0
+        return campo, deque([objetivo])
+
+    def _propagar(self, campo, cola, limite=INALCANZABLE):
+        """Expande como mucho `limite` celdas de la cola del BFS. Devuelve cuántas ha expandido."""
+        libre = self.libre
+        c = self.columnas
+        expandidas = 0
+        while cola and expandidas < limite:
+            celda = cola.popleft()
+            expandidas += 1
+            siguiente = campo[celda] + 1
+            for vecino in (celda - 1, celda + 1, celda - c, celda + c):
+                if libre[vecino] and campo[vecino] > siguiente:
+                    campo[vecino] = siguiente
+                    cola.append(vecino)
+        return expandidas
+
+    def _sembrar(self, campo, liberadas, cola):
+        """
+        Empieza a corregir un campo tras liberar celdas. Solo pueden bajar distancias, así que basta
+        con propagar (`_propagar`) desde las celdas liberadas que mejoran mientras la distancia mejore.
+        """
+        c = self.columnas
+        for celda in liberadas:
+            mejor = min(campo[v] for v in (celda - 1, celda + 1, celda - c, celda + c)) + 1
+            if mejor < campo[celda]:
+                campo[celda] = mejor
+                cola.append(celda)
+
+
+def _diferencia_angulo(objetivo, actual):
+    """Diferencia de ángulos normalizada a (-pi, pi]."""
+    return (objetivo - actual + math.pi) % math.tau - math.pi
+
+
+class ControladorBot:
+    """
+    Decide cada tick la `EntradaTanque` del tanque `indice` de la simulación.
+    Se refiere al tanque por su índice, así que sigue funcionando tras `reiniciar`.
+    """
+    ALCANCE = 300  # Distancia (px) a la que empieza a disparar si ve al enemigo
+    PASOS_ADELANTE = 3  # Celdas que mira por delante en el camino para suavizar los giros
+    TOLERANCIA_GIRO = 0.1  # Radianes (una rotación del tanque por tick)
+
+    def __init__(self, simulacion, indice, navegacion=None, vision=None, ticks_decision=None):
+        self.simulacion = simulacion
+        self.indice = indice
+        self.navegacion = navegacion if navegacion is not None else MapaNavegacion.de(simulacion)
+        self.vision = vision if vision is not None else Vision.de(simulacion)
+        self.ticks_decision = s.TICKS_DECISION_BOT if ticks_decision is None else ticks_decision
+        self._enemigo_actual = None
+        self._a_la_vista = False  # Última línea de tiro calculada hacia `_enemigo_actual`
+        self._campo_objetivo = None  # Celda a la que apunta el campo en uso
+        self._posicion_anterior = None
+        self._ticks_atascado = 0
+        self._maniobra = 0  # Ticks que quedan girando para salir de un atasco
+
+    def _enemigo(self, tanque):
+        rivales = [t for t in self.simulacion.tanques if t is not tanque and t.vidas > 0]
+        if not rivales:
+            return None
+        return min(rivales, key=lambda t: (t.x - tanque.x) ** 2 + (t.y - tanque.y) ** 2)
+
+    def _punto_de_paso(self, celda, objetivo):
+        """Punto hacia el que ir: unas celdas más adelante bajando por el campo de distancias."""
+        nav = self.navegacion
+        tick = self.simulacion.ticks
+        campo = None
+        # Con el enemigo a más de 2 celdas de la celda del campo, se pide uno nuevo (compartido entre bots).
+        if (self._campo_objetivo is None or
+                self._distancia_celdas(self._campo_objetivo, objetivo) > 2):
+            campo = nav.campo_hacia(objetivo, tick)
+            if campo is not None:
+                self._campo_objetivo = objetivo
+        if campo is None and self._campo_objetivo is not None:
+            # Sin cupo para el campo nuevo: de momento, el anterior.
+            campo = nav.campo_hacia(self._campo_objetivo, tick)
+        if campo is None:
+            return None
+        for _ in range(self.PASOS_ADELANTE):
+            mejor = min(nav.vecinos(celda), key=campo.__getitem__)
+            if campo[mejor] >= campo[celda] and nav.libre[celda]:
+                break
+            if campo[mejor] >= INALCANZABLE:
+                return None
+            celda = mejor
+        return nav.centro(celda)
+
+    def _distancia_celdas(self, a, b):
+        fa, ca = divmod(a, self.navegacion.columnas)
+        fb, cb = divmod(b, self.navegacion.columnas)
+        return max(abs(fa - fb), abs(ca - cb))
+
+    def __call__(self):
+        """Entrada del tanque para este tick."""
+        sim = self.simulacion
+        if self.indice >= len(sim.tanques):
+            return SIN_ENTRADA
+        tanque = sim.tanques[self.indice]
+        if tanque.vidas <= 0:
+            self._enemigo_actual = None
+            return SIN_ENTRADA
+        revisar = (sim.ticks + self.indice) % self.ticks_decision == 0
+        enemigo = self._enemigo_actual
+        if revisar or enemigo is None or enemigo.vidas <= 0 or enemigo not in sim.tanques:
+            enemigo = self._enemigo(tanque)
+            if enemigo is not self._enemigo_actual:
+                self._enemigo_actual, self._a_la_vista, revisar = enemigo, False, True
+        if enemigo is None:
+            return SIN_ENTRADA
+
+        # Salir de un atasco: girar unos ticks avanzando.
+        if self._maniobra > 0:
+            self._maniobra -= 1
+            return EntradaTanque(avanzar=self._maniobra % 4 == 0, derecha=True)
+
+        x, y = tanque.rect.center
+        ex, ey = enemigo.rect.center
+        distancia2 = (ex - x) ** 2 + (ey - y) ** 2
+        if distancia2 >= self.ALCANCE ** 2:
+            self._a_la_vista = False
+        elif revisar:
+            self._a_la_vista = self.vision.a_la_vista((x, y), (ex, ey), radio=4, atravesar_destructibles=True)
+        if self._a_la_vista:
+            # A tiro (como mucho tras obstáculos que se pueden romper): encararlo y disparar cuando esté alineado.
+            diferencia = _diferencia_angulo(math.atan2(ey - y, ex - x), tanque.angulo)
+            avanzar = abs(diferencia) < 0.15
+        else:
+            nav = self.navegacion
+            punto = self._punto_de_paso(nav.celda(x, y), nav.celda(ex, ey))
+            if punto is None:
+                return EntradaTanque(derecha=True)  # Enemigo inalcanzable (o campo pendiente): vigilar girando
+            diferencia = _diferencia_angulo(math.atan2(punto[1] - y, punto[0] - x), tanque.angulo)
+            avanzar = abs(diferencia) < 0.8
+
+        # Detección de atascos: avanzando pero sin moverse.
+        if avanzar and self._posicion_anterior == (tanque.x, tanque.y):
+            self._ticks_atascado += 1
+            if self._ticks_atascado > 15:
+                self._ticks_atascado = 0
+                self._maniobra = 12
+        else:
+            self._ticks_atascado = 0
+        self._posicion_anterior = (tanque.x, tanque.y)
+
+        return EntradaTanque(avanzar=avanzar,
+                             izquierda=diferencia < -self.TOLERANCIA_GIRO,
+                             derecha=diferencia > self.TOLERANCIA_GIRO)
@@ -0,0 +1,82 @@
+import pygame
+import settings as s
+
+
+class Camara:
+    """
+    Parte del mundo que se ve en la zona de juego de la pantalla.
+    `rect` está en coordenadas del mundo y `vista` en coordenadas de pantalla (mismo tamaño).
+    Sigue al punto medio de los tanques vivos y nunca se sale de los límites del mundo; la
+    franja superior del mundo (bajo la interfaz) nunca se muestra, igual que en la arena clásica.
+    """
+    def __init__(self, vista, tamaño_mundo=(s.ANCHO_MUNDO, s.ALTO_MUNDO), suavizado=s.SUAVIZADO_CAMARA):
+        self.vista = pygame.Rect(vista)
+        self.rect = pygame.Rect(0, self.vista.y, self.vista.width, self.vista.height)
+        self.suavizado = suavizado
+        self.tamaño_mundo = tamaño_mundo
+        # Esquina superior izquierda con decimales, para que el suavizado no se atasque al redondear.
+        self._x = float(self.rect.x)
+        self._y = float(self.rect.y)
+
+    @property
+    def desplazamiento(self):
+        """(dx, dy) que hay que sumar a una posición del mundo para obtener su posición en pantalla."""
+        return self.vista.x - self.rect.x, self.vista.y - self.rect.y
+
+    def a_pantalla(self, rect):
+        """Convierte un Rect del mundo a coordenadas de pantalla."""
+        return rect.move(self.desplazamiento)
+
+    def ajustar_mundo(self, tamaño_mundo):
+        """Cambia el tamaño del mundo (mapa nuevo) y recoloca la cámara dentro de él."""
+        self.tamaño_mundo = tamaño_mundo
+        self._mover_a(self._x, self._y)
+
+    def _limitar(self, x, y):
+        ancho, alto = self.tamaño_mundo
+        x = min(max(x, 0), max(0, ancho - self.rect.width))
+        y = min(max(y, self.vista.y), max(self.vista.y, alto - self.rect.height))
+        return x, y
+
+    def _mover_a(self, x, y):
+        """Coloca la esquina de la cámara en (x, y). Devuelve True si el Rect visible ha cambiado."""
+        self._x, self._y = self._limitar(x, y)
+        anterior = self.rect.topleft
+        self.rect.topleft = (round(self._x), round(self._y))
+        return self.rect.topleft != anterior
+
+    def _objetivo(self, tanques):
+        """Esquina de la cámara que centra el punto medio de los tanques vivos."""
+        vivos = [t for t in tanques if t.vidas > 0] or tanques
+        centro_x = sum(t.rect.centerx for t in vivos) / len(vivos)
+        centro_y = sum(t.rect.centery for t in vivos) / len(vivos)
+        return centro_x - self.rect.width / 2, centro_y - self.rect.height / 2
+
+    def centrar(self, tanques):
+        """Centra la cámara de golpe en los tanques (al empezar una partida)."""
+        return self._mover_a(*self._objetivo(tanques))
+
+    def seguir(self, tanques, dt=None):
+        """
+        Acerca la cámara a los tanques de forma suave. Devuelve True si se ha movido.
+        `suavizado` es la fracción recorrida en 1/60 s; con otro `dt` se ajusta para que la
+        cámara vaya igual de rápida a cualquier frecuencia de dibujado (sin `dt`, 1 / `settings.FPS`).
+        """
+        if dt is None:
+            dt = 1 / s.FPS
+        objetivo_x, objetivo_y = self._limitar(*self._objetivo(tanques))
+        fraccion = 1 - (1 - self.suavizado) ** (dt * 60)
+        return self._mover_a(self._x + (objetivo_x - self._x) * fraccion,
+                             self._y + (objetivo_y - self._y) * fraccion)
+
+    def zona_activa(self, tam_chunk=s.TAM_CHUNK):
+        """
+        Rect del mundo, alineado a trozos de `tam_chunk`, que cubre lo visible más un trozo
+        alrededor. Fuera de él la simulación no genera efectos visuales.
+        """
+        col0 = self.rect.left // tam_chunk - 1
+        fila0 = self.rect.top // tam_chunk - 1
+        col1 = (self.rect.right - 1) // tam_chunk + 1
+        fila1 = (self.rect.bottom - 1) // tam_chunk + 1
+        return pygame.Rect(col0 * tam_chunk, fila0 * tam_chunk,
+                           (col1 - col0 + 1) * tam_chunk, (fila1 - fila0 + 1) * tam_chunk)
@@ -0,0 +1,156 @@
+import pygame
+from entidades import Roca, Arbusto, Muro, CajaMadera
+import settings as s
+
+
+def dibujar_obstaculo(superficie, obstaculo, origen=(0, 0)):
+    """
+    Dibuja un obstáculo según su tipo (Roca, Arbusto, etc.).
+    `origen` es la posición del mundo que corresponde a la esquina (0, 0) de la superficie.
+    """
+    x = obstaculo.x - origen[0]
+    y = obstaculo.y - origen[1]
+    rect = obstaculo.rect.move(-origen[0], -origen[1])
+    if isinstance(obstaculo, Arbusto):
+        pygame.draw.rect(superficie, s.MARRON, (x + 15, y + 30, 10, 10))
+        color_verde = s.VERDE_OSCURO if obstaculo.salud == obstaculo.salud_max else s.VERDE_CLARO
+        pygame.draw.circle(superficie, color_verde, (x + 8, y + 8), 12)
+        pygame.draw.circle(superficie, color_verde, (x + 32, y + 12), 14)
+        pygame.draw.circle(superficie, color_verde, (x + 20, y + 25), 10)
+        pygame.draw.circle(superficie, color_verde, (x + 12, y + 20), 8)
+        pygame.draw.circle(superficie, color_verde, (x + 28, y + 28), 9)
+        if obstaculo.salud < obstaculo.salud_max:
+            pygame.draw.circle(superficie, s.ROJO, (x + 20, y + 20), 3)
+    elif isinstance(obstaculo, Roca):
+        pygame.draw.rect(superficie, s.GRIS, rect)
+        pygame.draw.rect(superficie, s.GRIS_CLARO, (x + 2, y + 2, obstaculo.ancho - 4, obstaculo.alto - 4))
+        pygame.draw.polygon(superficie, (80, 80, 80), 
+                          [(x + 5, y + 35), (x + 15, y + 5),
+                           (x + 35, y + 10), (x + 30, y + 35)])
+        pygame.draw.polygon(superficie, (60, 60, 60), 
+                          [(x + 10, y + 30), (x + 20, y + 15),
+                           (x + 30, y + 20), (x + 25, y + 32)])
+        pygame.draw.line(superficie, (40, 40, 40), (x, y + 35), (x + 40, y + 35), 2)
+    elif isinstance(obstaculo, Muro):
+        pygame.draw.rect(superficie, s.MARRON_LADRILLO, rect)
+        for fila in range(4):
+            for col in range(4):
+                color_ladrillo = (139, 69, 19) if (fila + col) % 2 == 0 else (160, 82, 45)
+                ladrillo_rect = pygame.Rect(x + col * 10, y + fila * 10, 10, 10)
+                pygame.draw.rect(superficie, color_ladrillo, ladrillo_rect)
+                pygame.draw.rect(superficie, (50, 50, 50), ladrillo_rect, 1)
+    elif isinstance(obstaculo, CajaMadera):
+        # Dibujar caja de madera
+        pygame.draw.rect(superficie, s.MARRON_CAJA, rect)
+        pygame.draw.rect(superficie, s.MARRON_CAJA_OSCURO, rect, 3)
+        # Líneas para simular tablas
+        pygame.draw.line(superficie, s.MARRON_CAJA_OSCURO, (x, y + 20), (x + 40, y + 20), 2)
+        pygame.draw.line(superficie, s.MARRON_CAJA_OSCURO, (x + 20, y), (x + 20, y + 40), 2)
+
+
+class CapaObstaculos:
+    """
+    Capa estática con los obstáculos pre-dibujados, dividida en trozos (chunks) cuadrados de
+    `tam_chunk` píxeles del mundo. Cada trozo se dibuja la primera vez que se ve y se guarda;
+    solo se conservan los `max_chunks` usados más recientemente, así que la memoria y el coste
+    por frame dependen de lo visible y no del tamaño total del mapa.
+    Cuando la simulación avisa de que un obstáculo ha recibido daño o ha sido destruido, solo
+    se vuelve a dibujar su zona en los trozos ya guardados.
+    Se registra como observador de la `Simulacion` (`mapa_creado` / `obstaculo_modificado`).
+    """
+    # Los arbustos se dibujan unos píxeles fuera de su rect de 40x40.
+    MARGEN = 8
+
+    def __init__(self, tam_chunk=s.TAM_CHUNK, max_chunks=s.MAX_CHUNKS, color_fondo=s.NEGRO):
+        self.tam_chunk = tam_chunk
+        self.max_chunks = max_chunks
+        self.color_fondo = color_fondo
+        self._chunks = {}  # (columna, fila) -> Surface (en orden de uso)
+        # Para dibujar trozos y zonas sin recortar las primitivas en los bordes
+        self._auxiliar = self._nueva_superficie((tam_chunk + 128, tam_chunk + 128))
+        self._orden = {}
+        self.simulacion = None
+        self.chunks_dibujados = 0  # Trozos dibujados desde cero (útil para perfilar)
+
+    @staticmethod
+    def _nueva_superficie(tamaño):
+        superficie = pygame.Surface(tamaño)
+        if pygame.display.get_surface() is not None:
+            superficie = superficie.convert()
+        return superficie
+
+    def mapa_creado(self, simulacion):
+        """Descarta los trozos del mapa anterior. Se llama al crear o reiniciar la partida."""
+        self.simulacion = simulacion
+        # Orden de dibujado original, para que los solapes se repitan igual al redibujar.
+        self._orden = {obstaculo: i for i, obstaculo in enumerate(simulacion.obstaculos)}
+        self._chunks.clear()
+
+    def _rect_chunk(self, clave):
+        return pygame.Rect(clave[0] * self.tam_chunk, clave[1] * self.tam_chunk, self.tam_chunk, self.tam_chunk)
+
+    def _chunk(self, clave):
+        """Devuelve la superficie de un trozo, dibujándolo si no está guardado."""
+        superficie = self._chunks.pop(clave, None)
+        if superficie is None:
+            rect = self._rect_chunk(clave)
+            superficie = self._nueva_superficie(rect.size)
+            self._dibujar_zona(superficie, rect)
+            self.chunks_dibujados += 1
+            if len(self._chunks) >= self.max_chunks:
+                del self._chunks[next(iter(self._chunks))]  # El usado hace más tiempo
+        self._chunks[clave] = superficie
+        return superficie
+
+    def _dibujar_zona(self, superficie, rect):
+        """Dibuja en `superficie` (cuya esquina es `rect.topleft` del mundo) los obstáculos que tocan `rect`."""
+        obstaculos = self.simulacion.rejilla_obstaculos.cercanos(rect.inflate(self.MARGEN * 2, self.MARGEN * 2))
+        # Los obstáculos se dibujan completos en la superficie auxiliar: las primitivas de pygame
+        # que cortan el borde de una superficie no siempre salen igual que sin cortar.
+        area = rect.unionall([o.rect.inflate(self.MARGEN * 2, self.MARGEN * 2) for o in obstaculos])
+        self._preparar_auxiliar(area)
+        for obstaculo in sorted(obstaculos, key=self._orden.get):
+            dibujar_obstaculo(self._auxiliar, obstaculo, area.topleft)
+        superficie.blit(self._auxiliar, (0, 0), area=rect.move(-area.x, -area.y))
+
+    def _preparar_auxiliar(self, area):
+        """Deja la superficie auxiliar con al menos el tamaño de `area` y su zona limpia."""
+        if area.width > self._auxiliar.get_width() or area.height > self._auxiliar.get_height():
+            self._auxiliar = self._nueva_superficie((max(area.width, self._auxiliar.get_width()),
+                                                     max(area.height, self._auxiliar.get_height())))
+        self._auxiliar.fill(self.color_fondo, ((0, 0), area.size))
+
+    def _claves(self, rect):
+        """Claves de los trozos que cubren un Rect del mundo."""
+        t = self.tam_chunk
+        return [(col, fila)
+                for fila in range(rect.top // t, (rect.bottom - 1) // t + 1)
+                for col in range(rect.left // t, (rect.right - 1) // t + 1)]
+
+    def dibujar(self, destino, rect_mundo, posicion):
+        """Copia la zona `rect_mundo` de la capa en `destino`, con su esquina en `posicion`."""
+        for clave in self._claves(rect_mundo):
+            rect_chunk = self._rect_chunk(clave)
+            area = rect_chunk.clip(rect_mundo)
+            destino.blit(self._chunk(clave),
+                         (posicion[0] + area.x - rect_mundo.x, posicion[1] + area.y - rect_mundo.y),
+                         area=area.move(-rect_chunk.x, -rect_chunk.y))
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        """Redibuja solo la zona del obstáculo dañado o destruido (y lo que se solape con ella)."""
+        zona = obstaculo.rect.inflate(self.MARGEN * 2, self.MARGEN * 2)
+        guardados = [clave for clave in self._claves(zona) if clave in self._chunks]
+        if not guardados:
+            return  # Se dibujará con el estado nuevo cuando se vea
+        # Los vecinos cuyo dibujo invade la zona están, como mucho, a MARGEN píxeles de ella.
+        vecinos = self.simulacion.rejilla_obstaculos.cercanos(zona.inflate(self.MARGEN * 2, self.MARGEN * 2))
+        # Se dibujan completos en la superficie auxiliar (los bordes de `draw.rect` no
+        # respetan bien un `set_clip`) y luego se copia únicamente la zona a cada trozo.
+        area = zona.unionall([v.rect.inflate(self.MARGEN * 2, self.MARGEN * 2) for v in vecinos])
+        self._preparar_auxiliar(area)
+        for vecino in sorted(vecinos, key=self._orden.get):
+            dibujar_obstaculo(self._auxiliar, vecino, area.topleft)
+        for clave in guardados:
+            rect_chunk = self._rect_chunk(clave)
+            self._chunks[clave].blit(self._auxiliar, zona.move(-rect_chunk.x, -rect_chunk.y),
+                                     area=zona.move(-area.x, -area.y))
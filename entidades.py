@@ -0,0 +1,245 @@
+import pygame
+import math
+import effects
+import settings as s
+
+
+class Tanque:
+    """Representa un tanque jugador, con su lógica de movimiento, disparo y estado."""
+    def __init__(self, x, y, color, simulacion, nombre="Tanque"):
+        self.nombre = nombre  # "Tanque Azul", ... (se usa como ganador)
+        self.x = x
+        self.y = y
+        self.ancho = 30
+        self.alto = 30
+        self.color = color
+        self.velocidad = 4  # px por tick de 60 Hz
+        self.angulo = 0
+        # Estado al empezar el último tick (para interpolar el dibujado entre ticks)
+        self.x_anterior = x
+        self.y_anterior = y
+        self.angulo_anterior = 0
+        self.vidas = 3
+        self.puntuacion = 0
+        # Estadísticas de la partida (precisión = impactos / disparos)
+        self.disparos = 0
+        self.impactos = 0
+        self.rect = pygame.Rect(x, y, self.ancho, self.alto)
+        self.ultimo_disparo = 0
+        self.velocidad_disparo = 500  # ms entre disparos
+        self.invulnerable = False
+        self.tiempo_invulnerable = 0
+        self.simulacion = simulacion  # Referencia a la simulación (reloj, efectos y sonidos)
+        self.motor_sonando = False
+        self.ultimo_rastro = 0
+        self.tiempo_entre_rastros = 50  # ms entre efectos de rastro
+
+    def mover(self, entrada, rejilla_obstaculos, rejilla_tanques, dt=None):
+        """
+        Maneja la lógica de movimiento y rotación del tanque. Como `Bala.mover`, escala el giro
+        y el avance con `dt` (la velocidad está expresada por tick de 60 Hz).
+        - Rota el tanque según `entrada.izquierda` / `entrada.derecha`.
+        - Avanza en la dirección del ángulo actual si `entrada.avanzar`.
+        - Realiza detección de colisiones con bordes, obstáculos y otros tanques (ambos vía `RejillaEspacial`;
+          la de tanques solo contiene los vivos y se actualiza aquí al moverse).
+        - Crea efectos de sonido y rastro al moverse.
+        - Devuelve True si el tanque debe disparar (al avanzar).
+        Sin `dt` se usa 1 / `settings.FPS`.
+        """
+        if dt is None:
+            dt = 1 / s.FPS
+        self.x_anterior = self.x
+        self.y_anterior = self.y
+        self.angulo_anterior = self.angulo
+        escala = dt * 60
+
+        # Sistema de rotación y movimiento direccional
+        nueva_x = self.x
+        nueva_y = self.y
+        movimiento_x = 0
+        movimiento_y = 0
+        disparar = False
+
+        # Rotación según la entrada del tick
+        if entrada.izquierda:
+            self.angulo -= 0.1 * escala  # Rotar hacia la izquierda
+        if entrada.derecha:
+            self.angulo += 0.1 * escala  # Rotar hacia la derecha
+
+        # Movimiento hacia adelante
+        tiempo_actual = self.simulacion.reloj.get_ticks()
+        if entrada.avanzar:
+            movimiento_x = math.cos(self.angulo) * self.velocidad * escala
+            movimiento_y = math.sin(self.angulo) * self.velocidad * escala
+            disparar = True  # Disparar automáticamente al moverse
+
+            # Efecto de sonido del motor (sin voz libre se vuelve a pedir en el siguiente tick)
+            if not self.motor_sonando:
+                self.motor_sonando = self.simulacion.reproducir_sonido('motor', bucle=True, fuente=self)
+
+            # Crear efecto de rastro
+            if tiempo_actual - self.ultimo_rastro >= self.tiempo_entre_rastros:
+                self.simulacion.agregar_efecto(effects.Rastro(self.x + self.ancho//2, self.y + self.alto//2, self.color))
+                self.ultimo_rastro = tiempo_actual
+        else:
+            # Detener sonido del motor
+            if self.motor_sonando:
+                self.simulacion.detener_sonido('motor', fuente=self)
+                self.motor_sonando = False
+
+        nueva_x += movimiento_x
+        nueva_y += movimiento_y
+
+        # Verificar colisiones con obstáculos (todos los obstáculos son sólidos)
+        rect_tanque = pygame.Rect(nueva_x, nueva_y, self.ancho, self.alto)
+        colision = False
+
+        # Colisión con obstáculos (tanto destructibles como no destructibles).
+        # La rejilla espacial solo revisa los obstáculos de las celdas cercanas.
+        if rejilla_obstaculos.primera_colision(rect_tanque) is not None:
+            colision = True
+
+        # Colisión con otros tanques (solo los de las celdas cercanas)
+        for tanque in rejilla_tanques.consultar(rect_tanque):
+            if tanque is not self:
+                colision = True
+                break
+
+        # Verificar límites del mundo (más estricto)
+        ancho_mundo, alto_mundo = self.simulacion.tamaño_mundo
+        if (nueva_x < 0 or nueva_x >= ancho_mundo - self.ancho or
+            nueva_y < 0 or nueva_y >= alto_mundo - self.alto):
+            colision = True
+
+        # Verificar que no entre en la zona de la interfaz superior (primeros 80 píxeles)
+        if nueva_y < 80:
+            colision = True
+
+        # Solo mover si no hay colisión
+        if not colision:
+            self.x = nueva_x
+            self.y = nueva_y
+            self.rect.x = self.x
+            self.rect.y = self.y
+            rejilla_tanques.actualizar(self)
+
+        return disparar  # Devolver si debe disparar
+
+    def voz_robada(self, nombre):
+        """El pool de voces ha dado el canal de este tanque a otro sonido."""
+        if nombre == 'motor':
+            self.motor_sonando = False
+
+    def disparar(self):
+        """
+        Activa una Bala del pool de la simulación si ha pasado suficiente tiempo desde el último disparo.
+        Devuelve la Bala o None (cadencia no cumplida o pool lleno).
+        """
+        tiempo_actual = self.simulacion.reloj.get_ticks()
+        # Controla la cadencia de disparo.
+        if tiempo_actual - self.ultimo_disparo >= self.velocidad_disparo:
+            # Calcular posición de salida del cañón
+            # La bala se crea un poco más adelante del tanque, en la dirección del cañón.
+            cañon_x = self.x + self.ancho // 2 + math.cos(self.angulo) * 25
+            cañon_y = self.y + self.alto // 2 + math.sin(self.angulo) * 25
+
+            bala = self.simulacion.balas.crear(cañon_x, cañon_y, self.angulo, self, tiempo_actual)
+            if bala is not None:
+                self.ultimo_disparo = tiempo_actual
+                self.disparos += 1
+                self.simulacion.reproducir_sonido('disparo')
+            return bala
+        return None
+
+
+class Bala:
+    """
+    Representa un proyectil disparado por un tanque.
+    Las instancias se reservan una sola vez en `PoolBalas` y se reutilizan con `reiniciar`.
+    """
+    __slots__ = ('x', 'y', 'x_anterior', 'y_anterior', 'velocidad', 'angulo', 'dx', 'dy', 'color',
+                 'radio', 'rect', 'tirador', 'tiempo_creacion', 'tiempo_max_vida', 'indice', 'id')
+
+    def __init__(self, x=0.0, y=0.0, angulo=0.0, tirador=None, tiempo_creacion=0):
+        self.velocidad = 10
+        self.radio = 4
+        self.rect = pygame.Rect(0, 0, self.radio * 2, self.radio * 2)
+        self.tiempo_max_vida = 3000  # 3 segundos
+        self.indice = -1  # Posición en el pool (-1 si no está activa)
+        self.id = 0  # Identificador único del disparo (lo asigna el pool)
+        self.reiniciar(x, y, angulo, tirador, tiempo_creacion)
+
+    def reiniciar(self, x, y, angulo, tirador, tiempo_creacion):
+        """Prepara la bala para un nuevo disparo sin crear un objeto nuevo."""
+        self.x = self.x_anterior = x
+        self.y = self.y_anterior = y
+        self.angulo = angulo
+        # La dirección no cambia durante el vuelo: se calcula una sola vez.
+        self.dx = math.cos(angulo) * self.velocidad
+        self.dy = math.sin(angulo) * self.velocidad
+        self.tirador = tirador  # Tanque que disparó (para puntuar y no dañarse a sí mismo)
+        self.color = tirador.color if tirador is not None else s.BLANCO
+        self.rect.x = x - self.radio
+        self.rect.y = y - self.radio
+        self.tiempo_creacion = tiempo_creacion  # Para controlar su vida útil (ms del reloj de la simulación).
+
+    def mover(self, dt):
+        """
+        Mueve la bala en su dirección. `dt` asegura un movimiento fluido e independiente de los FPS.
+        Guarda la posición anterior para detectar colisiones a lo largo de todo el recorrido.
+        """
+        self.x_anterior = self.x
+        self.y_anterior = self.y
+        self.x += self.dx * dt * 60 # Multiplicamos por 60 para mantener la velocidad original
+        self.y += self.dy * dt * 60
+        self.rect.x = self.x - self.radio
+        self.rect.y = self.y - self.radio
+
+    def recorrido(self):
+        """Devuelve el segmento ((x0, y0), (x1, y1)) recorrido en el último movimiento."""
+        return (self.x_anterior, self.y_anterior), (self.x, self.y)
+
+    def esta_fuera_del_mundo(self, ancho_mundo, alto_mundo):
+        """Comprueba si la bala ha salido de los límites del mundo."""
+        return (self.x < -10 or self.x > ancho_mundo + 10 or
+                self.y < -10 or self.y > alto_mundo + 10)
+
+    def tiempo_agotado(self, tiempo_actual):
+        """Comprueba si la bala ha existido por más tiempo del permitido."""
+        return tiempo_actual - self.tiempo_creacion >= self.tiempo_max_vida
+
+
+class Obstaculo:
+    """Clase base para todos los obstáculos del juego."""
+    def __init__(self, x, y, salud=1, destructible=False):
+        self.x = x
+        self.y = y
+        self.ancho = 40
+        self.alto = 40
+        self.rect = pygame.Rect(x, y, self.ancho, self.alto)
+        self.salud = salud
+        self.salud_max = self.salud
+        self.destructible = destructible
+
+    def recibir_daño(self):
+        """Reduce la salud del obstáculo si es destructible. Devuelve True si se destruye."""
+        if self.destructible:
+            self.salud -= 1
+            return self.salud <= 0
+        return False
+
+class Roca(Obstaculo):
+    def __init__(self, x, y):
+        super().__init__(x, y, salud=999, destructible=False)
+
+class Arbusto(Obstaculo):
+    def __init__(self, x, y):
+        super().__init__(x, y, salud=2, destructible=True)
+
+class Muro(Obstaculo):
+    def __init__(self, x, y):
+        super().__init__(x, y, salud=5, destructible=True)
+
+class CajaMadera(Obstaculo):
+    def __init__(self, x, y):
+        super().__init__(x, y, salud=3, destructible=True)
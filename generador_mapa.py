@@ -0,0 +1,56 @@
+import math
+import random
+import pygame
+import settings as s
+
+
+def area_mapa(ancho_mundo, alto_mundo):
+    """Zona donde pueden colocarse obstáculos: lejos de los bordes y debajo de la interfaz."""
+    return pygame.Rect(50, 130, ancho_mundo - 100, alto_mundo - 180)
+
+
+AREA_MAPA = area_mapa(s.ANCHO_VENTANA, s.ALTO_VENTANA)
+
+
+def _celdas_libres(area, celda, zonas_prohibidas):
+    """Devuelve las celdas (columna, fila) del área que no tocan ninguna zona prohibida."""
+    libres = []
+    for col in range(area.width // celda):
+        for fila in range(area.height // celda):
+            rect = pygame.Rect(area.x + col * celda, area.y + fila * celda, celda, celda)
+            if rect.collidelist(zonas_prohibidas) == -1:
+                libres.append((col, fila))
+    return libres
+
+
+def generar_posiciones(cantidad, zonas_prohibidas=(), area=AREA_MAPA, rng=None, tam=40,
+                       holgura=1.5, celda_max=80):
+    """
+    Devuelve hasta `cantidad` posiciones (x, y) para obstáculos de `tam`×`tam` píxeles.
+
+    El área se divide en una rejilla de ocupación de celdas de al menos `tam` píxeles; cada
+    obstáculo ocupa una celda libre distinta, elegida al azar, con un desplazamiento aleatorio
+    dentro de ella. Así nunca se solapan entre sí ni con `zonas_prohibidas` (zonas seguras de
+    los tanques) y el coste es lineal en el número de celdas, sin reintentos.
+    Las celdas son tan grandes como permita la densidad pedida (dejando `holgura` veces más
+    celdas libres que obstáculos), para que los mapas poco densos no parezcan una cuadrícula.
+    Si no caben todos se devuelven los que quepan.
+    """
+    rng = rng if rng is not None else random.Random()
+    zonas_prohibidas = list(zonas_prohibidas)
+    if cantidad <= 0:
+        return []
+
+    # Estimación del tamaño de celda y ajuste a la baja hasta que haya sitio suficiente.
+    estimada = int(math.sqrt(area.width * area.height / (cantidad * holgura)))
+    celda = max(tam, min(celda_max, estimada))
+    libres = _celdas_libres(area, celda, zonas_prohibidas)
+    while len(libres) < cantidad * holgura and celda > tam:
+        celda = max(tam, celda - 4)
+        libres = _celdas_libres(area, celda, zonas_prohibidas)
+
+    elegidas = rng.sample(libres, min(cantidad, len(libres)))
+    juego_libre = celda - tam
+    return [(area.x + col * celda + rng.randint(0, juego_libre),
+             area.y + fila * celda + rng.randint(0, juego_libre))
+            for col, fila in elegidas]
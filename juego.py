@@ -1,10 +1,17 @@
-import pygame
-import math
-import random
 import time
+INICIO = time.perf_counter()  # Referencia del informe de arranque (antes de importar pygame y NumPy)
+
+import pygame
+import sys
 from enum import Enum, auto
-import effects
 from asset_manager import AssetManager
+from capa_obstaculos import CapaObstaculos
+from camara import Camara
+from simulacion import Simulacion, EntradaTanque, SIN_ENTRADA
+from sprites import atlas_efectos, CacheTextos, CacheSpritesTanque, CacheSpritesBala, crear_overlay
+from perfilador import Perfilador, PerfiladorNulo, OverlayPerfilador, InformeArranque, MedidorLatencia
+from repeticion import GrabadorPartida
+from bot import ControladorBot
 import settings as s
 
 
@@ -14,334 +21,180 @@ class GameState(Enum):
     PAUSA = auto()
     FIN_PARTIDA = auto()
 
-# Inicializar pygame
-pygame.init()
-
-class Tanque:
-    """Representa un tanque jugador, con su lógica de movimiento, disparo y estado."""
-    def __init__(self, x, y, color, teclas, juego):
-        self.x = x
-        self.y = y
-        self.ancho = 30
-        self.alto = 30
-        self.color = color
-        self.velocidad = 4
-        self.angulo = 0
-        self.teclas = teclas  # Diccionario con las teclas de control
-        self.vidas = 3
-        self.puntuacion = 0
-        self.rect = pygame.Rect(x, y, self.ancho, self.alto)
-        self.ultimo_disparo = 0
-        self.velocidad_disparo = 500  # ms entre disparos
-        self.invulnerable = False
-        self.tiempo_invulnerable = 0
-        self.juego = juego  # Referencia al juego para efectos de sonido
-        self.motor_sonando = False
-        self.ultimo_rastro = 0
-        self.tiempo_entre_rastros = 50  # ms entre efectos de rastro
-        
-    def mover(self, teclas_presionadas, obstaculos, otros_tanques):
-        """
-        Maneja la lógica de movimiento y rotación del tanque.
-        - Rota el tanque según las teclas de izquierda/derecha.
-        - Avanza en la dirección del ángulo actual.
-        - Realiza detección de colisiones con bordes, obstáculos y otros tanques.
-        - Crea efectos de sonido y rastro al moverse.
-        - Devuelve True si el tanque debe disparar (al avanzar).
-        """
-        # Sistema de rotación y movimiento direccional
-        nueva_x = self.x
-        nueva_y = self.y
-        movimiento_x = 0
-        movimiento_y = 0
-        disparar = False
-        
-        # Rotación con teclas de dirección
-        if teclas_presionadas[self.teclas['izquierda']]:
-            self.angulo -= 0.1  # Rotar hacia la izquierda
-        if teclas_presionadas[self.teclas['derecha']]:
-            self.angulo += 0.1  # Rotar hacia la derecha
-        
-        # Movimiento hacia adelante con tecla de avance
-        tiempo_actual = pygame.time.get_ticks()
-        if teclas_presionadas[self.teclas['avanzar']]:
-            movimiento_x = math.cos(self.angulo) * self.velocidad
-            movimiento_y = math.sin(self.angulo) * self.velocidad
-            disparar = True  # Disparar automáticamente al moverse
-            
-            # Efecto de sonido del motor
-            if 'motor' in self.juego.assets.sounds and not self.motor_sonando:
-                self.juego.assets.sounds['motor'].play(-1)  # Loop continuo
-                self.motor_sonando = True
-                
-            # Crear efecto de rastro
-            if tiempo_actual - self.ultimo_rastro >= self.tiempo_entre_rastros:
-                self.juego.efectos.append(effects.Rastro(self.x + self.ancho//2, self.y + self.alto//2, self.color))
-                self.ultimo_rastro = tiempo_actual
-        else:
-            # Detener sonido del motor
-            if self.motor_sonando and 'motor' in self.juego.assets.sounds:
-                self.juego.assets.sounds['motor'].stop()
-                self.motor_sonando = False
-            
-        nueva_x += movimiento_x
-        nueva_y += movimiento_y
-            
-        # Verificar colisiones con obstáculos (todos los obstáculos son sólidos)
-        rect_tanque = pygame.Rect(nueva_x, nueva_y, self.ancho, self.alto)
-        colision = False
-        
-        # Colisión con obstáculos (tanto destructibles como no destructibles)
-        for obstaculo in obstaculos:
-            if rect_tanque.colliderect(obstaculo.rect):
-                colision = True
-                break
-                
-        # Colisión con otros tanques
-        for tanque in otros_tanques:
-            if tanque != self and rect_tanque.colliderect(tanque.rect):
-                colision = True
-                break
-                    
-        # Verificar límites de la pantalla (más estricto)
-        if (nueva_x < 0 or nueva_x >= s.ANCHO_VENTANA - self.ancho or 
-            nueva_y < 0 or nueva_y >= s.ALTO_VENTANA - self.alto):
-            colision = True
-            
-        # Verificar que no entre en la zona de la interfaz superior (primeros 80 píxeles)
-        if nueva_y < 80:
-            colision = True
-            
-        # Solo mover si no hay colisión
-        if not colision:
-            self.x = nueva_x
-            self.y = nueva_y
-            self.rect.x = self.x
-            self.rect.y = self.y
-            
-        return disparar  # Devolver si debe disparar
+# Teclas de control de cada tanque, en el mismo orden que `Simulacion.tanques`.
+CONTROLES = [
+    {'avanzar': pygame.K_w, 'izquierda': pygame.K_a, 'derecha': pygame.K_d},  # Tanque Azul
+    {'avanzar': pygame.K_i, 'izquierda': pygame.K_j, 'derecha': pygame.K_l},  # Tanque Rojo
+]
+TECLAS_TANQUES = {tecla for controles in CONTROLES for tecla in controles.values()}
 
-    def disparar(self):
-        """
-        Crea un objeto Bala si ha pasado suficiente tiempo desde el último disparo.
-        Devuelve el objeto Bala o None.
-        """
-        tiempo_actual = pygame.time.get_ticks()
-        # Controla la cadencia de disparo.
-        if tiempo_actual - self.ultimo_disparo >= self.velocidad_disparo:
-            # Calcular posición de salida del cañón
-            # La bala se crea un poco más adelante del tanque, en la dirección del cañón.
-            cañon_x = self.x + self.ancho // 2 + math.cos(self.angulo) * 25
-            cañon_y = self.y + self.alto // 2 + math.sin(self.angulo) * 25
-            
-            self.ultimo_disparo = tiempo_actual
-            # Reproducir sonido de disparo si está disponible
-            if 'disparo' in self.juego.assets.sounds:
-                self.juego.assets.sounds['disparo'].play()
-            return Bala(cañon_x, cañon_y, self.angulo, self.color)
-        return None
-        
-class Bala:
-    """Representa un proyectil disparado por un tanque."""
-    def __init__(self, x, y, angulo, color):
-        self.x = x
-        self.y = y
-        self.velocidad = 10
-        self.angulo = angulo
-        self.color = color
-        self.radio = 4
-        self.rect = pygame.Rect(x - self.radio, y - self.radio, self.radio * 2, self.radio * 2)
-        self.tiempo_creacion = pygame.time.get_ticks() # Para controlar su vida útil.
-        self.tiempo_max_vida = 3000  # 3 segundos
-        
-    def mover(self, dt):
-        """Mueve la bala en su dirección. `dt` asegura un movimiento fluido e independiente de los FPS."""
-        self.x += math.cos(self.angulo) * self.velocidad * dt * 60 # Multiplicamos por 60 para mantener la velocidad original
-        self.y += math.sin(self.angulo) * self.velocidad * dt * 60
-        self.rect.x = self.x - self.radio
-        self.rect.y = self.y - self.radio
-        
-    def esta_fuera_pantalla(self):
-        """Comprueba si la bala ha salido de los límites de la pantalla."""
-        return (self.x < -10 or self.x > s.ANCHO_VENTANA + 10 or 
-                self.y < -10 or self.y > s.ALTO_VENTANA + 10)
-                
-    def tiempo_agotado(self):
-        """Comprueba si la bala ha existido por más tiempo del permitido."""
-        return pygame.time.get_ticks() - self.tiempo_creacion >= self.tiempo_max_vida
-
-
-class Obstaculo:
-    """Clase base para todos los obstáculos del juego."""
-    def __init__(self, x, y, salud=1, destructible=False):
-        self.x = x
-        self.y = y
-        self.ancho = 40
-        self.alto = 40
-        self.rect = pygame.Rect(x, y, self.ancho, self.alto)
-        self.salud = salud
-        self.salud_max = self.salud
-        self.destructible = destructible
-
-    def recibir_daño(self):
-        """Reduce la salud del obstáculo si es destructible. Devuelve True si se destruye."""
-        if self.destructible:
-            self.salud -= 1
-            return self.salud <= 0
-        return False
-
-class Roca(Obstaculo):
-    def __init__(self, x, y):
-        super().__init__(x, y, salud=999, destructible=False)
-
-class Arbusto(Obstaculo):
-    def __init__(self, x, y):
-        super().__init__(x, y, salud=2, destructible=True)
-
-class Muro(Obstaculo):
-    def __init__(self, x, y):
-        super().__init__(x, y, salud=5, destructible=True)
-
-class CajaMadera(Obstaculo):
-    def __init__(self, x, y):
-        super().__init__(x, y, salud=3, destructible=True)
+
+class TecladoEventos:
+    """
+    Estado de las teclas de los tanques construido con los eventos KEYDOWN/KEYUP en lugar de
+    `pygame.key.get_pressed()`. Una pulsación cuenta en el tick siguiente aunque se haya soltado
+    antes (un toque más corto que un tick no se pierde).
+    """
+    def __init__(self):
+        self.pulsadas = set()
+        self.flancos = set()  # Teclas pulsadas desde el último tick
+
+    def procesar(self, evento):
+        if evento.type == pygame.KEYDOWN:
+            self.pulsadas.add(evento.key)
+            self.flancos.add(evento.key)
+        elif evento.type == pygame.KEYUP:
+            self.pulsadas.discard(evento.key)
+
+    def soltar_todo(self):
+        """Al perder el foco no llegan los KEYUP: se dan todas por soltadas."""
+        self.pulsadas.clear()
+
+    def descartar_flancos(self):
+        """Olvida los toques aún no consumidos (los hechos en pausa no deben moverse al reanudar)."""
+        self.flancos.clear()
+
+    def consumir(self):
+        """Teclas activas en este tick (pulsadas ahora o desde el tick anterior)."""
+        activas = self.pulsadas | self.flancos
+        self.flancos.clear()
+        return activas
 
 
 class Juego:
-    """Clase principal que orquesta todo el juego: el bucle principal, estados, eventos y lógica."""
-    def __init__(self):
-        """Inicializa la ventana, los recursos, los objetos del juego y el estado inicial."""
+    """
+    Cliente con ventana de la `Simulacion`: lee el teclado, gestiona estados, música y dibujado.
+    Toda la lógica de la partida vive en `self.simulacion`.
+    """
+    def __init__(self, exportar_perfil=False, tamaño_mundo=None, grabar=False, bot=False,
+                 medir_arranque=False, entrada_eventos=False, medir_latencia=False, num_tanques=2):
+        """
+        Inicializa la ventana, los recursos, la simulación y el estado inicial.
+        Con `exportar_perfil` los tiempos por fase se guardan en CSV/JSON al salir.
+        `tamaño_mundo` (ancho, alto) permite arenas mayores que la ventana (ver `settings.ANCHO_MUNDO`).
+        Con `grabar` cada partida se guarda en `settings.CARPETA_GRABACIONES` (ver `repeticion.py`).
+        Con `bot` el Tanque Rojo lo controla el ordenador (ver `bot.py`).
+        `num_tanques` > 2 es un todos contra todos: los tanques sin teclas en `CONTROLES` son bots.
+        Con `medir_arranque` el juego se cierra al terminar el arranque (ver `self.informe_arranque`).
+        Con `entrada_eventos` las teclas de los tanques se leen de los eventos KEYDOWN/KEYUP justo
+        antes de cada tick (ver `TecladoEventos`) en lugar de una vez por frame con `get_pressed`.
+        Con `medir_latencia` se mide la latencia de entrada a pantalla y se informa al salir.
+        """
+        self.informe_arranque = InformeArranque(INICIO)
+        self.informe_arranque.marcar('importaciones')
+        self.medir_arranque = medir_arranque
+        # Solo se inician los subsistemas que hacen falta para el primer frame; el mixer lo
+        # inicia el cargador de recursos en segundo plano.
+        pygame.display.init()
         self.pantalla = pygame.display.set_mode((s.ANCHO_VENTANA, s.ALTO_VENTANA))
         pygame.display.set_caption("Juego de Tanques - Optimizado")
         self.reloj = pygame.time.Clock()
+        self.informe_arranque.marcar('ventana')
+
+        # Cargar los recursos a través del AssetManager (el audio llega en segundo plano)
+        self.assets = AssetManager(en_segundo_plano=True, informe=self.informe_arranque)
+        # Entrada de los tanques y medición de su latencia
+        self.teclado = TecladoEventos() if entrada_eventos else None
+        self.latencia = MedidorLatencia() if medir_latencia else None
+        # Tiempos por fase de cada frame (F3 muestra el panel)
+        self.perfilador = Perfilador()
+        self.exportar_perfil = exportar_perfil
+        self.renderer = GameRenderer(self.pantalla, self.assets, perfilador=self.perfilador)
+
+        # Crear la simulación (tanques, balas, obstáculos y efectos)
+        self.simulacion = Simulacion(sonidos=self.assets.sounds, perfilador=self.perfilador,
+                                     tamaño_mundo=tamaño_mundo, num_tanques=num_tanques)
+        self.simulacion.agregar_observador(self.renderer)
+        # Grabación de las partidas (semilla del mapa + teclas de cada tick)
+        self.grabador = None
+        if grabar:
+            self.grabador = GrabadorPartida()
+            self.simulacion.agregar_observador(self.grabador)
+        # Tanques controlados por el ordenador: índice del tanque -> controlador
+        self.bots = {i: ControladorBot(self.simulacion, i) for i in range(num_tanques)
+                     if i >= len(CONTROLES) or (bot and i == 1)}
+        self.informe_arranque.marcar('simulacion')
 
-        # Cargar todos los recursos a través del AssetManager
-        self.assets = AssetManager()
-        self.renderer = GameRenderer(self.pantalla, self.assets)
-        
-        # Crear tanques
-        self.tanque1 = Tanque(100, 100, s.AZUL, {
-            'avanzar': pygame.K_w,
-            'izquierda': pygame.K_a,
-            'derecha': pygame.K_d
-        }, self)
-        
-        self.tanque2 = Tanque(800, 500, s.ROJO, {
-            'avanzar': pygame.K_i,
-            'izquierda': pygame.K_j,
-            'derecha': pygame.K_l
-        }, self)
-        
-        # Listas de objetos del juego
-        self.balas = []
-        self.obstaculos = []
-        self.efectos = []  # Para efectos visuales
-        
-        # Crear obstáculos
-        self.crear_obstaculos()
-        
         # Estado del juego
         self.estado = GameState.JUGANDO
-        self.ganador = None
+        self.pausa_sin_foco = False  # La pausa actual es automática (ventana minimizada o sin foco)
         self.musica_pausada = False
-        
-        # Agrupar tanques para facilitar la iteración
-        self.tanques = [self.tanque1, self.tanque2]
-        # Restaurar el volumen de la sesión anterior si es necesario
-        if 'volumen_actual' in self.__dict__:
-            pygame.mixer.music.set_volume(self.volumen_actual)
+
         self.volumen_actual = 0.3
+
+    @property
+    def ganador(self):
+        """Ganador de la partida (o None si sigue en curso)."""
+        return self.simulacion.ganador
         
     def toggle_musica(self):
         """Pausa o reanuda la música de fondo."""
-        try:
-            if self.musica_pausada:
-                pygame.mixer.music.unpause()
-                self.musica_pausada = False
-                print("Música reanudada")
-            else:
-                pygame.mixer.music.pause()
-                self.musica_pausada = True
-                print("Música pausada")
-        except pygame.error:
-            print("Error al controlar la música")
+        self.musica_pausada = not self.musica_pausada
+        self._aplicar_musica()
+        print("Música pausada" if self.musica_pausada else "Música reanudada")
     
     def aumentar_volumen(self):
         """Aumenta el volumen de la música."""
         if self.volumen_actual < 1.0:
             self.volumen_actual = min(1.0, self.volumen_actual + 0.1)
-            pygame.mixer.music.set_volume(self.volumen_actual)
+            self._aplicar_musica()
             print(f"Volumen: {int(self.volumen_actual * 100)}%")
     
     def disminuir_volumen(self):
         """Disminuye el volumen de la música."""
         if self.volumen_actual > 0.0:
             self.volumen_actual = max(0.0, self.volumen_actual - 0.1)
-            pygame.mixer.music.set_volume(self.volumen_actual)
+            self._aplicar_musica()
             print(f"Volumen: {int(self.volumen_actual * 100)}%")
         
-    def crear_obstaculos(self):
-        """Genera y posiciona los obstáculos en el mapa de forma aleatoria."""
-        # Limpiar obstáculos existentes
-        self.obstaculos = []
-        
-        # Definir áreas seguras para los tanques
-        margen_tanque = 60
-        area_segura_tanque1 = self.tanque1.rect.inflate(margen_tanque * 2, margen_tanque * 2)
-        area_segura_tanque2 = self.tanque2.rect.inflate(margen_tanque * 2, margen_tanque * 2)
-        areas_prohibidas = [area_segura_tanque1, area_segura_tanque2]
-
-        # Crear rocas (no destructibles) - posiciones aleatorias
-        for _ in range(s.NUM_ROCAS):
-            x, y = self.generar_posicion_segura(areas_prohibidas)
-            self.obstaculos.append(Roca(x, y))
-            areas_prohibidas.append(self.obstaculos[-1].rect)
-            
-        # Crear arbustos (destructibles) - posiciones aleatorias
-        for _ in range(s.NUM_ARBUSTOS):
-            x, y = self.generar_posicion_segura(areas_prohibidas)
-            self.obstaculos.append(Arbusto(x, y))
-            areas_prohibidas.append(self.obstaculos[-1].rect)
-
-        # Crear muros (destructibles y más resistentes)
-        for _ in range(s.NUM_MUROS):
-            x, y = self.generar_posicion_segura(areas_prohibidas)
-            self.obstaculos.append(Muro(x, y))
-            areas_prohibidas.append(self.obstaculos[-1].rect)
-        
-        # Crear cajas de madera (destructibles)
-        for _ in range(s.NUM_CAJAS_MADERA):
-            x, y = self.generar_posicion_segura(areas_prohibidas)
-            self.obstaculos.append(CajaMadera(x, y))
-            areas_prohibidas.append(self.obstaculos[-1].rect)
-    
-    def generar_posicion_segura(self, rects_existentes):
-        """Genera una posición aleatoria que no colisione con una lista de rectángulos existentes."""
-        max_intentos = 100  # Límite de intentos para evitar bucle infinito
-        
-        for intento in range(max_intentos):
-            x = random.randint(50, s.ANCHO_VENTANA - 90)  # Evitar bordes y zona de UI
-            y = random.randint(130, s.ALTO_VENTANA - 90)  # Evitar zona de interfaz y bordes
-            
-            # Crear rectángulo temporal para verificar colisiones
-            nuevo_rect = pygame.Rect(x, y, 40, 40)
-            
-            # Verificar si colisiona con alguno de los rectángulos existentes
-            if not any(nuevo_rect.colliderect(rect) for rect in rects_existentes):
-                return x, y
-        
-        # Si no se encuentra una posición segura después de muchos intentos,
-        # devolver una posición aleatoria (caso extremo)
-        x = random.randint(50, s.ANCHO_VENTANA - 90)
-        y = random.randint(130, s.ALTO_VENTANA - 90)
-        print("Advertencia: No se pudo encontrar una posición segura. Colocando obstáculo en una posición aleatoria.")
-        return x, y
-    
-    def manejar_eventos(self):
-        """Procesa todas las entradas del usuario (teclado, cerrar ventana)."""
-        for evento in pygame.event.get():
+    def _aplicar_musica(self):
+        """
+        Aplica `volumen_actual` y `musica_pausada` a la música. Mientras el audio se carga no hace
+        nada: al terminar la carga se vuelve a llamar para respetar lo pulsado entretanto.
+        """
+        if not pygame.mixer.get_init():
+            return
+        try:
+            pygame.mixer.music.set_volume(self.volumen_actual)
+            if self.musica_pausada:
+                pygame.mixer.music.pause()
+            else:
+                pygame.mixer.music.unpause()
+        except pygame.error:
+            print("Error al controlar la música")
+
+    def manejar_eventos(self, eventos=None):
+        """
+        Procesa todas las entradas del usuario (teclado, cerrar ventana, foco). Lee la cola de
+        SDL salvo que se le pasen los `eventos` ya recogidos (ver `esperar_eventos`).
+        """
+        if eventos is None:
+            if self.latencia:
+                self.latencia.recoger()
+            eventos = pygame.event.get()
+        for evento in eventos:
+            if evento.type in (pygame.KEYDOWN, pygame.KEYUP) and evento.key in TECLAS_TANQUES:
+                # Las liberaciones siempre cuentan; las pulsaciones solo con la partida en marcha.
+                jugando = self.estado == GameState.JUGANDO
+                if self.teclado and (jugando or evento.type == pygame.KEYUP):
+                    self.teclado.procesar(evento)
+                if self.latencia and jugando:
+                    self.latencia.evento()
             if evento.type == pygame.QUIT:
                 return False
+            elif evento.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED):
+                if self.teclado:
+                    self.teclado.soltar_todo()
+                if s.PAUSA_SIN_FOCO and self.estado == GameState.JUGANDO:
+                    self.estado = GameState.PAUSA
+                    self.pausa_sin_foco = True
+            elif evento.type in (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED):
+                if self.pausa_sin_foco and self.estado == GameState.PAUSA:
+                    self.estado = GameState.JUGANDO
+                self.pausa_sin_foco = False
+            elif evento.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # La ventana se ha vuelto a mostrar: el siguiente frame va completo.
+                self.renderer.invalidar_todo()
             elif evento.type == pygame.KEYDOWN:
                 if evento.key == pygame.K_ESCAPE:
                     # Salir del juego con ESC
@@ -361,10 +214,41 @@ class Juego:
                 elif evento.key == pygame.K_p:
                     # Pausar/reanudar el juego
                     self.pausar_juego()
+                elif evento.key == pygame.K_F3:
+                    # Mostrar/ocultar el panel de tiempos por fase
+                    self.renderer.overlay_perfilador.alternar()
+        if self.en_reposo():
+            # Sin ticks no se aplica nada: lo recogido antes de pausar no espera a la reanudación.
+            if self.teclado:
+                self.teclado.descartar_flancos()
+            if self.latencia:
+                self.latencia.descartar()
         return True
 
+    def esperar_eventos(self, timeout=s.ESPERA_REPOSO_MS):
+        """
+        Bloquea hasta que llega un evento (sin gastar CPU) o pasan `timeout` ms.
+        Devuelve los eventos pendientes, o una lista vacía si no ha llegado ninguno.
+        """
+        evento = pygame.event.wait(timeout)
+        if evento.type == pygame.NOEVENT:
+            return []
+        if self.latencia:
+            self.latencia.recoger(bloqueado=True)
+        return [evento] + pygame.event.get()
+
+    def _firma_pantalla(self):
+        """Lo que decide el aspecto de un frame en reposo: si no cambia, el frame congelado sigue valiendo."""
+        return (self.estado, self.musica_pausada, self.volumen_actual,
+                self.renderer.overlay_perfilador.visible, self.renderer.redibujo_pendiente)
+
+    def en_reposo(self):
+        """True si no hay nada que simular ni animar: pausa o fin de partida."""
+        return self.estado != GameState.JUGANDO
+
     def pausar_juego(self):
         """Pausa o reanuda el juego."""
+        self.pausa_sin_foco = False
         if self.estado == GameState.JUGANDO:
             self.estado = GameState.PAUSA
             print("Juego pausado")
@@ -372,178 +256,131 @@ class Juego:
             self.estado = GameState.JUGANDO
             print("Juego reanudado")
     
+    def leer_entradas(self):
+        """Convierte el estado actual del teclado (o la decisión de los bots) en una `EntradaTanque` por tanque."""
+        if self.teclado:
+            activas = self.teclado.consumir()
+            entradas = [EntradaTanque(c['avanzar'] in activas, c['izquierda'] in activas, c['derecha'] in activas)
+                        for c in CONTROLES]
+        else:
+            teclas_presionadas = pygame.key.get_pressed()
+            entradas = [EntradaTanque(teclas_presionadas[c['avanzar']],
+                                      teclas_presionadas[c['izquierda']],
+                                      teclas_presionadas[c['derecha']])
+                        for c in CONTROLES]
+        entradas += [SIN_ENTRADA] * (len(self.simulacion.tanques) - len(entradas))
+        if self.latencia:
+            self.latencia.aplicado()
+        for indice, bot in self.bots.items():
+            entradas[indice] = bot()
+        return entradas
+
+    def tanques_camara(self):
+        """Tanques que sigue la cámara: los de los jugadores humanos mientras quede alguno vivo."""
+        humanos = [t for i, t in enumerate(self.simulacion.tanques) if i not in self.bots and t.vidas > 0]
+        return humanos or self.simulacion.tanques
+
     def actualizar(self, dt):
-        """Actualiza la lógica de todos los objetos del juego en cada frame."""
-        teclas_presionadas = pygame.key.get_pressed()
-
-        # 1. Actualizar tanques (movimiento y disparo)
-        tanques_activos = [t for t in self.tanques if t.vidas > 0]
-        for i, tanque in enumerate(tanques_activos):
-            otros_tanques = tanques_activos[:i] + tanques_activos[i+1:]
-            if tanque.mover(teclas_presionadas, self.obstaculos, otros_tanques):
-                bala = tanque.disparar()
-                if bala:
-                    self.balas.append(bala)
-
-        # 2. Mover balas
-        for bala in self.balas[:]:
-            bala.mover(dt)
-            # Eliminar balas que están fuera de la pantalla o que han existido demasiado tiempo
-            if bala.esta_fuera_pantalla() or bala.tiempo_agotado():
-                self.balas.remove(bala)
-        
-        # Verificar colisiones de balas
-        self.verificar_colisiones() # 3. Verificar colisiones
-        
-        # Actualizar efectos de invulnerabilidad
-        self.actualizar_invulnerabilidad() # 4. Actualizar estado de invulnerabilidad
-        
-        # 5. Verificar si la partida ha terminado
-        if all(t.vidas <= 0 for t in self.tanques):
-            self.estado = GameState.FIN_PARTIDA
-            self.ganador = "Empate"
-        elif self.tanque2.vidas <= 0:
+        """Avanza la simulación un tick con la entrada del teclado."""
+        # Los efectos visuales solo se generan en los trozos del mundo cercanos a la cámara.
+        self.simulacion.zona_detalle = self.renderer.camara.zona_activa()
+        entradas = self.leer_entradas()
+        self.simulacion.paso(entradas, dt)
+        if self.grabador:
+            self.grabador.registrar(entradas, dt)
+        if self.simulacion.terminada:
             self.estado = GameState.FIN_PARTIDA
-            self.ganador = "Tanque Azul"
-        elif self.tanque1.vidas <= 0:
-            self.estado = GameState.FIN_PARTIDA
-            self.ganador = "Tanque Rojo"
-    
-    def actualizar_efectos(self):
-        """Actualiza todos los efectos visuales y los elimina si han terminado."""
-        for efecto in self.efectos[:]:
-            # Cada efecto tiene su propia lógica de actualización.
-            efecto.actualizar()
-            if efecto.ha_terminado():
-                self.efectos.remove(efecto)
-
-    def _manejar_colision_bala_tanque(self, bala, tanque_impactado, tanque_tirador):
-        """Maneja la lógica de colisión entre una bala y un tanque."""
-        if (tanque_impactado.vidas > 0 and bala.rect.colliderect(tanque_impactado.rect) and
-                # La bala no debe ser del mismo color que el tanque y el tanque no debe ser invulnerable.
-                bala.color != tanque_impactado.color and not tanque_impactado.invulnerable):
-            
-            tanque_impactado.vidas -= 1
-            tanque_tirador.puntuacion += 10
-            tanque_impactado.invulnerable = True
-            tanque_impactado.tiempo_invulnerable = pygame.time.get_ticks()
-            
-            self.crear_efecto_explosion(tanque_impactado.x + 15, tanque_impactado.y + 15)
-            self.balas.remove(bala)
-            return True
-        return False
-
-    def verificar_colisiones(self):
-        """Verifica y maneja las colisiones de las balas con los obstáculos y los tanques."""
-        for bala in self.balas[:]:
-            # Colisión con obstáculos usando rectángulos
-            for obstaculo in self.obstaculos[:]:
-                if bala.rect.colliderect(obstaculo.rect):
-                    if obstaculo.destructible:
-                        if obstaculo.recibir_daño():
-                            self.obstaculos.remove(obstaculo)
-                            # Efecto de destrucción
-                            self.crear_efecto_explosion(obstaculo.x + 20, obstaculo.y + 20)
-                    self.balas.remove(bala)
-                    break
-            
-            # Si la bala fue destruida por un obstáculo, no continuar.
-            if bala not in self.balas:
-                continue
-                
-            # Colisión con tanques
-            if self._manejar_colision_bala_tanque(bala, self.tanque1, self.tanque2):
-                continue # La bala fue destruida, pasar a la siguiente
-            if self._manejar_colision_bala_tanque(bala, self.tanque2, self.tanque1):
-                continue
-    
-    def actualizar_invulnerabilidad(self):
-        """Actualiza el estado de invulnerabilidad de los tanques."""
-        tiempo_actual = pygame.time.get_ticks()
-        for tanque in self.tanques:
-            if tanque.invulnerable and tiempo_actual - tanque.tiempo_invulnerable > 2000:
-                tanque.invulnerable = False
-    
-    def crear_efecto_explosion(self, x, y):
-        """Crea un efecto visual de explosión con partículas y ondas expansivas."""
-        # Se calcula un "presupuesto" de efectos para no sobrecargar el motor y causar lag.
-        espacio_disponible = s.MAX_EFECTOS - len(self.efectos)
-        if espacio_disponible <= 0:
-            return
 
-        # Efecto principal de explosión
-        self.efectos.append(effects.Explosion(x, y))
-        # Onda expansiva
-        self.efectos.append(effects.Onda(x, y))
-        # Destello central
-        self.efectos.append(effects.Destello(x, y))
-
-        # Partículas de la explosión
-        colores_fuego = [s.AMARILLO_FUEGO, s.NARANJA_FUEGO, s.ROJO_FUEGO]
-        num_particulas = min(s.PARTICULAS_EXPLOSION, espacio_disponible - 3) # -3 por los 3 efectos principales.
-        for _ in range(num_particulas):
-            angulo = random.uniform(0, 2 * math.pi)
-            velocidad = random.uniform(2, 5)
-            dx = math.cos(angulo) * velocidad
-            dy = math.sin(angulo) * velocidad
-            color = random.choice(colores_fuego)
-            self.efectos.append(effects.Particula(x, y, dx, dy, color))
-
-        # Humo
-        num_humo = min(3, s.MAX_EFECTOS - len(self.efectos))
-        for _ in range(num_humo):
-            angulo = random.uniform(0, 2 * math.pi)
-            velocidad = random.uniform(1, 2)
-            dx = math.cos(angulo) * velocidad
-            dy = math.sin(angulo) * velocidad - 0.3
-            self.efectos.append(effects.Humo(x, y, dx, dy))
-
-        # Reproducir sonido de explosión
-        if 'explosion' in self.assets.sounds:
-            self.assets.sounds['explosion'].play()
-    
-    def reiniciar_juego(self):
-        """Reinicia el juego a su estado inicial."""
-        self.tanque1 = Tanque(100, 100, s.AZUL, {
-            'avanzar': pygame.K_w,
-            'izquierda': pygame.K_a,
-            'derecha': pygame.K_d
-        }, self)
-        
-        self.tanque2 = Tanque(800, 500, s.ROJO, {
-            'avanzar': pygame.K_i,
-            'izquierda': pygame.K_j,
-            'derecha': pygame.K_l
-        }, self)
-        
-        self.tanques = [self.tanque1, self.tanque2]
-        self.balas = []
-        self.efectos = []
-        self.obstaculos = []
-        self.crear_obstaculos()
+    def reiniciar_juego(self, semilla_mapa=None):
+        """Reinicia el juego a su estado inicial (con `semilla_mapa`, en un mapa concreto)."""
+        self.simulacion.reiniciar(semilla_mapa)
         self.estado = GameState.JUGANDO
-        self.ganador = None
         # La música continúa reproduciéndose
     
     def ejecutar(self):
         """El bucle principal del juego. Se ejecuta hasta que el jugador cierra la ventana."""
         ejecutando = True
+        tick = 1 / s.FPS
+        acumulado = 0.0  # Tiempo real aún no simulado
+        reposo_presentado = False  # El frame congelado del reposo ya está en pantalla
+        self.reloj.tick()  # El tiempo de arranque no cuenta como tiempo de juego
         while ejecutando:
-            # Delta time para un movimiento independiente de los FPS
-            dt = self.reloj.tick(s.FPS) / 1000.0
-
             # 1. Manejar eventos (común a todos los estados)
-            ejecutando = self.manejar_eventos()
-
-            # 2. Actualizar estado del juego (solo si se está jugando)
+            if reposo_presentado and self.en_reposo():
+                # Reposo: la pantalla no cambia hasta el próximo evento, así que se espera en la
+                # cola de SDL en lugar de redibujar. El tiempo bloqueado no cuenta para nada, y los
+                # eventos que no cambian lo que se ve (p. ej. mover el ratón) no provocan un frame.
+                eventos = self.esperar_eventos()
+                if not eventos:
+                    continue
+                antes = self._firma_pantalla()
+                ejecutando = self.manejar_eventos(eventos)
+                if ejecutando and self._firma_pantalla() == antes:
+                    continue
+                self.reloj.tick()
+                dt = 0.0
+                self.perfilador.iniciar_frame()
+            else:
+                # La simulación avanza a pasos fijos de 1/FPS s, desacoplada de la frecuencia de dibujado.
+                dt = self.reloj.tick(s.FPS_DIBUJO) / 1000.0
+                self.perfilador.iniciar_frame()
+                ejecutando = self.manejar_eventos()
+            self.perfilador.marcar('eventos')
+            if not ejecutando:
+                break  # ESC o cerrar la ventana: ni más ticks ni otro frame
+
+            # 2. Actualizar estado del juego (solo si se está jugando): tantos ticks como quepan
+            # en el tiempo acumulado. En un equipo lento se pierden frames, no velocidad, hasta
+            # MAX_TICKS_POR_FRAME ticks por frame; el retraso que exceda se descarta.
             if self.estado == GameState.JUGANDO:
-                self.actualizar(dt)
-                self.actualizar_efectos()
+                acumulado += dt
+                ticks = 0
+                while acumulado >= tick and self.estado == GameState.JUGANDO:
+                    if ticks and self.teclado:
+                        # Entrada por eventos: cada tick recoge lo que haya llegado justo antes.
+                        ejecutando = self.manejar_eventos()
+                        if not ejecutando:
+                            break
+                    self.actualizar(tick)
+                    acumulado -= tick
+                    ticks += 1
+                    if ticks == s.MAX_TICKS_POR_FRAME:
+                        acumulado = min(acumulado, tick)
+                        break
+                if not ejecutando:
+                    break
+            else:
+                acumulado = 0.0
 
-            # 3. Dibujar en pantalla (siempre, pero el renderizador puede cambiar según el estado)
+            # 3. Dibujar en pantalla (siempre, pero el renderizador puede cambiar según el estado),
+            # interpolando entre los dos últimos ticks.
+            self.renderer.alfa = min(1.0, acumulado / tick) if self.estado == GameState.JUGANDO else 1.0
+            self.renderer.dt = dt
             self.renderer.dibujar(self)
-        
-        # Detener la música al salir
+            if self.latencia:
+                self.latencia.presentado()
+            self.perfilador.terminar_frame()
+            # Hasta terminar el informe de arranque se sigue dibujando para vigilar la carga del audio.
+            reposo_presentado = self.informe_arranque is None and self.en_reposo()
+
+            if self.informe_arranque is not None:
+                self.informe_arranque.marcar('primer_frame')
+                if self.assets.listo.is_set():
+                    self._aplicar_musica()  # Volumen y pausa elegidos mientras cargaba el audio
+                    # Arranque completo (ventana, primer frame y audio): se informa una vez.
+                    print(self.informe_arranque)
+                    self.informe_arranque = None
+                    ejecutando = ejecutando and not self.medir_arranque
+
+        if self.exportar_perfil:
+            self.perfilador.exportar()
+        if self.latencia:
+            print(self.latencia)
+        if self.grabador:
+            self.grabador.guardar()  # Partida a medias al cerrar
+        
+        # Detener la música al salir (si el audio sigue cargando, se le da un momento para no cortarlo a medias)
+        self.assets.esperar(1.0)
         try:
             pygame.mixer.music.stop()
         except pygame.error:
@@ -552,201 +389,327 @@ class Juego:
         pygame.quit()
 
 class GameRenderer:
-    """Clase responsable de todo el dibujado del juego (La Vista)."""
-    def __init__(self, pantalla, assets):
+    """
+    Clase responsable de todo el dibujado del juego (La Vista).
+    Mantiene un fondo compuesto (capa de obstáculos + UI) que solo cambia cuando cambia el mapa,
+    un valor del HUD o la posición de la cámara. En modo de rectángulos sucios cada frame restaura
+    desde ese fondo solo las zonas que ocupaban los objetos móviles y envía a la pantalla
+    únicamente lo que ha cambiado. Solo se dibuja lo que cae dentro de la vista de la cámara.
+    """
+    # Zona de la interfaz superior (incluye la línea separadora) y zona de juego debajo de ella.
+    RECT_UI = pygame.Rect(0, 0, s.ANCHO_VENTANA, 82)
+    RECT_JUEGO = pygame.Rect(0, 82, s.ANCHO_VENTANA, s.ALTO_VENTANA - 82)
+    # Con más rectángulos que estos se actualiza la pantalla completa (más barato que muchos rects).
+    MAX_RECTS_SUCIOS = 200
+
+    def __init__(self, pantalla, assets, rectangulos_sucios=s.RECTANGULOS_SUCIOS, perfilador=None):
         self.pantalla = pantalla
         # Obtener las fuentes cargadas por el AssetManager.
         self.fuente_grande = assets.fonts.get('grande')
         self.fuente = assets.fonts.get('normal')
         self.fuente_pequeña = assets.fonts.get('pequena')
+        # Capa estática de obstáculos y fondo compuesto (obstáculos + UI).
+        self.capa_obstaculos = CapaObstaculos()
+        self.fondo = pygame.Surface(pantalla.get_size()).convert()
+        # Parte del mundo que se ve en la zona de juego
+        self.camara = Camara(self.RECT_JUEGO)
+        # Interpolación entre ticks: fracción del tick siguiente ya transcurrida (1 = estado actual)
+        # y duración del frame (para que la cámara se mueva igual a cualquier frecuencia de dibujado).
+        self.alfa = 1.0
+        self.dt = 1 / s.FPS
+        # Sprites de los efectos, convertidos al formato de la pantalla.
+        atlas_efectos.precargar()
+        # Sprites de los tanques y las balas (se dibujan al pedirse por primera vez), textos
+        # renderizados y overlay translúcido de pausa / fin de partida (se crean una vez).
+        self.sprites_tanque = CacheSpritesTanque()
+        self.sprites_bala = CacheSpritesBala()
+        self.textos = CacheTextos()
+        self.overlay = crear_overlay((s.ANCHO_VENTANA, s.ALTO_VENTANA), (0, 0, 0, 128))
+
+        # Instrumentación: marca las fases 'render' y 'flip', y panel de tiempos (F3)
+        self.perfilador = perfilador if perfilador is not None else PerfiladorNulo()
+        self.overlay_perfilador = OverlayPerfilador(self.perfilador, self.fuente_pequeña)
+
+        # Estado del modo de rectángulos sucios
+        self.rectangulos_sucios = rectangulos_sucios
+        self._redibujar_todo = True
+        self._zonas_fondo = []  # Zonas del fondo que han cambiado desde el último frame
+        self._rects_anteriores = []  # Zonas ocupadas por objetos móviles en el último frame
+        self._estado_ui = None  # Valores del HUD dibujados en el fondo
+        self._estado_anterior = None
+
+    # ---- OBSERVADOR DE LA SIMULACIÓN ----
+
+    def mapa_creado(self, simulacion):
+        """Mapa nuevo: se reconstruye la capa de obstáculos y el siguiente frame se dibuja completo."""
+        self.camara.ajustar_mundo(simulacion.tamaño_mundo)
+        self.camara.centrar(simulacion.tanques)
+        self.capa_obstaculos.mapa_creado(simulacion)
+        self.invalidar_todo()
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        """Redibuja la zona del obstáculo en la capa y, si se ve, en el fondo, y la marca como sucia."""
+        self.capa_obstaculos.obstaculo_modificado(obstaculo, destruido)
+        zona = obstaculo.rect.inflate(CapaObstaculos.MARGEN * 2, CapaObstaculos.MARGEN * 2).clip(self.camara.rect)
+        if zona:
+            zona_pantalla = self.camara.a_pantalla(zona)
+            self.capa_obstaculos.dibujar(self.fondo, zona, zona_pantalla.topleft)
+            self._zonas_fondo.append(zona_pantalla)
+
+    def invalidar_todo(self):
+        """Fuerza a que el siguiente frame recomponga el fondo y actualice la pantalla completa."""
+        self._redibujar_todo = True
+
+    @property
+    def redibujo_pendiente(self):
+        """True si el siguiente frame va a recomponer la pantalla completa (ver `invalidar_todo`)."""
+        return self._redibujar_todo
+
+    # ---- DIBUJADO ----
+
+    def _actualizar_fondo(self, juego):
+        """Recompone el fondo si hace falta y redibuja la UI solo cuando cambian sus valores."""
+        if self._redibujar_todo:
+            self.fondo.fill(self.capa_obstaculos.color_fondo, self.RECT_UI)
+            self.capa_obstaculos.dibujar(self.fondo, self.camara.rect, self.RECT_JUEGO.topleft)
+            self._estado_ui = None
+        sim = juego.simulacion
+        estado_ui = (self.marcador(sim), juego.musica_pausada, int(juego.volumen_actual * 100))
+        if estado_ui != self._estado_ui:
+            self.dibujar_ui(juego)
+            self._zonas_fondo.append(self.RECT_UI)
+            self._estado_ui = estado_ui
 
     def dibujar(self, juego):
         """Dibuja todos los elementos del juego."""
-        self.pantalla.fill(s.NEGRO)
-        # El orden de dibujado es importante: fondo, obstáculos, tanques, balas, efectos, UI.
-        
-        for obstaculo in juego.obstaculos:
-            self.dibujar_obstaculo(obstaculo)
-        
-        if juego.tanque1.vidas > 0:
-            self.dibujar_tanque(juego.tanque1)
-        if juego.tanque2.vidas > 0:
-            self.dibujar_tanque(juego.tanque2)
-        
-        for bala in juego.balas:
-            self.dibujar_bala(bala)
-        
-        self.dibujar_efectos(juego.efectos)
-        self.dibujar_ui(juego)
-        
+        # Si la cámara se mueve cambia todo el fondo de la zona de juego.
+        if self.camara.seguir(juego.tanques_camara(), self.dt):
+            self.invalidar_todo()
+        self._actualizar_fondo(juego)
+        # Solo se dibuja parcialmente mientras se juega; los overlays y cambios de estado van completos.
+        # Con demasiadas zonas que restaurar (p. ej. miles de partículas) sale más barato copiar todo el fondo.
+        parcial = (self.rectangulos_sucios and not self._redibujar_todo and
+                   len(self._rects_anteriores) + len(self._zonas_fondo) <= self.MAX_RECTS_SUCIOS and
+                   juego.estado == GameState.JUGANDO and self._estado_anterior == GameState.JUGANDO)
+
+        # El orden de dibujado es importante: fondo (obstáculos + UI), tanques, balas, efectos, overlays.
+        if parcial:
+            # Borrar los objetos móviles del frame anterior y copiar las zonas de fondo cambiadas.
+            for zona in self._rects_anteriores + self._zonas_fondo:
+                self.pantalla.blit(self.fondo, zona, area=zona)
+        else:
+            self.pantalla.blit(self.fondo, (0, 0))
+
+        # Los objetos móviles nunca tapan la UI.
+        self.pantalla.set_clip(self.RECT_JUEGO)
+        rects = self.dibujar_escena(juego.simulacion)
+        self.pantalla.set_clip(None)
+
         # Dibujar overlays según el estado del juego
         if juego.estado == GameState.FIN_PARTIDA:
             self.dibujar_pantalla_fin(juego)
         elif juego.estado == GameState.PAUSA:
             self.dibujar_pantalla_pausa()
 
+        # Panel de tiempos por fase (esquina inferior izquierda)
+        rect_panel = self.overlay_perfilador.dibujar(self.pantalla)
+        if rect_panel:
+            rects.append(rect_panel)
+        self.perfilador.marcar('render')
+
         # Actualiza la pantalla para mostrar todo lo dibujado.
-        pygame.display.flip()
+        sucios = self._rects_anteriores + self._zonas_fondo + rects
+        if parcial and len(sucios) <= self.MAX_RECTS_SUCIOS:
+            pygame.display.update(sucios)
+        else:
+            pygame.display.flip()
+        self.perfilador.marcar('flip')
 
-    def dibujar_tanque(self, tanque):
-        """Dibuja un tanque, su cañón y sus indicadores de vida."""
+        self._rects_anteriores = rects
+        self._zonas_fondo = []
+        self._redibujar_todo = False
+        self._estado_anterior = juego.estado
+
+    def dibujar_escena(self, sim):
+        """
+        Dibuja tanques, balas y efectos que caen dentro de la vista de la cámara.
+        Devuelve los Rects (de pantalla) que han ocupado.
+        """
+        vista = self.camara.rect
+        dx, dy = self.camara.desplazamiento
+        # Tanques y balas se dibujan entre su posición del tick anterior y la actual.
+        retraso = 1.0 - self.alfa
+        rects = []
+        # Margen para el cañón y los indicadores de vida, que sobresalen del cuerpo.
+        vista_tanques = vista.inflate(60, 60)
+        for tanque in sim.tanques:
+            if tanque.vidas > 0 and vista_tanques.colliderect(tanque.rect):
+                rect = self.dibujar_tanque(tanque, dx + (tanque.x_anterior - tanque.x) * retraso,
+                                           dy + (tanque.y_anterior - tanque.y) * retraso,
+                                           tanque.angulo + (tanque.angulo_anterior - tanque.angulo) * retraso)
+                if rect:
+                    rects.append(rect)
+
+        vista_balas = vista.inflate(40, 40)
+        for bala in sim.balas:
+            if vista_balas.collidepoint(bala.x, bala.y):
+                rects.append(self.dibujar_bala(bala, dx + (bala.x_anterior - bala.x) * retraso,
+                                               dy + (bala.y_anterior - bala.y) * retraso))
+
+        rects.extend(self.dibujar_efectos(sim.efectos, sim.particulas, vista, (dx, dy)))
+        return rects
+
+    def dibujar_tanque(self, tanque, dx=0, dy=0, angulo=None):
+        """
+        Dibuja un tanque, su cañón y sus indicadores de vida (un sprite de `sprites_tanque`),
+        desplazado (dx, dy) desde su posición en el mundo. `angulo` sustituye al del tanque
+        (al interpolar). Devuelve el Rect ocupado (o None).
+        """
+        if angulo is None:
+            angulo = tanque.angulo
         tiempo_actual = pygame.time.get_ticks()
         # Efecto de parpadeo cuando el tanque es invulnerable.
         if tanque.invulnerable and (tiempo_actual // 100) % 2:
-            return
+            return None
+        sprite, (margen_x, margen_y) = self.sprites_tanque.obtener(tanque.color, tanque.ancho, tanque.alto, angulo,
+                                                                  tanque.vidas, tanque.invulnerable)
+        return self.pantalla.blit(sprite, (int(tanque.x + dx) - margen_x, int(tanque.y + dy) - margen_y))
 
-        # Cuerpo del tanque
-        pygame.draw.rect(self.pantalla, tanque.color, (tanque.x, tanque.y, tanque.ancho, tanque.alto))
-        pygame.draw.rect(self.pantalla, s.BLANCO, (tanque.x + 2, tanque.y + 2, tanque.ancho - 4, tanque.alto - 4), 2)
-        
-        # Cañón del tanque, apuntando en la dirección del ángulo.
-        cañon_x = tanque.x + tanque.ancho // 2 + math.cos(tanque.angulo) * 20
-        cañon_y = tanque.y + tanque.alto // 2 + math.sin(tanque.angulo) * 20
-        pygame.draw.line(self.pantalla, tanque.color, 
-                        (tanque.x + tanque.ancho // 2, tanque.y + tanque.alto // 2),
-                        (cañon_x, cañon_y), 5)
-        
-        # Indicadores de vida sobre el tanque.
-        for i in range(tanque.vidas):
-            color_vida = s.ROJO
-            pygame.draw.circle(self.pantalla, color_vida, 
-                             (int(tanque.x + 5 + i * 8), int(tanque.y - 10)), 4)
-            pygame.draw.circle(self.pantalla, s.BLANCO, 
-                             (int(tanque.x + 5 + i * 8), int(tanque.y - 10)), 4, 1)
-
-    def dibujar_bala(self, bala):
-        """Dibuja una bala con un efecto de estela para dar sensación de velocidad."""
-        num_estelas = 4
-        for i in range(num_estelas):
-            distancia = i * 3
-            alpha = int(150 * (1 - i/num_estelas))
-            pos_x = int(bala.x - math.cos(bala.angulo) * distancia)
-            pos_y = int(bala.y - math.sin(bala.angulo) * distancia)
-            radio_estela = max(1, bala.radio - i)
-            
-            surf = pygame.Surface((radio_estela*2, radio_estela*2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, (*bala.color[:3], alpha), (radio_estela, radio_estela), radio_estela)
-            self.pantalla.blit(surf, (pos_x - radio_estela, pos_y - radio_estela))
-
-        # Dibuja el núcleo brillante de la bala.
-        pygame.draw.circle(self.pantalla, bala.color, (int(bala.x), int(bala.y)), bala.radio)
-        pygame.draw.circle(self.pantalla, s.BLANCO_BRILLANTE, (int(bala.x), int(bala.y)), bala.radio - 1)
-
-    def dibujar_obstaculo(self, obstaculo):
-        """Dibuja un obstáculo según su tipo (Roca, Arbusto, etc.)."""
-        if isinstance(obstaculo, Arbusto):
-            pygame.draw.rect(self.pantalla, s.MARRON, (obstaculo.x + 15, obstaculo.y + 30, 10, 10))
-            color_verde = s.VERDE_OSCURO if obstaculo.salud == obstaculo.salud_max else s.VERDE_CLARO
-            pygame.draw.circle(self.pantalla, color_verde, (obstaculo.x + 8, obstaculo.y + 8), 12)
-            pygame.draw.circle(self.pantalla, color_verde, (obstaculo.x + 32, obstaculo.y + 12), 14)
-            pygame.draw.circle(self.pantalla, color_verde, (obstaculo.x + 20, obstaculo.y + 25), 10)
-            pygame.draw.circle(self.pantalla, color_verde, (obstaculo.x + 12, obstaculo.y + 20), 8)
-            pygame.draw.circle(self.pantalla, color_verde, (obstaculo.x + 28, obstaculo.y + 28), 9)
-            if obstaculo.salud < obstaculo.salud_max:
-                pygame.draw.circle(self.pantalla, s.ROJO, (obstaculo.x + 20, obstaculo.y + 20), 3)
-        elif isinstance(obstaculo, Roca):
-            pygame.draw.rect(self.pantalla, s.GRIS, obstaculo.rect)
-            pygame.draw.rect(self.pantalla, s.GRIS_CLARO, (obstaculo.x + 2, obstaculo.y + 2, obstaculo.ancho - 4, obstaculo.alto - 4))
-            pygame.draw.polygon(self.pantalla, (80, 80, 80), 
-                              [(obstaculo.x + 5, obstaculo.y + 35), (obstaculo.x + 15, obstaculo.y + 5),
-                               (obstaculo.x + 35, obstaculo.y + 10), (obstaculo.x + 30, obstaculo.y + 35)])
-            pygame.draw.polygon(self.pantalla, (60, 60, 60), 
-                              [(obstaculo.x + 10, obstaculo.y + 30), (obstaculo.x + 20, obstaculo.y + 15),
-                               (obstaculo.x + 30, obstaculo.y + 20), (obstaculo.x + 25, obstaculo.y + 32)])
-            pygame.draw.line(self.pantalla, (40, 40, 40), (obstaculo.x, obstaculo.y + 35), (obstaculo.x + 40, obstaculo.y + 35), 2)
-        elif isinstance(obstaculo, Muro):
-            pygame.draw.rect(self.pantalla, s.MARRON_LADRILLO, obstaculo.rect)
-            for fila in range(4):
-                for col in range(4):
-                    color_ladrillo = (139, 69, 19) if (fila + col) % 2 == 0 else (160, 82, 45)
-                    ladrillo_rect = pygame.Rect(obstaculo.x + col * 10, obstaculo.y + fila * 10, 10, 10)
-                    pygame.draw.rect(self.pantalla, color_ladrillo, ladrillo_rect)
-                    pygame.draw.rect(self.pantalla, (50, 50, 50), ladrillo_rect, 1)
-        elif isinstance(obstaculo, CajaMadera):
-            # Dibujar caja de madera
-            pygame.draw.rect(self.pantalla, s.MARRON_CAJA, obstaculo.rect)
-            pygame.draw.rect(self.pantalla, s.MARRON_CAJA_OSCURO, obstaculo.rect, 3)
-            # Líneas para simular tablas
-            pygame.draw.line(self.pantalla, s.MARRON_CAJA_OSCURO, (obstaculo.x, obstaculo.y + 20), (obstaculo.x + 40, obstaculo.y + 20), 2)
-            pygame.draw.line(self.pantalla, s.MARRON_CAJA_OSCURO, (obstaculo.x + 20, obstaculo.y), (obstaculo.x + 20, obstaculo.y + 40), 2)
-
-    def dibujar_efectos(self, efectos):
-        """Dibuja todos los efectos visuales llamando a su propio método de dibujado."""
+    def dibujar_bala(self, bala, dx=0, dy=0):
+        """
+        Dibuja una bala con un efecto de estela para dar sensación de velocidad (un sprite de
+        `sprites_bala`), desplazada (dx, dy) desde su posición en el mundo. Devuelve el Rect ocupado.
+        """
+        sprite, centro = self.sprites_bala.obtener(bala.color, bala.radio, bala.angulo)
+        return self.pantalla.blit(sprite, (int(bala.x + dx) - centro, int(bala.y + dy) - centro))
+
+    def dibujar_efectos(self, efectos, particulas, vista=None, desplazamiento=(0, 0)):
+        """
+        Dibuja los efectos visuales llamando a su propio método de dibujado, y luego las partículas.
+        Con `vista` (Rect del mundo) se omiten los que quedan fuera. Devuelve los Rects afectados.
+        """
+        dx, dy = desplazamiento
+        # Margen: radio máximo de una onda expansiva.
+        vista_efectos = vista.inflate(100, 100) if vista is not None else None
+        rects = []
         for efecto in efectos:
-            efecto.dibujar(self.pantalla)
+            if vista_efectos is not None and not vista_efectos.collidepoint(efecto.x, efecto.y):
+                continue
+            rect = efecto.dibujar(self.pantalla, dx, dy)
+            if rect:
+                rects.append(rect)
+        rects.extend(particulas.dibujar(self.pantalla, vista, desplazamiento))
+        return rects
+
+    def marcador(self, sim):
+        """
+        Líneas (texto, color) del marcador del HUD: la puntuación de cada tanque en un duelo; con
+        más tanques, cuántos quedan vivos y los tres con más puntos.
+        """
+        if len(sim.tanques) == 2:
+            return tuple((f"{t.nombre.replace('Tanque ', '')}: {t.puntuacion}", t.color) for t in sim.tanques)
+        vivos = sum(t.vidas > 0 for t in sim.tanques)
+        mejores = sorted(sim.tanques, key=lambda t: -t.puntuacion)[:3]
+        return ((f"Vivos: {vivos}/{len(sim.tanques)}", s.BLANCO),) + tuple(
+            (f"{i}. {t.nombre.replace('Tanque ', '')}: {t.puntuacion}", t.color) for i, t in enumerate(mejores, 1))
 
     def dibujar_ui(self, juego):
-        """Dibuja la interfaz de usuario en la parte superior de la pantalla."""
+        """Dibuja la interfaz de usuario en la parte superior del fondo compuesto."""
         # Fondo de la UI
-        pygame.draw.rect(self.pantalla, (50, 50, 50), (0, 0, s.ANCHO_VENTANA, 80))
-        pygame.draw.line(self.pantalla, s.BLANCO, (0, 80), (s.ANCHO_VENTANA, 80), 2)
+        pygame.draw.rect(self.fondo, (50, 50, 50), (0, 0, s.ANCHO_VENTANA, 80))
+        pygame.draw.line(self.fondo, s.BLANCO, (0, 80), (s.ANCHO_VENTANA, 80), 2)
         
-        # Puntuaciones de los jugadores
-        texto_puntuacion1 = self.fuente.render(f"Azul: {juego.tanque1.puntuacion}", True, s.AZUL) if self.fuente else None
-        texto_puntuacion2 = self.fuente.render(f"Rojo: {juego.tanque2.puntuacion}", True, s.ROJO) if self.fuente else None
-        self.pantalla.blit(texto_puntuacion1, (10, 10))
-        self.pantalla.blit(texto_puntuacion2, (10, 40))
+        # Puntuaciones de los jugadores (solo se renderizan de nuevo si cambian)
+        lineas = self.marcador(juego.simulacion)
+        # Dos líneas caben con la fuente normal; el marcador de todos contra todos va en pequeño.
+        fuente, alto_linea, y0 = (self.fuente, 30, 10) if len(lineas) <= 2 else (self.fuente_pequeña, 18, 6)
+        if fuente:
+            for i, (texto, color) in enumerate(lineas):
+                self.fondo.blit(self.textos.render(fuente, texto, color), (10, y0 + i * alto_linea))
         
         # Instrucciones de control en el centro
         instrucciones = ["Azul: W/A/D | Rojo: I/J/L", "P=Pausa | R=Reiniciar | M=Música | +/-=Volumen | ESC=Salir"]
         if self.fuente_pequeña:
             for i, instruccion in enumerate(instrucciones):
-                texto = self.fuente_pequeña.render(instruccion, True, s.AMARILLO)
+                texto = self.textos.render(self.fuente_pequeña, instruccion, s.AMARILLO)
                 x_pos = (s.ANCHO_VENTANA - texto.get_width()) // 2
                 y_pos = 15 + i * 25
-                self.pantalla.blit(texto, (x_pos, y_pos))
+                self.fondo.blit(texto, (x_pos, y_pos))
         
         # Estado de la música y volumen a la derecha
         estado_musica = "Música: ON" if not juego.musica_pausada else "Música: OFF"
         color_musica = s.VERDE if not juego.musica_pausada else s.ROJO
         if self.fuente_pequeña:
-            texto_musica = self.fuente_pequeña.render(estado_musica, True, color_musica)
-            self.pantalla.blit(texto_musica, (s.ANCHO_VENTANA - 120, 10))
+            texto_musica = self.textos.render(self.fuente_pequeña, estado_musica, color_musica)
+            self.fondo.blit(texto_musica, (s.ANCHO_VENTANA - 120, 10))
             
-            texto_volumen = self.fuente_pequeña.render(f"Vol: {int(juego.volumen_actual * 100)}%", True, s.BLANCO)
-            self.pantalla.blit(texto_volumen, (s.ANCHO_VENTANA - 120, 30))
+            texto_volumen = self.textos.render(self.fuente_pequeña, f"Vol: {int(juego.volumen_actual * 100)}%", s.BLANCO)
+            self.fondo.blit(texto_volumen, (s.ANCHO_VENTANA - 120, 30))
 
     def dibujar_pantalla_fin(self, juego):
         """Dibuja la pantalla de fin de partida sobre el juego."""
-        overlay = pygame.Surface((s.ANCHO_VENTANA, s.ALTO_VENTANA), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.pantalla.blit(overlay, (0, 0))
+        self.pantalla.blit(self.overlay, (0, 0))
         
+        if not (self.fuente_grande and self.fuente):
+            return
         if juego.ganador == "Empate":
-            texto_fin = self.fuente_grande.render("¡EMPATE!", True, s.AMARILLO) if self.fuente_grande else None
+            texto_fin = self.textos.render(self.fuente_grande, "¡EMPATE!", s.AMARILLO)
         else:
-            texto_fin = self.fuente_grande.render(f"¡{juego.ganador} GANA!", True, s.AMARILLO) if self.fuente_grande else None
+            texto_fin = self.textos.render(self.fuente_grande, f"¡{juego.ganador} GANA!", s.AMARILLO)
+        texto_reiniciar = self.textos.render(self.fuente, "Presiona R para reiniciar", s.BLANCO)
         
-        texto_reiniciar = self.fuente.render("Presiona R para reiniciar", True, s.BLANCO) if self.fuente else None
+        rect_fin = texto_fin.get_rect(center=(s.ANCHO_VENTANA//2, s.ALTO_VENTANA//2 - 50))
+        rect_reiniciar = texto_reiniciar.get_rect(center=(s.ANCHO_VENTANA//2, s.ALTO_VENTANA//2 + 20))
         
-        if texto_fin and texto_reiniciar:
-            rect_fin = texto_fin.get_rect(center=(s.ANCHO_VENTANA//2, s.ALTO_VENTANA//2 - 50))
-            rect_reiniciar = texto_reiniciar.get_rect(center=(s.ANCHO_VENTANA//2, s.ALTO_VENTANA//2 + 20))
-            
-            self.pantalla.blit(texto_fin, rect_fin)
-            self.pantalla.blit(texto_reiniciar, rect_reiniciar)
+        self.pantalla.blit(texto_fin, rect_fin)
+        self.pantalla.blit(texto_reiniciar, rect_reiniciar)
 
     def dibujar_pantalla_pausa(self):
         """Dibuja la pantalla de pausa."""
-        overlay = pygame.Surface((s.ANCHO_VENTANA, s.ALTO_VENTANA), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.pantalla.blit(overlay, (0, 0))
+        self.pantalla.blit(self.overlay, (0, 0))
 
         if self.fuente_grande:
-            texto_pausa = self.fuente_grande.render("PAUSA", True, s.AMARILLO)
+            texto_pausa = self.textos.render(self.fuente_grande, "PAUSA", s.AMARILLO)
             rect_pausa = texto_pausa.get_rect(center=(s.ANCHO_VENTANA // 2, s.ALTO_VENTANA // 2))
             self.pantalla.blit(texto_pausa, rect_pausa)
 
+def leer_tamaño_arena(argumentos):
+    """Devuelve (ancho, alto) de un argumento `--arena=ANCHOxALTO`, o None si no se indica."""
+    for argumento in argumentos:
+        if argumento.startswith('--arena='):
+            ancho, alto = argumento.split('=', 1)[1].lower().split('x')
+            return int(ancho), int(alto)
+    return None
+
+def leer_num_tanques(argumentos):
+    """Devuelve el número de tanques de un argumento `--tanques=N` (2 si no se indica)."""
+    for argumento in argumentos:
+        if argumento.startswith('--tanques='):
+            return int(argumento.split('=', 1)[1])
+    return 2
+
 def main():
     """Función principal (entry point) que crea una instancia del juego y la ejecuta."""
     print("¡Bienvenido al Juego de Tanques!")
     print("Controles:")
     print("Tanque Azul: W=Avanzar/Disparar, A/D=Girar")
-    print("Tanque Rojo: I=Avanzar/Disparar, J/L=Girar")
-    print("P=Pausa | R=Reiniciar | M=Música | +/-=Volumen | ESC=Salir")
+    print("Tanque Rojo: I=Avanzar/Disparar, J/L=Girar (con --bot lo controla el ordenador)")
+    print("P=Pausa | R=Reiniciar | M=Música | +/-=Volumen | F3=Tiempos | ESC=Salir")
     
     try:
-        juego = Juego()
+        juego = Juego(exportar_perfil='--perfil' in sys.argv[1:],
+                      tamaño_mundo=leer_tamaño_arena(sys.argv[1:]),
+                      grabar='--grabar' in sys.argv[1:],
+                      bot='--bot' in sys.argv[1:],
+                      medir_arranque='--medir-arranque' in sys.argv[1:],
+                      entrada_eventos='--entrada-eventos' in sys.argv[1:],
+                      medir_latencia='--latencia' in sys.argv[1:],
+                      num_tanques=leer_num_tanques(sys.argv[1:]))
+        sin_sitio = juego.simulacion.obstaculos_sin_sitio
+        if sin_sitio:
+            ancho, alto = juego.simulacion.tamaño_mundo
+            print(f"Advertencia: en una arena de {ancho}x{alto} no caben {sin_sitio} obstáculos; "
+                  f"usa una --arena mayor para tantos tanques.")
         juego.ejecutar()
     except Exception as e:
         print(f"Error al ejecutar el juego: {e}")
@@ -0,0 +1,161 @@
+import numpy as np
+from sprites import atlas_efectos, AtlasEfectos
+import settings as s
+
+
+class SistemaParticulas:
+    """
+    Motor de partículas vectorizado (struct-of-arrays con NumPy).
+    Sustituye a los antiguos objetos `Particula` y `Humo`: posición, velocidad, edad, radio y
+    color se guardan en arrays y la gravedad, la fricción y la caducidad se aplican a todo
+    el lote en cada tick. Las partículas vivas ocupan siempre los primeros `self.num` huecos.
+    """
+    COLORES_FUEGO = (s.AMARILLO_FUEGO, s.NARANJA_FUEGO, s.ROJO_FUEGO)
+
+    def __init__(self, capacidad=None, semilla=None):
+        capacidad = s.MAX_PARTICULAS if capacidad is None else capacidad
+        self.capacidad = capacidad
+        self.rng = np.random.default_rng(semilla)
+        self.paleta = [*self.COLORES_FUEGO, s.GRIS]
+        self.num = 0
+
+        # Posición y velocidad
+        self.x = np.zeros(capacidad)
+        self.y = np.zeros(capacidad)
+        self.dx = np.zeros(capacidad)
+        self.dy = np.zeros(capacidad)
+        # Edad y duración (en ticks)
+        self.tiempo = np.zeros(capacidad, dtype=np.int32)
+        self.max_tiempo = np.zeros(capacidad, dtype=np.int32)
+        # Física: gravedad por tick y fricción multiplicativa
+        self.gravedad = np.zeros(capacidad)
+        self.friccion = np.ones(capacidad)
+        # Aspecto: radio inicial, crecimiento relativo al final de la vida, opacidad inicial y color
+        self.radio_inicial = np.zeros(capacidad, dtype=np.int32)
+        self.crecimiento = np.zeros(capacidad)
+        self.alpha_inicial = np.zeros(capacidad, dtype=np.int32)
+        self.color = np.zeros(capacidad, dtype=np.int32)  # Índice en `self.paleta`
+        # Sprites para dibujar en lote: clave entera (color, radio, nivel de alpha) -> Surface
+        self._sprites = {}
+
+    def __len__(self):
+        return self.num
+
+    def vaciar(self, semilla=None):
+        """Elimina todas las partículas. Con `semilla` también reinicia el generador aleatorio."""
+        self.num = 0
+        if semilla is not None:
+            self.rng = np.random.default_rng(semilla)
+
+    def _reservar(self, cantidad):
+        """Devuelve el slice de huecos libres para `cantidad` partículas (recortado a la capacidad)."""
+        cantidad = max(0, min(cantidad, self.capacidad - self.num))
+        huecos = slice(self.num, self.num + cantidad)
+        self.num += cantidad
+        return huecos, cantidad
+
+    def _emitir_radial(self, huecos, cantidad, x, y, vel_min, vel_max):
+        angulos = self.rng.uniform(0, 2 * np.pi, cantidad)
+        velocidades = self.rng.uniform(vel_min, vel_max, cantidad)
+        self.x[huecos] = x
+        self.y[huecos] = y
+        self.dx[huecos] = np.cos(angulos) * velocidades
+        self.dy[huecos] = np.sin(angulos) * velocidades
+        self.tiempo[huecos] = 0
+        self.max_tiempo[huecos] = s.DURACION_EXPLOSION
+
+    def emitir_fuego(self, x, y, cantidad):
+        """Partículas de explosión: salen disparadas y caen con gravedad y fricción."""
+        huecos, cantidad = self._reservar(cantidad)
+        if not cantidad:
+            return
+        self._emitir_radial(huecos, cantidad, x, y, 2, 5)
+        self.gravedad[huecos] = 0.15
+        self.friccion[huecos] = 0.95
+        self.radio_inicial[huecos] = self.rng.integers(2, 5, cantidad)
+        self.crecimiento[huecos] = 0.0
+        self.alpha_inicial[huecos] = 200
+        self.color[huecos] = self.rng.integers(0, len(self.COLORES_FUEGO), cantidad)
+
+    def emitir_humo(self, x, y, cantidad):
+        """Partículas de humo: suben despacio, se expanden y se desvanecen."""
+        huecos, cantidad = self._reservar(cantidad)
+        if not cantidad:
+            return
+        self._emitir_radial(huecos, cantidad, x, y, 1, 2)
+        self.dy[huecos] -= 0.3
+        self.gravedad[huecos] = 0.0
+        self.friccion[huecos] = 0.98
+        self.radio_inicial[huecos] = self.rng.integers(3, 7, cantidad)
+        self.crecimiento[huecos] = 0.5
+        self.alpha_inicial[huecos] = self.rng.integers(100, 181, cantidad)
+        self.color[huecos] = self.paleta.index(s.GRIS)
+
+    def actualizar(self):
+        """Avanza un tick todas las partículas y compacta las que han caducado en una sola pasada."""
+        n = self.num
+        if not n:
+            return
+        self.tiempo[:n] += 1
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+        self.dy[:n] += self.gravedad[:n]
+        self.dx[:n] *= self.friccion[:n]
+        self.dy[:n] *= self.friccion[:n]
+
+        vivas = self.tiempo[:n] < self.max_tiempo[:n]
+        quedan = int(np.count_nonzero(vivas))
+        if quedan < n:
+            for array in (self.x, self.y, self.dx, self.dy, self.tiempo, self.max_tiempo,
+                          self.gravedad, self.friccion, self.radio_inicial, self.crecimiento,
+                          self.alpha_inicial, self.color):
+                array[:quedan] = array[:n][vivas]
+            self.num = quedan
+
+    def dibujar(self, pantalla, vista=None, desplazamiento=(0, 0)):
+        """
+        Dibuja las partículas vivas con los sprites del atlas de efectos. Devuelve una lista con el Rect
+        que las envuelve a todas (vacía si no se dibuja ninguna).
+        Con `vista` (Rect del mundo) solo se dibujan las que caen cerca de ella, desplazadas
+        `desplazamiento` píxeles para pasar de coordenadas del mundo a la pantalla.
+        La opacidad se redondea a `AtlasEfectos.NIVELES_ALFA` niveles, así cada partícula es un
+        sprite ya preparado y todas se dibujan con una sola llamada a `Surface.blits`.
+        """
+        n = self.num
+        if not n:
+            return []
+        if vista is not None:
+            margen = 32  # Radio máximo aproximado de una partícula de humo
+            x, y = self.x[:n], self.y[:n]
+            indices = np.flatnonzero((x > vista.left - margen) & (x < vista.right + margen) &
+                                     (y > vista.top - margen) & (y < vista.bottom + margen))
+            if not len(indices):
+                return []
+        else:
+            indices = np.arange(n)
+        progreso = self.tiempo[indices] / self.max_tiempo[indices]
+        alphas = (self.alpha_inicial[indices] * (1 - progreso)).astype(np.int32)
+        radios = (self.radio_inicial[indices] * (1 + progreso * self.crecimiento[indices])).astype(np.int32)
+        niveles = AtlasEfectos.NIVELES_ALFA
+        nivel = (alphas * (niveles - 1) + 127) // 255
+        visibles = (nivel > 0) & (radios > 0)
+        indices, radios, nivel = indices[visibles], radios[visibles], nivel[visibles]
+        if not len(indices):
+            return []
+
+        # Clave entera de cada sprite; los que aún no se han usado se piden al atlas una vez.
+        colores = self.color[indices]
+        claves = (colores * 64 + radios) * niveles + nivel  # radio < 64
+        sprites = self._sprites
+        for clave in np.unique(claves).tolist():
+            if clave not in sprites:
+                resto, nivel_sprite = divmod(clave, niveles)
+                color, radio = divmod(resto, 64)
+                sprites[clave] = atlas_efectos.con_alfa(AtlasEfectos.CIRCULO, self.paleta[color], radio, nivel_sprite)
+        dx, dy = desplazamiento
+        xs = ((self.x[indices] + dx).astype(np.int32) - radios).tolist()
+        ys = ((self.y[indices] + dy).astype(np.int32) - radios).tolist()
+        rects = pantalla.blits(zip(map(sprites.__getitem__, claves.tolist()), zip(xs, ys)))
+        # Un solo rectángulo para todas: con cientos de partículas, restaurar y enviar a la pantalla
+        # su envolvente es más barato que hacerlo partícula a partícula.
+        return [rects[0].unionall(rects)]
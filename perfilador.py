@@ -0,0 +1,236 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+import settings as s
+
+
+class PerfiladorNulo:
+    """Perfilador que no mide nada (por defecto en la simulación sin ventana)."""
+    def iniciar_frame(self):
+        pass
+
+    def marcar(self, fase):
+        pass
+
+    def terminar_frame(self):
+        pass
+
+
+class Perfilador:
+    """
+    Mide cuánto dura cada fase del frame y guarda los últimos `capacidad` frames en un buffer circular.
+    Uso: `iniciar_frame()`, `marcar(fase)` al terminar cada fase (el tiempo desde la marca anterior
+    se suma a esa fase) y `terminar_frame()`. La columna 'frame' es la duración total del frame,
+    de `iniciar_frame()` a `terminar_frame()`, en la misma fila que sus fases; las esperas entre
+    frames (`Clock.tick` o la cola de eventos en reposo) no cuentan.
+    """
+    FASES = ('eventos', 'tanques', 'balas', 'colisiones', 'efectos', 'render', 'flip')
+    COLUMNAS = FASES + ('frame',)
+
+    def __init__(self, capacidad=s.PERFILADOR_FRAMES):
+        self.capacidad = capacidad
+        self.datos = np.zeros((capacidad, len(self.COLUMNAS)))  # ms
+        self.indice = 0  # Próxima fila a escribir
+        self.num = 0  # Filas válidas
+        self._columna = {fase: i for i, fase in enumerate(self.COLUMNAS)}
+        self._actual = [0.0] * len(self.COLUMNAS)
+        self._ultimo = time.perf_counter()
+        self._inicio_frame = self._ultimo
+
+    def iniciar_frame(self):
+        """Empieza a medir un frame nuevo."""
+        self._inicio_frame = self._ultimo = time.perf_counter()
+
+    def marcar(self, fase):
+        """Suma a `fase` el tiempo transcurrido desde la marca anterior."""
+        ahora = time.perf_counter()
+        self._actual[self._columna[fase]] += (ahora - self._ultimo) * 1000
+        self._ultimo = ahora
+
+    def terminar_frame(self):
+        """Guarda el frame actual (con su duración total) en el buffer circular."""
+        self._actual[-1] = (time.perf_counter() - self._inicio_frame) * 1000
+        self.datos[self.indice] = self._actual
+        self.indice = (self.indice + 1) % self.capacidad
+        self.num = min(self.num + 1, self.capacidad)
+        self._actual = [0.0] * len(self.COLUMNAS)
+
+    def historial(self):
+        """Devuelve los frames guardados en orden cronológico (array num × columnas)."""
+        if self.num < self.capacidad:
+            return self.datos[:self.num]
+        return np.roll(self.datos, -self.indice, axis=0)
+
+    def percentiles(self, cuantiles=(50, 95, 99)):
+        """Devuelve {columna: {'p50': ms, ...}} con los percentiles de cada fase."""
+        historial = self.historial()
+        if not len(historial):
+            return {}
+        valores = np.percentile(historial, cuantiles, axis=0)
+        return {columna: {f"p{c}": round(float(valores[j, i]), 3) for j, c in enumerate(cuantiles)}
+                for i, columna in enumerate(self.COLUMNAS)}
+
+    def exportar(self, ruta_csv=s.PERFIL_CSV, ruta_json=s.PERFIL_JSON):
+        """Exporta los frames del buffer a CSV y el resumen de percentiles a JSON."""
+        with open(ruta_csv, 'w', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(self.COLUMNAS)
+            escritor.writerows(np.round(self.historial(), 4).tolist())
+        with open(ruta_json, 'w') as archivo:
+            json.dump({'frames': self.num, 'percentiles_ms': self.percentiles()}, archivo, indent=2)
+        print(f"Perfil exportado a {ruta_csv} y {ruta_json}")
+
+
+class InformeArranque:
+    """
+    Hitos del arranque en ms desde `inicio` (por defecto, al crear el informe).
+    Cada hito se guarda solo la primera vez; se puede marcar desde el hilo de carga de recursos.
+    """
+    def __init__(self, inicio=None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.hitos = {}
+
+    def marcar(self, hito):
+        """Guarda el tiempo transcurrido hasta `hito` (si no se había marcado ya)."""
+        self.hitos.setdefault(hito, (time.perf_counter() - self.inicio) * 1000)
+
+    def __str__(self):
+        hitos = sorted(self.hitos.items(), key=lambda hito: hito[1])
+        return "Arranque (ms): " + " | ".join(f"{nombre} {ms:.0f}" for nombre, ms in hitos)
+
+
+class MedidorLatencia:
+    """
+    Latencia de entrada a pantalla de las teclas de los tanques: desde que el juego recoge el
+    KEYDOWN/KEYUP de la cola de SDL hasta que se presenta el primer frame dibujado después del
+    tick que lo aplica. pygame no da la marca de tiempo de SDL, así que también se guarda el
+    tiempo desde la recogida de eventos anterior: lo más que pudo esperar el evento en la cola.
+    Uso: `recoger()` al leer la cola, `evento()` por cada tecla, `aplicado()` al leer las
+    entradas de un tick, `presentado()` tras enviar el frame a la pantalla y `descartar()`
+    mientras no se simula (pausa o fin de partida).
+    """
+    COLUMNAS = ('cola_max', 'hasta_tick', 'hasta_pantalla')
+
+    def __init__(self, capacidad=s.PERFILADOR_FRAMES):
+        self.capacidad = capacidad
+        self.muestras = np.zeros((capacidad, len(self.COLUMNAS)))  # ms
+        self.num = 0  # Muestras tomadas (las últimas `capacidad` se guardan)
+        self._pendientes = []  # (t_recogida, cola_max) de teclas aún no aplicadas
+        self._aplicadas = []  # (t_recogida, cola_max, t_tick) a la espera del frame
+        self._ultima_recogida = None
+        self._recogida = (0.0, 0.0)
+
+    def recoger(self, bloqueado=False):
+        """
+        Se va a leer la cola de eventos. Con `bloqueado` se acaba de despertar esperando en ella
+        (`pygame.event.wait`): los eventos se han recogido en cuanto llegaron.
+        """
+        ahora = time.perf_counter()
+        cola_max = 0.0 if self._ultima_recogida is None or bloqueado else ahora - self._ultima_recogida
+        self._ultima_recogida = ahora
+        self._recogida = (ahora, cola_max)
+
+    def evento(self):
+        """Se ha recogido una pulsación o liberación de una tecla de los tanques."""
+        self._pendientes.append(self._recogida)
+
+    def descartar(self):
+        """Olvida las teclas aún no aplicadas (en pausa no se aplican: su espera no es latencia)."""
+        self._pendientes.clear()
+
+    def aplicado(self):
+        """Un tick acaba de leer las entradas: las teclas pendientes ya cuentan."""
+        if self._pendientes:
+            ahora = time.perf_counter()
+            self._aplicadas.extend((t, cola, ahora) for t, cola in self._pendientes)
+            self._pendientes.clear()
+
+    def presentado(self):
+        """El frame dibujado está en pantalla: cierra las muestras de las teclas aplicadas."""
+        ahora = time.perf_counter()
+        for t, cola, t_tick in self._aplicadas:
+            self.muestras[self.num % self.capacidad] = (cola * 1000, (t_tick - t) * 1000, (ahora - t) * 1000)
+            self.num += 1
+        self._aplicadas.clear()
+
+    def percentiles(self, cuantiles=(50, 95, 99)):
+        """Devuelve {columna: {'p50': ms, ...}} de las muestras guardadas."""
+        muestras = self.muestras[:min(self.num, self.capacidad)]
+        if not len(muestras):
+            return {}
+        valores = np.percentile(muestras, cuantiles, axis=0)
+        return {columna: {f"p{c}": round(float(valores[j, i]), 2) for j, c in enumerate(cuantiles)}
+                for i, columna in enumerate(self.COLUMNAS)}
+
+    def __str__(self):
+        if not self.num:
+            return "Latencia: sin pulsaciones medidas"
+        p = self.percentiles()
+        return (f"Latencia entrada→pantalla ({self.num} teclas, ms): "
+                f"p50 {p['hasta_pantalla']['p50']:.1f} | p95 {p['hasta_pantalla']['p95']:.1f} | "
+                f"p99 {p['hasta_pantalla']['p99']:.1f} (hasta el tick: p50 {p['hasta_tick']['p50']:.1f}; "
+                f"espera previa en la cola de SDL: como mucho {p['cola_max']['p50']:.1f} en la mediana)")
+
+
+class OverlayPerfilador:
+    """
+    Panel en pantalla con p50/p95/p99 por fase y una gráfica de la duración de los frames.
+    Se reconstruye solo cada `cada_frames` frames para no medir su propio coste.
+    """
+    ANCHO = 300
+    ALTO_GRAFICA = 60
+
+    def __init__(self, perfilador, fuente, cada_frames=15):
+        self.perfilador = perfilador
+        self.fuente = fuente
+        self.cada_frames = cada_frames
+        self.visible = False
+        self.superficie = None
+        self._frames_hasta_actualizar = 0
+
+    def alternar(self):
+        """Muestra u oculta el panel."""
+        self.visible = not self.visible
+        self._frames_hasta_actualizar = 0
+
+    def dibujar(self, pantalla):
+        """Dibuja el panel en la esquina inferior izquierda si está visible. Devuelve el Rect ocupado (o None)."""
+        if not self.visible or self.fuente is None:
+            return None
+        if self._frames_hasta_actualizar <= 0 or self.superficie is None:
+            self.superficie = self._construir()
+            self._frames_hasta_actualizar = self.cada_frames
+        self._frames_hasta_actualizar -= 1
+        posicion = self.superficie.get_rect(bottomleft=(10, pantalla.get_height() - 10))
+        return pantalla.blit(self.superficie, posicion)
+
+    def _construir(self):
+        percentiles = self.perfilador.percentiles()
+        alto_linea = self.fuente.get_linesize()
+        alto = alto_linea * (len(Perfilador.COLUMNAS) + 1) + self.ALTO_GRAFICA + 12
+        superficie = pygame.Surface((self.ANCHO, alto), pygame.SRCALPHA)
+        superficie.fill((0, 0, 0, 180))
+
+        lineas = [f"{'fase':<11}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for columna in Perfilador.COLUMNAS:
+            p = percentiles.get(columna, {'p50': 0, 'p95': 0, 'p99': 0})
+            lineas.append(f"{columna:<11}{p['p50']:>7.2f}{p['p95']:>7.2f}{p['p99']:>7.2f}")
+        for i, linea in enumerate(lineas):
+            # Los números cambian a menudo: no se guardan en la caché de textos del HUD.
+            superficie.blit(self.fuente.render(linea, True, s.BLANCO), (6, 4 + i * alto_linea))
+
+        # Gráfica de la duración de cada frame (la línea amarilla marca el presupuesto de 1/FPS).
+        base = alto - 6
+        presupuesto = 1000 / s.FPS
+        escala = self.ALTO_GRAFICA / (presupuesto * 2)
+        pygame.draw.line(superficie, s.AMARILLO, (6, base - presupuesto * escala),
+                         (self.ANCHO - 6, base - presupuesto * escala), 1)
+        frames = self.perfilador.historial()[-(self.ANCHO - 12):, -1]
+        if len(frames) > 1:
+            puntos = [(6 + i, base - min(ms * escala, self.ALTO_GRAFICA)) for i, ms in enumerate(frames.tolist())]
+            pygame.draw.lines(superficie, s.VERDE, False, puntos, 1)
+        if pygame.display.get_surface() is not None:
+            superficie = superficie.convert_alpha()
+        return superficie
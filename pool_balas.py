@@ -0,0 +1,63 @@
+from itertools import islice
+from entidades import Bala
+import settings as s
+
+
+class PoolBalas:
+    """
+    Almacén pre-reservado de balas.
+    Las balas activas ocupan siempre los primeros `self.num` huecos de `self._balas`, así que
+    crear una bala es reutilizar el siguiente hueco y eliminarla es un intercambio con la
+    última activa (swap-remove), ambos en O(1) y sin crear objetos durante la partida.
+    """
+    def __init__(self, capacidad=None):
+        capacidad = s.MAX_BALAS if capacidad is None else capacidad
+        self.capacidad = capacidad
+        self._balas = [Bala() for _ in range(capacidad)]
+        self.num = 0
+        self.creadas = 0  # Balas activadas desde el principio; da a cada disparo un `id` único
+
+    def __len__(self):
+        return self.num
+
+    def __iter__(self):
+        """Recorre las balas activas."""
+        return islice(self._balas, self.num)
+
+    def __contains__(self, bala):
+        return 0 <= bala.indice < self.num and self._balas[bala.indice] is bala
+
+    def vaciar(self):
+        """Desactiva todas las balas."""
+        for bala in islice(self._balas, self.num):
+            bala.indice = -1
+        self.num = 0
+
+    def crear(self, x, y, angulo, tirador, tiempo_creacion):
+        """Activa una bala. Devuelve None si el pool está lleno."""
+        if self.num >= self.capacidad:
+            return None
+        bala = self._balas[self.num]
+        bala.reiniciar(x, y, angulo, tirador, tiempo_creacion)
+        bala.indice = self.num
+        self.creadas += 1
+        bala.id = self.creadas
+        self.num += 1
+        return bala
+
+    def eliminar(self, bala):
+        """Desactiva una bala intercambiándola con la última activa."""
+        i = bala.indice
+        ultima = self._balas[self.num - 1]
+        self._balas[i], self._balas[self.num - 1] = ultima, bala
+        ultima.indice = i
+        bala.indice = -1
+        self.num -= 1
+
+    def recorrer_inverso(self):
+        """
+        Recorre las balas activas de la última a la primera. Es seguro eliminar la bala
+        actual durante el recorrido: el swap-remove solo mueve balas ya visitadas.
+        """
+        for i in range(self.num - 1, -1, -1):
+            yield self._balas[i]
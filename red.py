@@ -0,0 +1,689 @@
+"""
+Multijugador en red sobre UDP con asyncio.
+
+El servidor ejecuta la simulación autoritativa de una o varias salas (una `Simulacion` sin
+efectos ni sonidos por sala) a `FPS` ticks por segundo. Los clientes solo envían sus teclas
+(una máscara de 3 bits) y reciben, cada `TICKS_POR_SNAPSHOT` ticks, un snapshot del estado
+codificado como delta respecto al último snapshot que han confirmado:
+  - tanques cuyo estado (cuantizado) ha cambiado,
+  - balas nuevas (posición y dirección: el cliente las extrapola) y balas desaparecidas,
+  - salud de los obstáculos dañados o destruidos (el mapa se genera en el cliente con la semilla).
+El cliente dibuja con `RETRASO_INTERPOLACION` segundos de retraso, interpolando los tanques
+entre los dos snapshots que rodean ese instante.
+
+Uso (desde la raíz del proyecto):
+    python red.py servidor [--puerto 47800] [--salas 64]
+    python red.py cliente [--host 127.0.0.1] [--puerto 47800]      # controles: W/A/D
+    python red.py prueba [--salas 4] [--latencia 0.08] [--perdida 0.1] [--segundos 10]
+`prueba` levanta un servidor y dos clientes automáticos por sala sobre loopback, con latencia y
+pérdida de paquetes simuladas, y muestra el ancho de banda por cliente y la CPU del servidor.
+"""
+import argparse
+import asyncio
+import math
+import random
+import struct
+import sys
+import time
+from typing import NamedTuple
+from simulacion import Simulacion, EntradaTanque, SIN_ENTRADA
+from repeticion import codificar_entradas, decodificar_entradas
+import settings as s
+
+# ---- PROTOCOLO ----
+# Cada datagrama empieza con un byte de tipo.
+HOLA = 1  # cliente -> servidor: quiere jugar
+BIENVENIDA = 2  # servidor -> cliente: sala, tanque asignado y tamaño del mundo
+LLENO = 3  # servidor -> cliente: no quedan salas libres
+ENTRADA = 4  # cliente -> servidor: teclas del tanque y último snapshot recibido
+SNAPSHOT = 5  # servidor -> cliente: estado de la partida (delta)
+ADIOS = 6  # cliente -> servidor: abandona la partida
+
+_TIPO = struct.Struct("<B")
+_BIENVENIDA = struct.Struct("<BHBHH")  # tipo, sala, tanque, ancho y alto del mundo
+_ENTRADA = struct.Struct("<BIIB")  # tipo, secuencia, último snapshot recibido, máscara de teclas
+_CABECERA_SNAPSHOT = struct.Struct("<BIIIBB")  # tipo, tick, tick base (0 = completo), semilla, terminada, nº tanques
+_TANQUE = struct.Struct("<BHHHBHB")  # índice, x, y, ángulo, vidas, puntuación, banderas
+_BALA = struct.Struct("<IHHHBI")  # id, x, y, ángulo, tirador, tick de referencia
+_OBSTACULO = struct.Struct("<HB")  # índice en el mapa original, salud (0 = destruido)
+_CONTADOR = struct.Struct("<H")
+_ID = struct.Struct("<I")
+
+INVULNERABLE = 1
+SIN_GANADOR = ""
+
+
+def _cuantizar_posicion(valor):
+    """Posición en medios píxeles (hasta 32767 px) para guardarla en 16 bits."""
+    return max(0, min(0xFFFF, round(valor * 2)))
+
+
+def _cuantizar_angulo(angulo):
+    return round((angulo % math.tau) / math.tau * 0x10000) & 0xFFFF
+
+
+def _angulo(valor):
+    return valor / 0x10000 * math.tau
+
+
+class EstadoMundo(NamedTuple):
+    """Estado cuantizado de una sala en un tick: lo que se envía (completo o como delta)."""
+    tick: int
+    semilla: int
+    terminada: bool
+    ganador: str
+    tanques: tuple  # Por tanque: (x, y, ángulo, vidas, puntuación, banderas)
+    balas: dict  # id -> (x, y, ángulo, tirador, tick de referencia)
+    obstaculos: dict  # índice -> salud, solo de los obstáculos dañados o destruidos
+
+
+ESTADO_VACIO = EstadoMundo(0, 0, False, SIN_GANADOR, (), {}, {})
+
+
+def codificar_snapshot(actual, base=ESTADO_VACIO):
+    """Codifica `actual` como delta respecto a `base` (o completo si `base` es `ESTADO_VACIO`)."""
+    partes = [_CABECERA_SNAPSHOT.pack(SNAPSHOT, actual.tick, base.tick, actual.semilla,
+                                      actual.terminada, len(actual.tanques))]
+    ganador = actual.ganador.encode("utf-8")
+    partes.append(_TIPO.pack(len(ganador)) + ganador)
+
+    cambiados = [(i, tanque) for i, tanque in enumerate(actual.tanques)
+                 if i >= len(base.tanques) or base.tanques[i] != tanque]
+    partes.append(_TIPO.pack(len(cambiados)))
+    partes.extend(_TANQUE.pack(i, *tanque) for i, tanque in cambiados)
+
+    nuevas = [(id_bala, bala) for id_bala, bala in actual.balas.items() if id_bala not in base.balas]
+    partes.append(_CONTADOR.pack(len(nuevas)))
+    partes.extend(_BALA.pack(id_bala, *bala) for id_bala, bala in nuevas)
+    eliminadas = [id_bala for id_bala in base.balas if id_bala not in actual.balas]
+    partes.append(_CONTADOR.pack(len(eliminadas)))
+    partes.extend(_ID.pack(id_bala) for id_bala in eliminadas)
+
+    obstaculos = [(i, salud) for i, salud in actual.obstaculos.items() if base.obstaculos.get(i) != salud]
+    partes.append(_CONTADOR.pack(len(obstaculos)))
+    partes.extend(_OBSTACULO.pack(i, salud) for i, salud in obstaculos)
+    return b"".join(partes)
+
+
+def decodificar_snapshot(datos, historial):
+    """
+    Reconstruye el `EstadoMundo` de un snapshot a partir de su base, que debe estar en
+    `historial` (tick -> EstadoMundo). Devuelve None si la base ya no se conoce.
+    """
+    _, tick, tick_base, semilla, terminada, num_tanques = _CABECERA_SNAPSHOT.unpack_from(datos)
+    base = ESTADO_VACIO if tick_base == 0 else historial.get(tick_base)
+    if base is None:
+        return None
+    pos = _CABECERA_SNAPSHOT.size
+    (largo,) = _TIPO.unpack_from(datos, pos)
+    ganador = datos[pos + 1:pos + 1 + largo].decode("utf-8")
+    pos += 1 + largo
+
+    tanques = list(base.tanques[:num_tanques]) + [None] * (num_tanques - len(base.tanques))
+    (cambiados,) = _TIPO.unpack_from(datos, pos)
+    pos += 1
+    for _ in range(cambiados):
+        i, *tanque = _TANQUE.unpack_from(datos, pos)
+        tanques[i] = tuple(tanque)
+        pos += _TANQUE.size
+
+    balas = dict(base.balas)
+    (nuevas,) = _CONTADOR.unpack_from(datos, pos)
+    pos += _CONTADOR.size
+    for _ in range(nuevas):
+        id_bala, *bala = _BALA.unpack_from(datos, pos)
+        balas[id_bala] = tuple(bala)
+        pos += _BALA.size
+    (eliminadas,) = _CONTADOR.unpack_from(datos, pos)
+    pos += _CONTADOR.size
+    for _ in range(eliminadas):
+        balas.pop(_ID.unpack_from(datos, pos)[0], None)
+        pos += _ID.size
+
+    obstaculos = dict(base.obstaculos)
+    (cambiados,) = _CONTADOR.unpack_from(datos, pos)
+    pos += _CONTADOR.size
+    for _ in range(cambiados):
+        i, salud = _OBSTACULO.unpack_from(datos, pos)
+        obstaculos[i] = salud
+        pos += _OBSTACULO.size
+    return EstadoMundo(tick, semilla, bool(terminada), ganador, tuple(tanques), balas, obstaculos)
+
+
+class EnlaceSimulado:
+    """
+    Envoltorio de un transporte UDP que retrasa (`latencia` ± `variacion` segundos) y descarta
+    (con probabilidad `perdida`) los datagramas enviados. Sirve para probar sobre loopback.
+    """
+    def __init__(self, transporte, latencia=0.0, perdida=0.0, variacion=0.0, semilla=None):
+        self.transporte = transporte
+        self.latencia = latencia
+        self.perdida = perdida
+        self.variacion = variacion
+        self.rng = random.Random(semilla)
+
+    def sendto(self, datos, direccion=None):
+        if self.rng.random() < self.perdida:
+            return
+        retraso = max(0.0, self.latencia + self.rng.uniform(-self.variacion, self.variacion))
+        asyncio.get_running_loop().call_later(retraso, self._enviar, datos, direccion)
+
+    def _enviar(self, datos, direccion):
+        if not self.transporte.is_closing():
+            self.transporte.sendto(datos, direccion)
+
+
+# ---- SERVIDOR ----
+
+class Sala:
+    """Una partida del servidor: su simulación, los clientes de cada tanque y el historial de estados."""
+    def __init__(self, id_sala, tamaño_mundo=None):
+        self.id = id_sala
+        self.simulacion = Simulacion(con_efectos=False, tamaño_mundo=tamaño_mundo)
+        self.clientes = {}  # índice de tanque -> dirección
+        self.entradas = [SIN_ENTRADA] * len(self.simulacion.tanques)
+        self.tick = 0  # No se reinicia entre partidas: identifica los snapshots de forma única
+        self.historial = {}  # tick -> EstadoMundo enviado
+        self.ticks_fin = 0  # Ticks transcurridos desde que terminó la partida
+        self._indices = {}
+        self._saludes = {}
+        self._balas = {}
+        self.simulacion.agregar_observador(self)
+
+    # Observador de la simulación: guarda la salud de los obstáculos modificados.
+    def mapa_creado(self, simulacion):
+        self._indices = {obstaculo: i for i, obstaculo in enumerate(simulacion.obstaculos)}
+        self._saludes = {}
+        self._balas = {}
+        self.historial.clear()  # Los deltas nunca cruzan de un mapa a otro
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        self._saludes[self._indices[obstaculo]] = max(0, obstaculo.salud)
+
+    def tanque_libre(self):
+        for i in range(len(self.simulacion.tanques)):
+            if i not in self.clientes:
+                return i
+        return None
+
+    def paso(self):
+        sim = self.simulacion
+        sim.paso(self.entradas)
+        self.tick += 1
+        if sim.terminada:
+            self.ticks_fin += 1
+            if self.ticks_fin >= 3 * s.FPS:  # Nueva partida a los 3 segundos
+                sim.reiniciar()
+                self.ticks_fin = 0
+
+    def capturar(self):
+        """Guarda y devuelve el `EstadoMundo` del tick actual."""
+        sim = self.simulacion
+        tanques = tuple((_cuantizar_posicion(t.x), _cuantizar_posicion(t.y), _cuantizar_angulo(t.angulo),
+                         max(0, t.vidas), t.puntuacion, INVULNERABLE if t.invulnerable else 0)
+                        for t in sim.tanques)
+        indice_tanque = {tanque: i for i, tanque in enumerate(sim.tanques)}
+        balas = {}
+        for bala in sim.balas:
+            # Una bala no cambia de rumbo: se reutiliza el dato ya enviado para que no cuente como cambio.
+            balas[bala.id] = self._balas.get(bala.id) or (
+                _cuantizar_posicion(bala.x), _cuantizar_posicion(bala.y), _cuantizar_angulo(bala.angulo),
+                indice_tanque.get(bala.tirador, 0xFF), self.tick)
+        self._balas = balas
+        estado = EstadoMundo(self.tick, sim.semilla_mapa, sim.terminada, sim.ganador or SIN_GANADOR,
+                             tanques, balas, dict(self._saludes))
+        self.historial[self.tick] = estado
+        self.historial.pop(self.tick - s.HISTORIAL_SNAPSHOTS * s.TICKS_POR_SNAPSHOT, None)
+        return estado
+
+
+class ClienteRemoto:
+    """Lo que el servidor sabe de un cliente conectado."""
+    def __init__(self, sala, tanque):
+        self.sala = sala
+        self.tanque = tanque
+        self.secuencia = -1  # Última entrada aplicada (se descartan las desordenadas)
+        self.confirmado = 0  # Último snapshot que el cliente ha recibido
+        self.ultimo_paquete = time.monotonic()
+
+
+class ServidorPartidas(asyncio.DatagramProtocol):
+    """Servidor autoritativo: acepta clientes, aplica sus entradas y difunde snapshots delta."""
+    def __init__(self, max_salas=64, tamaño_mundo=None, enlace=None):
+        self.max_salas = max_salas
+        self.tamaño_mundo = tamaño_mundo
+        self.salas = []
+        self.clientes = {}  # dirección -> ClienteRemoto
+        self.transporte = None
+        self._crear_enlace = enlace  # Opcional: envuelve el transporte (p. ej. `EnlaceSimulado`)
+        self.tick = 0
+        self.bytes_enviados = 0
+        self.bytes_recibidos = 0
+
+    def connection_made(self, transporte):
+        self.transporte = self._crear_enlace(transporte) if self._crear_enlace else transporte
+
+    def _enviar(self, datos, direccion):
+        self.bytes_enviados += len(datos)
+        self.transporte.sendto(datos, direccion)
+
+    def datagram_received(self, datos, direccion):
+        self.bytes_recibidos += len(datos)
+        if not datos:
+            return
+        tipo = datos[0]
+        cliente = self.clientes.get(direccion)
+        if tipo == HOLA:
+            if cliente is None:
+                cliente = self._asignar(direccion)
+            if cliente is None:
+                self._enviar(_TIPO.pack(LLENO), direccion)
+                return
+            ancho, alto = cliente.sala.simulacion.tamaño_mundo
+            self._enviar(_BIENVENIDA.pack(BIENVENIDA, cliente.sala.id, cliente.tanque, ancho, alto), direccion)
+        elif cliente is None:
+            return
+        elif tipo == ENTRADA and len(datos) >= _ENTRADA.size:
+            _, secuencia, confirmado, mascara = _ENTRADA.unpack_from(datos)
+            cliente.ultimo_paquete = time.monotonic()
+            cliente.confirmado = max(cliente.confirmado, confirmado)
+            if secuencia > cliente.secuencia:
+                cliente.secuencia = secuencia
+                cliente.sala.entradas[cliente.tanque] = decodificar_entradas(mascara, 1)[0]
+        elif tipo == ADIOS:
+            self._liberar(direccion)
+
+    def _asignar(self, direccion):
+        """Asigna al cliente el primer tanque libre (creando una sala si hace falta)."""
+        for sala in self.salas:
+            tanque = sala.tanque_libre()
+            if tanque is not None:
+                break
+        else:
+            if len(self.salas) >= self.max_salas:
+                return None
+            sala = Sala(len(self.salas), self.tamaño_mundo)
+            self.salas.append(sala)
+            tanque = 0
+        sala.clientes[tanque] = direccion
+        cliente = self.clientes[direccion] = ClienteRemoto(sala, tanque)
+        print(f"Cliente {direccion} en la sala {sala.id} con el tanque {tanque}")
+        return cliente
+
+    def _liberar(self, direccion):
+        cliente = self.clientes.pop(direccion, None)
+        if cliente is not None:
+            del cliente.sala.clientes[cliente.tanque]
+            cliente.sala.entradas[cliente.tanque] = SIN_ENTRADA
+            print(f"Cliente {direccion} desconectado")
+
+    def paso(self):
+        """Un tick de todas las salas con jugadores; cada `TICKS_POR_SNAPSHOT`, envía los snapshots."""
+        for sala in self.salas:
+            if sala.clientes:
+                sala.paso()
+        self.tick += 1
+        if self.tick % s.TICKS_POR_SNAPSHOT == 0:
+            self.difundir()
+
+    def difundir(self):
+        ahora = time.monotonic()
+        for sala in self.salas:
+            if not sala.clientes:
+                continue
+            estado = sala.capturar()
+            for tanque, direccion in list(sala.clientes.items()):
+                cliente = self.clientes[direccion]
+                if ahora - cliente.ultimo_paquete > s.TIEMPO_DESCONEXION:
+                    self._liberar(direccion)
+                    continue
+                # Delta respecto al último snapshot confirmado; completo si ya no se recuerda.
+                base = sala.historial.get(cliente.confirmado, ESTADO_VACIO)
+                self._enviar(codificar_snapshot(estado, base), direccion)
+
+    async def ejecutar(self, duracion=None):
+        """Bucle de ticks a `FPS` por segundo (sin deriva acumulada). `duracion` en segundos o None."""
+        bucle = asyncio.get_running_loop()
+        periodo = 1 / s.FPS
+        inicio = siguiente = bucle.time()
+        while duracion is None or bucle.time() - inicio < duracion:
+            self.paso()
+            siguiente += periodo
+            await asyncio.sleep(max(0.0, siguiente - bucle.time()))
+
+
+# ---- CLIENTE ----
+
+class ClienteRed(asyncio.DatagramProtocol):
+    """
+    Cliente de una partida en red: se une al servidor, envía las teclas de su tanque y
+    reconstruye los snapshots. `estado_interpolado()` da el estado a dibujar.
+    """
+    def __init__(self, enlace=None):
+        self.transporte = None
+        self._crear_enlace = enlace
+        self.sala = None
+        self.tanque = None
+        self.tamaño_mundo = None
+        self.conectado = asyncio.Event()
+        self.historial = {}  # tick -> EstadoMundo reconstruido
+        self.ultimo = None  # Último EstadoMundo recibido
+        self.secuencia = 0
+        self.bytes_enviados = 0
+        self.bytes_recibidos = 0
+        self.snapshots = 0
+        self.deltas = 0
+        # Relación entre los ticks del servidor y el reloj local, para interpolar
+        self._desfase = None
+
+    def connection_made(self, transporte):
+        self.transporte = self._crear_enlace(transporte) if self._crear_enlace else transporte
+
+    def _enviar(self, datos):
+        self.bytes_enviados += len(datos)
+        self.transporte.sendto(datos)
+
+    async def unirse(self, reintento=0.5, espera=10.0):
+        """Pide plaza hasta recibir la bienvenida. Lanza ConnectionError si no llega o no hay sitio."""
+        limite = time.monotonic() + espera
+        while not self.conectado.is_set():
+            if time.monotonic() > limite:
+                raise ConnectionError("El servidor no responde")
+            self._enviar(_TIPO.pack(HOLA))
+            try:
+                await asyncio.wait_for(self.conectado.wait(), reintento)
+            except asyncio.TimeoutError:
+                pass
+        if self.tanque is None:
+            raise ConnectionError("El servidor está lleno")
+
+    def datagram_received(self, datos, direccion):
+        self.bytes_recibidos += len(datos)
+        if not datos:
+            return
+        tipo = datos[0]
+        if tipo == BIENVENIDA:
+            _, self.sala, self.tanque, ancho, alto = _BIENVENIDA.unpack_from(datos)
+            self.tamaño_mundo = (ancho, alto)
+            self.conectado.set()
+        elif tipo == LLENO:
+            self.conectado.set()
+        elif tipo == SNAPSHOT:
+            try:
+                estado = decodificar_snapshot(datos, self.historial)
+            except (struct.error, UnicodeDecodeError):
+                return  # Paquete dañado
+            if estado is None or (self.ultimo is not None and estado.tick <= self.ultimo.tick):
+                return  # Base desconocida o snapshot desordenado
+            self.snapshots += 1
+            self.deltas += _CABECERA_SNAPSHOT.unpack_from(datos)[2] != 0
+            self.historial[estado.tick] = estado
+            self.historial.pop(estado.tick - s.HISTORIAL_SNAPSHOTS * s.TICKS_POR_SNAPSHOT, None)
+            self.ultimo = estado
+            # El desfase mínimo observado corresponde a los paquetes con menos retraso.
+            desfase = time.monotonic() - estado.tick / s.FPS
+            if self._desfase is None or desfase < self._desfase:
+                self._desfase = desfase
+            else:
+                self._desfase += 0.001  # Deriva lenta hacia arriba por si la red empeora
+
+    def enviar_entrada(self, entrada):
+        """Envía las teclas del tanque propio junto con el último snapshot recibido."""
+        self.secuencia += 1
+        confirmado = self.ultimo.tick if self.ultimo else 0
+        self._enviar(_ENTRADA.pack(ENTRADA, self.secuencia, confirmado, codificar_entradas([entrada])))
+
+    def salir(self):
+        if self.transporte is not None:
+            self._enviar(_TIPO.pack(ADIOS))
+
+    def tick_dibujo(self):
+        """Tick del servidor (con decimales) que se dibuja ahora: el actual menos el retraso de interpolación."""
+        if self._desfase is None:
+            return None
+        return (time.monotonic() - self._desfase - s.RETRASO_INTERPOLACION) * s.FPS
+
+    def estado_interpolado(self):
+        """
+        Devuelve `(anterior, siguiente, fraccion)`: los snapshots que rodean `tick_dibujo()` y
+        la posición entre ambos. Si no hay dos snapshots que lo rodeen se usa el más cercano.
+        """
+        tick = self.tick_dibujo()
+        if tick is None:
+            return None
+        anterior = siguiente = None
+        for estado in self.historial.values():
+            if estado.tick <= tick and (anterior is None or estado.tick > anterior.tick):
+                anterior = estado
+            if estado.tick >= tick and (siguiente is None or estado.tick < siguiente.tick):
+                siguiente = estado
+        if anterior is None or siguiente is None or anterior.semilla != siguiente.semilla:
+            estado = siguiente or anterior
+            return estado, estado, 0.0
+        if siguiente.tick == anterior.tick:
+            return anterior, siguiente, 0.0
+        return anterior, siguiente, (tick - anterior.tick) / (siguiente.tick - anterior.tick)
+
+
+class VistaRed:
+    """
+    Vuelca en una `Simulacion` local (que no se hace avanzar) el estado interpolado de la
+    partida en red, para dibujarla con el renderizador normal. Los cambios de vidas y de
+    obstáculos generan sus efectos visuales en local. Si cambia la semilla se reconstruye el mapa.
+    """
+    def __init__(self, simulacion):
+        self.simulacion = simulacion
+        self.semilla = None
+        self.obstaculos = []  # Obstáculos en el orden del mapa original (índices del protocolo)
+
+    def aplicar(self, anterior, siguiente, fraccion, tick):
+        sim = self.simulacion
+        if self.semilla != siguiente.semilla:
+            sim.reiniciar(siguiente.semilla)
+            self.semilla = siguiente.semilla
+            self.obstaculos = list(sim.obstaculos)
+
+        for tanque, a, b in zip(sim.tanques, anterior.tanques, siguiente.tanques):
+            if a is None or b is None:
+                continue
+            ax, ay, aang, _, _, _ = a
+            bx, by, bang, vidas, puntuacion, banderas = b
+            tanque.x = (ax + (bx - ax) * fraccion) / 2
+            tanque.y = (ay + (by - ay) * fraccion) / 2
+            giro = (_angulo(bang) - _angulo(aang) + math.pi) % math.tau - math.pi  # Por el camino corto
+            tanque.angulo = _angulo(aang) + giro * fraccion
+            tanque.rect.topleft = (tanque.x, tanque.y)
+            if vidas < tanque.vidas:
+                sim.crear_efecto_explosion(tanque.x + 15, tanque.y + 15)
+            tanque.vidas = vidas
+            tanque.puntuacion = puntuacion
+            tanque.invulnerable = bool(banderas & INVULNERABLE)
+
+        # Balas: posición de referencia más el avance desde entonces (10 px por tick).
+        sim.balas.vaciar()
+        for x, y, angulo, tirador, tick_referencia in anterior.balas.values():
+            angulo = _angulo(angulo)
+            avance = 10 * (tick - tick_referencia)
+            tanque = sim.tanques[tirador] if tirador < len(sim.tanques) else None
+            sim.balas.crear(x / 2 + math.cos(angulo) * avance, y / 2 + math.sin(angulo) * avance,
+                            angulo, tanque, 0)
+
+        for indice, salud in siguiente.obstaculos.items():
+            if indice < len(self.obstaculos):
+                sim.fijar_salud_obstaculo(self.obstaculos[indice], salud)
+
+        sim.terminada = siguiente.terminada
+        sim.ganador = siguiente.ganador or None
+        sim.actualizar_efectos()
+
+
+async def jugar_en_red(host, puerto):
+    """Cliente con ventana: el teclado (W/A/D) controla el tanque asignado por el servidor."""
+    import pygame
+    from juego import Juego, GameState
+
+    bucle = asyncio.get_running_loop()
+    transporte, cliente = await bucle.create_datagram_endpoint(ClienteRed, remote_addr=(host, puerto))
+    try:
+        await cliente.unirse()
+        print(f"Conectado: sala {cliente.sala}, tanque {cliente.tanque}")
+        juego = Juego(tamaño_mundo=cliente.tamaño_mundo)
+        pygame.display.set_caption(f"Juego de Tanques - En red (tanque {cliente.tanque + 1})")
+        vista = VistaRed(juego.simulacion)  # El mapa del servidor se construye con el primer snapshot
+        ejecutando = True
+        while ejecutando:
+            juego.reloj.tick(s.FPS)
+            for evento in pygame.event.get():
+                if evento.type == pygame.QUIT or (evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE):
+                    ejecutando = False
+                elif evento.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    juego.renderer.invalidar_todo()
+                elif evento.type == pygame.KEYDOWN:
+                    if evento.key == pygame.K_m:
+                        juego.toggle_musica()
+                    elif evento.key in (pygame.K_PLUS, pygame.K_EQUALS):
+                        juego.aumentar_volumen()
+                    elif evento.key == pygame.K_MINUS:
+                        juego.disminuir_volumen()
+                    elif evento.key == pygame.K_F3:
+                        juego.renderer.overlay_perfilador.alternar()
+            cliente.enviar_entrada(juego.leer_entradas()[0])
+
+            interpolado = cliente.estado_interpolado()
+            if interpolado is not None:
+                vista.aplicar(*interpolado, cliente.tick_dibujo())
+                juego.estado = GameState.FIN_PARTIDA if juego.simulacion.terminada else GameState.JUGANDO
+                juego.renderer.dibujar(juego)
+            await asyncio.sleep(0)  # Deja al bucle procesar los datagramas recibidos
+        pygame.quit()
+    finally:
+        cliente.salir()
+        transporte.close()
+
+
+# ---- PRUEBA SOBRE LOOPBACK ----
+
+async def prueba_loopback(salas=4, latencia=0.08, perdida=0.1, segundos=10.0, semilla=1):
+    """
+    Servidor y dos clientes automáticos por sala sobre 127.0.0.1, con la mitad de `latencia`
+    en cada sentido y `perdida` en ambos. Devuelve un diccionario con las métricas.
+    """
+    bucle = asyncio.get_running_loop()
+    rng = random.Random(semilla)
+
+    def enlace(transporte):
+        return EnlaceSimulado(transporte, latencia / 2, perdida, latencia / 10, rng.random())
+
+    transporte_servidor, servidor = await bucle.create_datagram_endpoint(
+        lambda: ServidorPartidas(max_salas=salas, enlace=enlace), local_addr=("127.0.0.1", 0))
+    direccion = transporte_servidor.get_extra_info("sockname")
+
+    clientes = []
+    for _ in range(salas * 2):
+        transporte, cliente = await bucle.create_datagram_endpoint(lambda: ClienteRed(enlace), remote_addr=direccion)
+        clientes.append((transporte, cliente))
+    tarea_servidor = asyncio.create_task(servidor.ejecutar())
+    await asyncio.gather(*(cliente.unirse() for _, cliente in clientes))
+
+    async def bot(cliente, semilla_bot):
+        """Avanza casi siempre y gira a ratos, enviando su entrada 60 veces por segundo."""
+        rng_bot = random.Random(semilla_bot)
+        entrada = EntradaTanque(avanzar=True)
+        while True:
+            if rng_bot.random() < 0.05:
+                entrada = EntradaTanque(rng_bot.random() < 0.9, rng_bot.random() < 0.3, rng_bot.random() < 0.3)
+            cliente.enviar_entrada(entrada)
+            cliente.estado_interpolado()  # Trabajo real de un cliente en cada frame
+            await asyncio.sleep(1 / s.FPS)
+
+    bots = [asyncio.create_task(bot(cliente, i)) for i, (_, cliente) in enumerate(clientes)]
+    for _, cliente in clientes:
+        cliente.bytes_enviados = cliente.bytes_recibidos = 0
+    servidor.bytes_enviados = servidor.bytes_recibidos = 0
+    cpu_inicio, inicio = time.process_time(), time.perf_counter()
+    await asyncio.sleep(segundos)
+    cpu, duracion = time.process_time() - cpu_inicio, time.perf_counter() - inicio
+
+    # Cada cliente debe haber reconstruido exactamente los estados que envió el servidor.
+    coinciden = comprobados = 0
+    for _, cliente in clientes:
+        sala = servidor.salas[cliente.sala]
+        for tick, estado in cliente.historial.items():
+            if tick in sala.historial:
+                comprobados += 1
+                coinciden += sala.historial[tick] == estado
+
+    for tarea in bots + [tarea_servidor]:
+        tarea.cancel()
+    for transporte, cliente in clientes:
+        cliente.salir()
+    await asyncio.sleep(latencia + 0.05)
+    for transporte, _ in clientes:
+        transporte.close()
+    transporte_servidor.close()
+
+    return {
+        "clientes": len(clientes),
+        "salas": len(servidor.salas),
+        "bajada_kbps": sum(c.bytes_recibidos for _, c in clientes) * 8 / 1000 / duracion / len(clientes),
+        "subida_kbps": sum(c.bytes_enviados for _, c in clientes) * 8 / 1000 / duracion / len(clientes),
+        "snapshots_por_cliente": sum(c.snapshots for _, c in clientes) / len(clientes),
+        "porcentaje_deltas": 100 * sum(c.deltas for _, c in clientes) / max(1, sum(c.snapshots for _, c in clientes)),
+        "cpu_porcentaje": 100 * cpu / duracion,
+        "estados_comprobados": comprobados,
+        "estados_coincidentes": coinciden,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcomandos = parser.add_subparsers(dest="modo", required=True)
+    servidor = subcomandos.add_parser("servidor", help="Servidor autoritativo")
+    servidor.add_argument("--host", default="0.0.0.0")
+    servidor.add_argument("--puerto", type=int, default=s.PUERTO_RED)
+    servidor.add_argument("--salas", type=int, default=64, help="Máximo de partidas simultáneas")
+    cliente = subcomandos.add_parser("cliente", help="Cliente con ventana")
+    cliente.add_argument("--host", default="127.0.0.1")
+    cliente.add_argument("--puerto", type=int, default=s.PUERTO_RED)
+    prueba = subcomandos.add_parser("prueba", help="Servidor y clientes automáticos sobre loopback")
+    prueba.add_argument("--salas", type=int, default=4)
+    prueba.add_argument("--latencia", type=float, default=0.08, help="Latencia de ida y vuelta (s)")
+    prueba.add_argument("--perdida", type=float, default=0.1, help="Probabilidad de perder cada paquete")
+    prueba.add_argument("--segundos", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.modo == "servidor":
+        async def servir():
+            bucle = asyncio.get_running_loop()
+            transporte, servidor = await bucle.create_datagram_endpoint(
+                lambda: ServidorPartidas(max_salas=args.salas), local_addr=(args.host, args.puerto))
+            print(f"Servidor escuchando en {args.host}:{args.puerto} (UDP)")
+            try:
+                await servidor.ejecutar()
+            finally:
+                transporte.close()
+        try:
+            asyncio.run(servir())
+        except KeyboardInterrupt:
+            pass
+    elif args.modo == "cliente":
+        try:
+            asyncio.run(jugar_en_red(args.host, args.puerto))
+        except ConnectionError as e:
+            print(f"No se pudo conectar: {e}")
+            return 1
+    else:
+        m = asyncio.run(prueba_loopback(args.salas, args.latencia, args.perdida, args.segundos))
+        print(f"{m['clientes']} clientes en {m['salas']} salas | latencia {args.latencia * 1000:.0f} ms, "
+              f"pérdida {args.perdida:.0%}")
+        print(f"Por cliente: bajada {m['bajada_kbps']:.1f} kbit/s, subida {m['subida_kbps']:.1f} kbit/s, "
+              f"{m['snapshots_por_cliente']:.0f} snapshots ({m['porcentaje_deltas']:.0f}% deltas)")
+        print(f"CPU del proceso (servidor y clientes): {m['cpu_porcentaje']:.0f}%")
+        print(f"Estados reconstruidos idénticos a los del servidor: "
+              f"{m['estados_coincidentes']}/{m['estados_comprobados']}")
+        return 0 if m["estados_coincidentes"] == m["estados_comprobados"] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import math
+import pygame
+import settings as s
+
+
+class RejillaEspacial:
+    """
+    Índice espacial de rejilla uniforme para objetos con atributo `rect` (p. ej. obstáculos).
+    Cada objeto se registra en las celdas que toca su rectángulo, de modo que una consulta
+    solo revisa los objetos cercanos en lugar de toda la lista.
+    """
+    def __init__(self, objetos=(), tam_celda=None):
+        self.tam_celda = s.TAM_CELDA_REJILLA if tam_celda is None else tam_celda
+        self.celdas = {}  # (columna, fila) -> lista de objetos
+        self._celdas_de = {}  # objeto -> celdas en las que está registrado
+        for obj in objetos:
+            self.insertar(obj)
+
+    def __len__(self):
+        return len(self._celdas_de)
+
+    def __contains__(self, obj):
+        return obj in self._celdas_de
+
+    def _rango(self, rect):
+        """Devuelve las columnas y filas (inclusivas) que cubre un rectángulo."""
+        t = self.tam_celda
+        return (rect.left // t, rect.top // t,
+                (rect.right - 1) // t, (rect.bottom - 1) // t)
+
+    def insertar(self, obj):
+        """Registra un objeto en todas las celdas que ocupa su `rect`."""
+        col0, fila0, col1, fila1 = self._rango(obj.rect)
+        claves = []
+        for col in range(col0, col1 + 1):
+            for fila in range(fila0, fila1 + 1):
+                self.celdas.setdefault((col, fila), []).append(obj)
+                claves.append((col, fila))
+        self._celdas_de[obj] = claves
+
+    def eliminar(self, obj):
+        """Quita un objeto del índice (p. ej. un obstáculo destruido). Solo toca sus celdas."""
+        for clave in self._celdas_de.pop(obj, ()):
+            celda = self.celdas[clave]
+            celda.remove(obj)
+            if not celda:
+                del self.celdas[clave]
+
+    def actualizar(self, obj):
+        """Vuelve a registrar un objeto que se ha movido. Solo toca el índice si ha cambiado de celdas."""
+        col0, fila0, col1, fila1 = self._rango(obj.rect)
+        claves = self._celdas_de.get(obj)
+        if claves and claves[0] == (col0, fila0) and claves[-1] == (col1, fila1):
+            return
+        self.eliminar(obj)
+        self.insertar(obj)
+
+    def cercanos(self, rect):
+        """Devuelve los objetos registrados en las celdas que toca `rect`, sin duplicados."""
+        col0, fila0, col1, fila1 = self._rango(rect)
+        if col0 == col1 and fila0 == fila1:
+            return list(self.celdas.get((col0, fila0), ()))
+        encontrados = {}  # dict como conjunto ordenado: mismo orden que el recorrido de las celdas
+        for col in range(col0, col1 + 1):
+            for fila in range(fila0, fila1 + 1):
+                for obj in self.celdas.get((col, fila), ()):
+                    encontrados[obj] = None
+        return list(encontrados)
+
+    def consultar(self, rect):
+        """Devuelve los objetos cuyo `rect` colisiona con `rect`."""
+        return [obj for obj in self.cercanos(rect) if rect.colliderect(obj.rect)]
+
+    def primera_colision(self, rect):
+        """Devuelve el primer objeto que colisiona con `rect`, o None."""
+        col0, fila0, col1, fila1 = self._rango(rect)
+        for col in range(col0, col1 + 1):
+            for fila in range(fila0, fila1 + 1):
+                for obj in self.celdas.get((col, fila), ()):
+                    if rect.colliderect(obj.rect):
+                        return obj
+        return None
+
+
+def rect_segmento(p0, p1, radio=0):
+    """Rectángulo que contiene el segmento p0-p1 ensanchado `radio` píxeles."""
+    # Se llama por cada bala y tick: sin min/abs, basta con ordenar las coordenadas.
+    x0, y0 = p0
+    x1, y1 = p1
+    if x1 < x0:
+        x0, x1 = x1, x0
+    if y1 < y0:
+        y0, y1 = y1, y0
+    return pygame.Rect(int(x0 - radio), int(y0 - radio),
+                       int(x1 - x0 + 2 * radio) + 2,
+                       int(y1 - y0 + 2 * radio) + 2)
+
+
+def primer_impacto_segmento(objetos, p0, p1, radio=0):
+    """
+    Devuelve `(objeto, distancia²)` del objeto cuyo `rect` (ensanchado `radio`) corta antes el
+    segmento p0-p1, o `(None, inf)`. Usa `Rect.clipline`, así que no depende del tamaño del paso.
+    """
+    mejor, mejor_distancia = None, math.inf
+    for obj in objetos:
+        recorte = obj.rect.inflate(radio * 2, radio * 2).clipline(p0, p1)
+        if recorte:
+            (cx, cy), _ = recorte
+            distancia = (cx - p0[0]) ** 2 + (cy - p0[1]) ** 2
+            if distancia < mejor_distancia:
+                mejor, mejor_distancia = obj, distancia
+    return mejor, mejor_distancia
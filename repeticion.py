@@ -0,0 +1,360 @@
+"""
+Grabación compacta y reproducción determinista de partidas.
+
+Una partida queda determinada por la semilla del mapa, el tamaño del mundo y, en cada tick,
+las teclas de cada tanque (avanzar / izquierda / derecha) y el `dt` con que avanzó la
+simulación. El archivo guarda solo eso: 3 bits por tanque y tick más el `dt` (normalmente
+un único valor o milisegundos enteros), comprimido con zlib. Una partida de varios minutos
+ocupa unos pocos KB.
+
+Uso (desde la raíz del proyecto):
+    python juego.py --grabar                                  # guarda cada partida en grabaciones/
+    python repeticion.py grabaciones/partida.tnq              # reproducir a velocidad real
+    python repeticion.py grabaciones/partida.tnq --velocidad 10
+    python repeticion.py grabaciones/partida.tnq --velocidad max
+    python repeticion.py grabaciones/partida.tnq --sin-ventana   # solo verificar el resultado
+Durante la reproducción: P=Pausa | ←/→=Retroceder/Avanzar 10 s | F3=Tiempos | ESC=Salir
+"""
+import argparse
+import datetime
+import os
+import struct
+import sys
+import time
+import zlib
+from simulacion import Simulacion, EntradaTanque
+import settings as s
+
+MAGIA = b"TNQR"
+# Versión 2: el giro y avance de los tanques escalan con el dt (en la 1 eran fijos por tick), así
+# que las grabaciones de la versión 1 solo se reproducen igual si todos sus ticks duran 1/60 s.
+VERSION = 2
+# Cabecera: magia, versión, nº de tanques, modo de dt, semilla del mapa, ancho y alto del mundo, nº de ticks.
+CABECERA = struct.Struct("<4sBBBIHHI")
+# Modos de guardado del dt de cada tick
+DT_FIJO = 0  # Todos los ticks con el mismo dt (un float64)
+DT_MS = 1  # Milisegundos enteros, como los que da `pygame.time.Clock.tick` (un uint16 por tick)
+DT_LIBRE = 2  # Cualquier otro caso (un float64 por tick)
+
+
+def codificar_entradas(entradas):
+    """Convierte las `EntradaTanque` de un tick en una máscara de bits (3 bits por tanque)."""
+    mascara = 0
+    for i, entrada in enumerate(entradas):
+        for j, pulsada in enumerate(entrada):
+            if pulsada:
+                mascara |= 1 << (3 * i + j)
+    return mascara
+
+
+def decodificar_entradas(mascara, num_tanques):
+    """Inversa de `codificar_entradas`: devuelve una `EntradaTanque` por tanque."""
+    return [EntradaTanque(bool(mascara >> (3 * i) & 1),
+                          bool(mascara >> (3 * i + 1) & 1),
+                          bool(mascara >> (3 * i + 2) & 1))
+            for i in range(num_tanques)]
+
+
+class Grabacion:
+    """Datos de una partida: semilla del mapa, tamaño del mundo, entradas y dt de cada tick y resultado."""
+    def __init__(self, semilla_mapa, tamaño_mundo, num_tanques):
+        self.semilla_mapa = semilla_mapa
+        self.tamaño_mundo = tuple(tamaño_mundo)
+        self.num_tanques = num_tanques
+        self.mascaras = []  # Máscara de teclas de cada tick
+        self.dts = []  # dt (segundos) de cada tick
+        # Resultado de la partida original, para comprobar la reproducción
+        self.ganador = None
+        self.puntuaciones = []
+
+    def __len__(self):
+        return len(self.mascaras)
+
+    def agregar(self, entradas, dt):
+        """Añade un tick con las entradas de los tanques y su dt."""
+        self.mascaras.append(codificar_entradas(entradas))
+        self.dts.append(dt)
+
+    def entradas(self, tick):
+        """Entradas de los tanques en el tick indicado."""
+        return decodificar_entradas(self.mascaras[tick], self.num_tanques)
+
+    def duracion_ms(self):
+        return sum(self.dts) * 1000
+
+    # ---- FORMATO BINARIO ----
+
+    def _modo_dt(self):
+        if all(dt == self.dts[0] for dt in self.dts):
+            return DT_FIJO
+        if all(dt == round(dt * 1000) / 1000 and 0 <= dt * 1000 <= 0xFFFF for dt in self.dts):
+            return DT_MS
+        return DT_LIBRE
+
+    def a_bytes(self):
+        """Serializa la grabación: cabecera sin comprimir y cuerpo comprimido con zlib."""
+        num_bytes = (3 * self.num_tanques + 7) // 8
+        modo = self._modo_dt() if self.dts else DT_FIJO
+        cuerpo = bytearray()
+        for mascara in self.mascaras:
+            cuerpo += mascara.to_bytes(num_bytes, "little")
+        if modo == DT_FIJO:
+            cuerpo += struct.pack("<d", self.dts[0] if self.dts else 0.0)
+        elif modo == DT_MS:
+            cuerpo += struct.pack(f"<{len(self.dts)}H", *(round(dt * 1000) for dt in self.dts))
+        else:
+            cuerpo += struct.pack(f"<{len(self.dts)}d", *self.dts)
+        ganador = (self.ganador or "").encode("utf-8")
+        cuerpo += struct.pack("<B", len(ganador)) + ganador
+        cuerpo += struct.pack(f"<{len(self.puntuaciones)}I", *self.puntuaciones)
+
+        cabecera = CABECERA.pack(MAGIA, VERSION, self.num_tanques, modo, self.semilla_mapa,
+                                 *self.tamaño_mundo, len(self.mascaras))
+        return cabecera + zlib.compress(bytes(cuerpo), 9)
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        """Reconstruye una grabación serializada con `a_bytes`. Lanza ValueError si el formato no es válido."""
+        if len(datos) < CABECERA.size:
+            raise ValueError("Archivo de grabación demasiado corto")
+        magia, version, num_tanques, modo, semilla, ancho, alto, num_ticks = CABECERA.unpack_from(datos)
+        if magia != MAGIA or not (version == VERSION or (version == 1 and modo == DT_FIJO)):
+            raise ValueError("No es una grabación de partida compatible")
+        grabacion = cls(semilla, (ancho, alto), num_tanques)
+        try:
+            cuerpo = zlib.decompress(datos[CABECERA.size:])
+        except zlib.error as e:
+            raise ValueError(f"Grabación dañada: {e}") from e
+
+        num_bytes = (3 * num_tanques + 7) // 8
+        fin = num_ticks * num_bytes
+        grabacion.mascaras = [int.from_bytes(cuerpo[i:i + num_bytes], "little") for i in range(0, fin, num_bytes)]
+        if modo == DT_FIJO:
+            (dt,) = struct.unpack_from("<d", cuerpo, fin)
+            grabacion.dts = [dt] * num_ticks
+            fin += 8
+        elif modo == DT_MS:
+            grabacion.dts = [ms / 1000 for ms in struct.unpack_from(f"<{num_ticks}H", cuerpo, fin)]
+            fin += 2 * num_ticks
+        else:
+            grabacion.dts = list(struct.unpack_from(f"<{num_ticks}d", cuerpo, fin))
+            fin += 8 * num_ticks
+        (largo,) = struct.unpack_from("<B", cuerpo, fin)
+        grabacion.ganador = cuerpo[fin + 1:fin + 1 + largo].decode("utf-8") or None
+        fin += 1 + largo
+        grabacion.puntuaciones = list(struct.unpack_from(f"<{num_tanques}I", cuerpo, fin))
+        return grabacion
+
+    def guardar(self, ruta):
+        with open(ruta, "wb") as archivo:
+            archivo.write(self.a_bytes())
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "rb") as archivo:
+            return cls.desde_bytes(archivo.read())
+
+
+class GrabadorPartida:
+    """
+    Graba las partidas de una `Simulacion`. Se registra como observador (cada mapa nuevo empieza
+    una grabación) y el cliente llama a `registrar(entradas, dt)` tras cada `paso`.
+    La partida se guarda al terminar, al reiniciarla a medias o al llamar a `guardar`.
+    """
+    def __init__(self, carpeta=s.CARPETA_GRABACIONES):
+        self.carpeta = carpeta
+        self.simulacion = None
+        self.grabacion = None
+
+    # ---- OBSERVADOR DE LA SIMULACIÓN ----
+
+    def mapa_creado(self, simulacion):
+        self.guardar()  # Partida anterior interrumpida (p. ej. con R)
+        self.simulacion = simulacion
+        self.grabacion = Grabacion(simulacion.semilla_mapa, simulacion.tamaño_mundo, len(simulacion.tanques))
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        pass
+
+    # ---- GRABACIÓN ----
+
+    def registrar(self, entradas, dt):
+        """Añade el tick que acaba de simularse. Si la partida ha terminado, la guarda."""
+        if self.grabacion is None:
+            return
+        self.grabacion.agregar(entradas, dt)
+        if self.simulacion.terminada:
+            self.guardar()
+
+    def guardar(self):
+        """Guarda la partida en curso (si tiene algún tick). Devuelve la ruta del archivo o None."""
+        grabacion, self.grabacion = self.grabacion, None
+        if grabacion is None or not len(grabacion):
+            return None
+        grabacion.ganador = self.simulacion.ganador
+        grabacion.puntuaciones = [tanque.puntuacion for tanque in self.simulacion.tanques]
+        os.makedirs(self.carpeta, exist_ok=True)
+        fecha = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        ruta = os.path.join(self.carpeta, f"partida_{fecha}_{grabacion.semilla_mapa:08x}.tnq")
+        grabacion.guardar(ruta)
+        print(f"Partida grabada en {ruta} ({len(grabacion)} ticks, {os.path.getsize(ruta)} bytes)")
+        return ruta
+
+
+class ReproductorPartida:
+    """
+    Reconstruye una partida grabada sobre una `Simulacion` (por defecto una sin ventana ni efectos).
+    `avanzar` simula ticks grabados; `buscar` salta a cualquier tick (hacia atrás vuelve a
+    empezar), sin efectos ni sonidos mientras tanto.
+    """
+    def __init__(self, grabacion, simulacion=None):
+        self.grabacion = grabacion
+        self.simulacion = (simulacion if simulacion is not None else
+                           Simulacion(con_efectos=False, num_tanques=grabacion.num_tanques))
+        self.tick = 0
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Vuelve al principio de la partida (mismo mapa y mismo reloj)."""
+        self.simulacion.tamaño_mundo = self.grabacion.tamaño_mundo
+        self.simulacion.num_tanques = self.grabacion.num_tanques
+        self.simulacion.reiniciar(self.grabacion.semilla_mapa)
+        if len(self.simulacion.tanques) != self.grabacion.num_tanques:
+            raise ValueError(f"La grabación es de {self.grabacion.num_tanques} tanques y la simulación "
+                             f"tiene {len(self.simulacion.tanques)}")
+        self.tick = 0
+
+    @property
+    def terminado(self):
+        return self.tick >= len(self.grabacion)
+
+    def avanzar(self, ticks=1):
+        """Simula hasta `ticks` ticks grabados. Devuelve cuántos se han simulado."""
+        grabacion = self.grabacion
+        fin = min(self.tick + ticks, len(grabacion))
+        inicio = self.tick
+        for tick in range(inicio, fin):
+            self.simulacion.paso(grabacion.entradas(tick), grabacion.dts[tick])
+        self.tick = fin
+        return fin - inicio
+
+    def buscar(self, tick):
+        """Salta al tick indicado lo más rápido posible (sin efectos ni sonidos)."""
+        tick = max(0, min(tick, len(self.grabacion)))
+        if tick < self.tick:
+            self.reiniciar()
+        sim = self.simulacion
+        con_efectos, sonidos = sim.con_efectos, sim.sonidos
+        sim.con_efectos, sim.sonidos = False, {}
+        try:
+            self.avanzar(tick - self.tick)
+        finally:
+            sim.con_efectos, sim.sonidos = con_efectos, sonidos
+
+    def coincide(self):
+        """True si el resultado reproducido es el grabado (solo tiene sentido al terminar)."""
+        sim = self.simulacion
+        return (sim.ganador == self.grabacion.ganador and
+                [tanque.puntuacion for tanque in sim.tanques] == self.grabacion.puntuaciones)
+
+
+# ---- REPRODUCCIÓN CON VENTANA ----
+
+def reproducir_en_ventana(grabacion, velocidad):
+    """
+    Reproduce la grabación con el renderizador del juego. `velocidad` es un factor (1, 10...)
+    o None para ir sin límite: en cada frame se simulan tantos ticks como toque (o los que
+    quepan en el presupuesto del frame) y solo se dibuja el último.
+    """
+    import pygame
+    from juego import Juego, GameState
+
+    juego = Juego(tamaño_mundo=grabacion.tamaño_mundo, num_tanques=grabacion.num_tanques)
+    pygame.display.set_caption("Juego de Tanques - Repetición")
+    reproductor = ReproductorPartida(grabacion, juego.simulacion)
+    if velocidad != 1:
+        juego.simulacion.sonidos = {}  # A más velocidad los sonidos solo molestan
+    salto = round(10 * 1000 / (grabacion.duracion_ms() / max(1, len(grabacion))))  # Ticks en ~10 s
+    presupuesto = 1 / s.FPS * 0.75  # Tiempo de simulación por frame en velocidad ilimitada
+    pausado = False
+    tiempo_objetivo = 0.0  # ms de partida que deberían haberse reproducido
+
+    ejecutando = True
+    while ejecutando:
+        dt_real = juego.reloj.tick(s.FPS) / 1000.0
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT or (evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE):
+                ejecutando = False
+            elif evento.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                juego.renderer.invalidar_todo()
+            elif evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_p:
+                    pausado = not pausado
+                elif evento.key in (pygame.K_RIGHT, pygame.K_LEFT):
+                    destino = reproductor.tick + (salto if evento.key == pygame.K_RIGHT else -salto)
+                    reproductor.buscar(destino)
+                    tiempo_objetivo = juego.simulacion.reloj.get_ticks()
+                elif evento.key == pygame.K_F3:
+                    juego.renderer.overlay_perfilador.alternar()
+
+        if not pausado and not reproductor.terminado:
+            juego.simulacion.zona_detalle = juego.renderer.camara.zona_activa()
+            if velocidad is None:
+                limite = time.perf_counter() + presupuesto
+                while not reproductor.terminado and time.perf_counter() < limite:
+                    reproductor.avanzar(10)
+            else:
+                tiempo_objetivo += dt_real * 1000 * velocidad
+                while not reproductor.terminado and juego.simulacion.reloj.get_ticks() < tiempo_objetivo:
+                    reproductor.avanzar()
+
+        if reproductor.terminado:
+            juego.estado = GameState.FIN_PARTIDA
+        else:
+            juego.estado = GameState.PAUSA if pausado else GameState.JUGANDO
+        juego.renderer.dibujar(juego)
+
+    pygame.quit()
+    return reproductor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo", help="Grabación (.tnq) creada con `python juego.py --grabar`")
+    parser.add_argument("--velocidad", default="1", choices=("1", "10", "max"),
+                        help="Velocidad de reproducción (max = sin límite)")
+    parser.add_argument("--sin-ventana", action="store_true",
+                        help="Reproducir sin ventana tan rápido como se pueda y comprobar el resultado")
+    args = parser.parse_args()
+
+    try:
+        grabacion = Grabacion.cargar(args.archivo)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo cargar la grabación: {e}")
+        return 1
+    print(f"Grabación: {len(grabacion)} ticks ({grabacion.duracion_ms() / 1000:.1f} s), "
+          f"mapa {grabacion.semilla_mapa}, mundo {grabacion.tamaño_mundo[0]}x{grabacion.tamaño_mundo[1]}, "
+          f"ganador original: {grabacion.ganador or 'ninguno'}")
+
+    if args.sin_ventana:
+        inicio = time.perf_counter()
+        reproductor = ReproductorPartida(grabacion)
+        reproductor.avanzar(len(grabacion))
+        print(f"Reproducida en {time.perf_counter() - inicio:.2f} s")
+    else:
+        reproductor = reproducir_en_ventana(grabacion, None if args.velocidad == "max" else int(args.velocidad))
+        if not reproductor.terminado:
+            return 0
+
+    sim = reproductor.simulacion
+    print(f"Ganador reproducido: {sim.ganador or 'ninguno'} | "
+          f"puntuaciones {[tanque.puntuacion for tanque in sim.tanques]}")
+    if not reproductor.coincide():
+        print("¡El resultado no coincide con el de la partida grabada!")
+        return 1
+    print("El resultado coincide con el de la partida grabada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,14 @@
 ANCHO_VENTANA = 1000
 ALTO_VENTANA = 700
 FPS = 60
+FPS_DIBUJO = 144  # Límite de frames dibujados por segundo (0 = sin límite); la simulación va siempre a FPS ticks/s
+MAX_TICKS_POR_FRAME = 8  # Ticks que se recuperan como mucho en un frame lento (más allá, el juego se ralentiza)
+# Reposo: en pausa o fin de partida el bucle espera eventos en lugar de redibujar.
+PAUSA_SIN_FOCO = True  # Pausar al minimizar la ventana o perder el foco (se reanuda al recuperarlo)
+ESPERA_REPOSO_MS = 1000  # Máximo que se bloquea esperando un evento en reposo
+
+# Dibujado por rectángulos sucios: solo se restauran y envían a la pantalla las zonas que cambian.
+RECTANGULOS_SUCIOS = True
 
 # ---- COLORES ----
 NEGRO = (0, 0, 0)
@@ -21,6 +29,10 @@ VERDE_CLARO = (144, 238, 144)
 GRIS_CLARO = (200, 200, 200)
 MARRON_LADRILLO = (150, 75, 0)
 
+# Nombre y color de cada tanque, en orden. A partir del último se numeran y su color se reparte por el círculo cromático.
+COLORES_TANQUES = [("Azul", AZUL), ("Rojo", ROJO), ("Verde", VERDE), ("Amarillo", AMARILLO),
+                   ("Naranja", NARANJA), ("Morado", MORADO), ("Rosa", (255, 105, 180)), ("Celeste", (100, 200, 255))]
+
 # Colores para la caja de madera
 MARRON_CAJA = (160, 110, 60)
 MARRON_CAJA_OSCURO = (130, 80, 40)
@@ -33,13 +45,26 @@ AZUL_BRILLANTE = (100, 200, 255)
 BLANCO_BRILLANTE = (255, 255, 220)
 
 # Configuración de efectos
-PARTICULAS_EXPLOSION = 8  # Número de partículas generadas por explosión.
+PARTICULAS_EXPLOSION = 80  # Número de partículas generadas por explosión.
 PARTICULAS_PROPULSION = 4
 DURACION_EXPLOSION = 30
 DURACION_DESTELLO = 8
 DURACION_PROPULSION = 10
 DURACION_ESTELA = 15
-MAX_EFECTOS = 50
+MAX_EFECTOS = 500
+MAX_PARTICULAS = 4000  # Capacidad del sistema de partículas de NumPy: con la pantalla llena de explosiones, las nuevas emiten menos en lugar de bajar de 60 FPS.
+HUMO_EXPLOSION = 3  # Partículas de humo generadas por explosión.
+
+# ---- AUDIO (ver voces.py) ----
+CANALES_AUDIO = 16  # Canales del mixer que reparte el pool de voces
+# Voces a la vez de cada sonido. Con más tanques en marcha que motores, los que sobran no suenan
+# hasta que se libera una voz; los disparos, golpes y explosiones roban canales a los motores.
+VOCES_MAX = {'disparo': 4, 'explosion': 4, 'golpe': 2, 'motor': 4}
+# Al faltar canales se roba el de la voz menos prioritaria.
+PRIORIDAD_SONIDOS = {'motor': 0, 'disparo': 1, 'golpe': 2, 'explosion': 3}
+
+# Capacidad del pool de balas (balas vivas a la vez).
+MAX_BALAS = 512
 
 # ---- CONFIGURACIÓN DEL MAPA ----
 NUM_ROCAS = 20
@@ -47,6 +72,44 @@ NUM_ARBUSTOS = 25
 NUM_MUROS = 15
 NUM_CAJAS_MADERA = 10
 
+# Tamaño (px) de las celdas de la rejilla espacial de colisiones.
+TAM_CELDA_REJILLA = 40
+
+# ---- ARENA Y CÁMARA ----
+# Tamaño del mundo en píxeles. Igual que la ventana = arena clásica sin desplazamiento;
+# con un mundo mayor la cámara sigue a los tanques (`python juego.py --arena=4000x2800`).
+ANCHO_MUNDO = ANCHO_VENTANA
+ALTO_MUNDO = ALTO_VENTANA
+# Tanques que caben holgados en la arena por defecto: con más, el mundo por defecto crece en
+# proporción (ver `Simulacion.tamaño_para`) para que quepan todos los obstáculos.
+TANQUES_POR_ARENA = 16
+TAM_CHUNK = 512  # Lado (px) de los trozos en que se divide el mundo para dibujar y simular efectos
+MAX_CHUNKS = 32  # Trozos de la capa de obstáculos guardados en memoria (se descartan los menos usados)
+SUAVIZADO_CAMARA = 0.15  # Fracción de la distancia al objetivo que recorre la cámara en cada frame
+PASOS_ANGULO_TANQUE = 64  # Direcciones del cañón pre-dibujadas por vuelta (ver sprites.CacheSpritesTanque)
+MAX_SPRITES_TANQUE = 1024  # Sprites de tanques guardados (por color, dirección, vidas e invulnerabilidad)
+PASOS_ANGULO_BALA = 32  # Direcciones de la estela de las balas pre-dibujadas por vuelta
+MAX_SPRITES_BALA = 256  # Sprites de balas guardados (por color y dirección)
+
+# ---- BOTS (ver bot.py) ----
+TAM_CELDA_NAV = 20  # Lado (px) de las celdas de la rejilla de navegación
+MAX_CAMPOS_NAV = 32  # Campos de distancias guardados (uno por celda objetivo; se descartan los menos usados)
+MAX_CELDAS_BFS_POR_TICK = 2000  # Celdas que expanden por tick los campos de distancias (~1.5 ms); los grandes se reparten en varios ticks
+TICKS_DECISION_BOT = 4  # Cada bot revisa enemigo más cercano y línea de tiro uno de cada N ticks (escalonados por índice)
+
+# ---- RED (ver red.py) ----
+PUERTO_RED = 47800
+TICKS_POR_SNAPSHOT = 3  # El servidor simula a FPS ticks/s y envía un snapshot cada 3 ticks (20/s)
+HISTORIAL_SNAPSHOTS = 64  # Snapshots recordados para usarlos como base de los deltas
+RETRASO_INTERPOLACION = 0.1  # Segundos de retraso con que el cliente dibuja (interpola entre snapshots)
+TIEMPO_DESCONEXION = 10  # Segundos sin paquetes de un cliente antes de liberar su tanque
+
+# ---- INSTRUMENTACIÓN ----
+PERFILADOR_FRAMES = 600  # Frames guardados en el buffer circular de tiempos por fase
+PERFIL_CSV = "perfil_frames.csv"  # Exportación al salir con `python juego.py --perfil`
+PERFIL_JSON = "perfil_frames.json"
+CARPETA_GRABACIONES = "grabaciones"  # Partidas guardadas con `python juego.py --grabar`
+
 # ---- RUTAS DE ARCHIVOS DE RECURSOS (ASSETS) ----
 MUSIC_FILE = "megalovia.mp3"
 SOUND_SHOT = "disparo.wav"
@@ -0,0 +1,379 @@
+import pygame
+import math
+import random
+from typing import NamedTuple
+import effects
+from entidades import Tanque, Roca, Arbusto, Muro, CajaMadera
+from rejilla import RejillaEspacial, primer_impacto_segmento, rect_segmento
+from pool_balas import PoolBalas
+from generador_mapa import generar_posiciones, area_mapa
+from particulas import SistemaParticulas
+from perfilador import PerfiladorNulo
+from voces import MezcladorVoces
+import settings as s
+
+
+class EntradaTanque(NamedTuple):
+    """Estado de los controles de un tanque durante un tick de simulación."""
+    avanzar: bool = False
+    izquierda: bool = False
+    derecha: bool = False
+
+SIN_ENTRADA = EntradaTanque()
+
+
+class RelojSimulado:
+    """
+    Reloj de ticks controlado por la simulación.
+    No depende de `pygame.time`, así que una partida puede avanzar tan rápido como permita la CPU.
+    """
+    def __init__(self, ms=0.0):
+        self.ms = ms
+
+    def reiniciar(self):
+        """Vuelve a poner el reloj a cero (al empezar cada partida)."""
+        self.ms = 0.0
+
+    def avanzar(self, dt):
+        """Avanza el reloj `dt` segundos."""
+        self.ms += dt * 1000
+
+    def get_ticks(self):
+        """Devuelve los milisegundos simulados transcurridos (misma interfaz que `pygame.time.get_ticks`)."""
+        return int(self.ms)
+
+
+class Simulacion:
+    """
+    Núcleo de la partida sin ventana ni mixer: tanques, balas, obstáculos y efectos.
+    Recibe una `EntradaTanque` por tanque en cada tick y un reloj inyectado.
+    """
+    def __init__(self, reloj=None, sonidos=None, con_efectos=True, perfilador=None, semilla=None,
+                 tamaño_mundo=None, num_tanques=2):
+        """
+        - `reloj`: objeto con `reiniciar()`, `avanzar(dt)` y `get_ticks()`. Por defecto un `RelojSimulado`.
+        - `sonidos`: diccionario de sonidos de pygame (vacío en modo headless).
+        - `con_efectos`: si es False no se generan efectos visuales (útil para simulaciones masivas).
+        - `perfilador`: recibe `marcar(fase)` al terminar cada fase del tick (ver `perfilador.py`).
+        - `semilla`: semilla de la secuencia de mapas (None = aleatoria).
+        - `tamaño_mundo`: (ancho, alto) de la arena en píxeles. Por defecto `ANCHO_MUNDO`×`ALTO_MUNDO`,
+          ampliado con muchos tanques (ver `tamaño_para`); se puede cambiar entre partidas y se
+          aplica al llamar a `reiniciar`.
+        - `num_tanques`: tanques de la partida (todos contra todos; gana el último que quede).
+          También se aplica al llamar a `reiniciar`.
+        """
+        if num_tanques < 2:
+            raise ValueError("Hacen falta al menos 2 tanques")
+        self.tamaño_mundo = tamaño_mundo if tamaño_mundo is not None else self.tamaño_para(num_tanques)
+        self.num_tanques = num_tanques
+        # Zona del mundo (Rect) con efectos visuales; fuera de ella solo se simula la partida.
+        # None = todo el mundo. El cliente con ventana la ajusta a los trozos cercanos a la cámara.
+        self.zona_detalle = None
+        self._semillas = random.Random(semilla)
+        self.reloj = reloj if reloj is not None else RelojSimulado()
+        self.perfilador = perfilador if perfilador is not None else PerfiladorNulo()
+        self.sonidos = sonidos if sonidos is not None else {}
+        self.voces = MezcladorVoces()  # Canales, límites por sonido y prioridades
+        self.con_efectos = con_efectos
+        self.observadores = []  # Reciben avisos de cambios del mapa (p. ej. la capa de obstáculos)
+        self.particulas = SistemaParticulas()  # Fuego y humo de las explosiones (NumPy)
+        self.balas = PoolBalas()  # Balas pre-reservadas, reutilizadas entre partidas
+        self.reiniciar()
+
+    @staticmethod
+    def tamaño_para(num_tanques):
+        """
+        Tamaño del mundo por defecto para `num_tanques`: `ANCHO_MUNDO`×`ALTO_MUNDO` hasta
+        `TANQUES_POR_ARENA` tanques y, con más, un área proporcional al número de tanques. Como los
+        obstáculos se escalan con el área, la densidad del mapa no cambia y caben todos.
+        """
+        escala = math.sqrt(max(1.0, num_tanques / s.TANQUES_POR_ARENA))
+        return round(s.ANCHO_MUNDO * escala), round(s.ALTO_MUNDO * escala)
+
+    def reiniciar(self, semilla_mapa=None):
+        """
+        Reinicia la partida a su estado inicial.
+        Sin `semilla_mapa` se toma la siguiente semilla del generador de la simulación.
+        """
+        if semilla_mapa is None:
+            semilla_mapa = self._semillas.randrange(2 ** 32)
+        self.semilla_mapa = semilla_mapa  # Reproduce exactamente el mismo mapa
+        # Cada partida empieza en el instante 0: con la misma semilla y las mismas entradas
+        # por tick se repite exactamente (ver `repeticion.py`).
+        self.reloj.reiniciar()
+        self.voces.reiniciar()
+        self.tanques = self.crear_tanques()
+        self.tanque1, self.tanque2 = self.tanques[0], self.tanques[1]
+        # Índice espacial de los tanques vivos (colisiones tanque-tanque y bala-tanque)
+        self.rejilla_tanques = RejillaEspacial(self.tanques)
+
+        # Listas de objetos del juego
+        self.balas.vaciar()
+        self.efectos = []  # Para efectos visuales
+        self.particulas.vaciar(semilla_mapa)
+        self.crear_obstaculos()
+
+        self.ticks = 0
+        self.terminada = False
+        self.ganador = None
+        for observador in self.observadores:
+            observador.mapa_creado(self)
+
+    def agregar_observador(self, observador):
+        """
+        Registra un observador del mapa. Debe implementar `mapa_creado(simulacion)` y
+        `obstaculo_modificado(obstaculo, destruido)`. Se le notifica el mapa actual de inmediato.
+        """
+        self.observadores.append(observador)
+        observador.mapa_creado(self)
+
+    def crear_tanques(self):
+        """Crea los `num_tanques` tanques con su nombre, color y posición inicial."""
+        if self.num_tanques == 2:
+            # Las posiciones iniciales son las de la arena clásica también en mundos grandes,
+            # para que la cámara (que sigue a los dos tanques) los muestre a ambos al empezar.
+            posiciones = [(100, 100), (800, 500)]
+        else:
+            # Repartidos por el mapa con el mismo generador que los obstáculos (y su propia semilla).
+            rng = random.Random(f"tanques-{self.semilla_mapa}")
+            posiciones = generar_posiciones(self.num_tanques, (), area_mapa(*self.tamaño_mundo), rng, tam=30)
+            if len(posiciones) < self.num_tanques:
+                raise ValueError(f"No caben {self.num_tanques} tanques en un mundo de "
+                                 f"{self.tamaño_mundo[0]}x{self.tamaño_mundo[1]}")
+        tanques = []
+        for i, (x, y) in enumerate(posiciones):
+            if i < len(s.COLORES_TANQUES):
+                nombre, color = s.COLORES_TANQUES[i]
+            else:
+                nombre = str(i + 1)
+                color = pygame.Color(0)
+                color.hsva = ((i * 137.5) % 360, 80, 100, 100)  # Ángulo áureo: colores bien separados
+                color = tuple(color)[:3]
+            tanques.append(Tanque(x, y, color, self, f"Tanque {nombre}"))
+        return tanques
+
+    def crear_obstaculos(self):
+        """Genera y posiciona los obstáculos en el mapa a partir de `self.semilla_mapa`."""
+        rng = random.Random(self.semilla_mapa)
+
+        # Definir áreas seguras para los tanques (más estrechas con muchos tanques, para que quepan obstáculos)
+        margen_tanque = 60 if self.num_tanques == 2 else 30
+        areas_prohibidas = [t.rect.inflate(margen_tanque * 2, margen_tanque * 2) for t in self.tanques]
+
+        # Rocas (no destructibles), arbustos, muros y cajas de madera (destructibles).
+        # Los NUM_* son para una arena del tamaño de la ventana: se escalan con el área del mundo.
+        ancho_mundo, alto_mundo = self.tamaño_mundo
+        escala = (ancho_mundo * alto_mundo) / (s.ANCHO_VENTANA * s.ALTO_VENTANA)
+        tipos = ([Roca] * round(s.NUM_ROCAS * escala) + [Arbusto] * round(s.NUM_ARBUSTOS * escala) +
+                 [Muro] * round(s.NUM_MUROS * escala) + [CajaMadera] * round(s.NUM_CAJAS_MADERA * escala))
+        posiciones = generar_posiciones(len(tipos), areas_prohibidas, area_mapa(ancho_mundo, alto_mundo), rng)
+        # Obstáculos que no han cabido (p. ej. un `tamaño_mundo` pequeño para tantos tanques).
+        self.obstaculos_sin_sitio = len(tipos) - len(posiciones)
+        self.obstaculos = [tipo(x, y) for tipo, (x, y) in zip(tipos, posiciones)]
+        self._indices_obstaculos = {obstaculo: i for i, obstaculo in enumerate(self.obstaculos)}
+
+        # Índice espacial para las colisiones de tanques y balas contra obstáculos
+        self.rejilla_obstaculos = RejillaEspacial(self.obstaculos)
+
+    # ---- SONIDO Y EFECTOS ----
+
+    def reproducir_sonido(self, nombre, bucle=False, fuente=None):
+        """
+        Reproduce un sonido si está cargado, a través del pool de voces (los avisos repetidos en
+        el mismo tick suenan una vez). `fuente` identifica la voz para `detener_sonido` (p. ej.
+        el motor de cada tanque). Devuelve True si suena (en modo headless no hace nada y devuelve False).
+        """
+        if nombre not in self.sonidos:
+            return False
+        return self.voces.reproducir(nombre, self.sonidos[nombre], self.ticks, bucle, fuente)
+
+    def detener_sonido(self, nombre, fuente=None):
+        """Detiene las voces de un sonido (solo las de `fuente`, si se indica)."""
+        if nombre in self.sonidos:
+            self.voces.detener(nombre, fuente)
+
+    def con_detalle(self, x, y):
+        """True si en (x, y) se generan efectos visuales (activados y dentro de `zona_detalle`)."""
+        return self.con_efectos and (self.zona_detalle is None or self.zona_detalle.collidepoint(x, y))
+
+    def agregar_efecto(self, efecto):
+        """Añade un efecto visual si la simulación los tiene activados en su posición."""
+        if self.con_detalle(efecto.x, efecto.y):
+            self.efectos.append(efecto)
+
+    # ---- BUCLE DE SIMULACIÓN ----
+
+    def paso(self, entradas, dt=None):
+        """
+        Avanza la simulación un tick de `dt` segundos (por defecto 1 / `settings.FPS`).
+        `entradas` es una secuencia con una `EntradaTanque` por tanque (en el orden de `self.tanques`).
+        """
+        if dt is None:
+            dt = 1 / s.FPS
+        self.reloj.avanzar(dt)
+        self.ticks += 1
+        self.actualizar(entradas, dt)
+        self.actualizar_efectos()
+
+    def jugar(self, politica, max_ticks, dt=None):
+        """
+        Ejecuta la partida sin ventana hasta que termine o se alcance `max_ticks`.
+        `politica(simulacion)` devuelve las entradas de cada tick. Devuelve el ganador (o None).
+        """
+        while not self.terminada and self.ticks < max_ticks:
+            self.paso(politica(self), dt)
+        return self.ganador
+
+    def actualizar(self, entradas, dt):
+        """Actualiza la lógica de todos los objetos del juego en un tick."""
+        tiempo_actual = self.reloj.get_ticks()
+
+        # 1. Actualizar tanques (movimiento y disparo: las balas se activan en el pool)
+        for tanque, entrada in zip(self.tanques, entradas):
+            if tanque.vidas > 0 and tanque.mover(entrada, self.rejilla_obstaculos, self.rejilla_tanques, dt):
+                tanque.disparar()
+        self.perfilador.marcar('tanques')
+
+        # 2. Mover balas (cada una guarda su posición anterior)
+        for bala in self.balas:
+            bala.mover(dt)
+        self.perfilador.marcar('balas')
+
+        # 3. Verificar colisiones a lo largo del recorrido y eliminar balas caducadas
+        self.verificar_colisiones(tiempo_actual)
+
+        # Actualizar efectos de invulnerabilidad
+        self.actualizar_invulnerabilidad() # 4. Actualizar estado de invulnerabilidad
+
+        # 5. Verificar si la partida ha terminado: gana el último tanque en pie
+        vivos = [t for t in self.tanques if t.vidas > 0]
+        if len(vivos) <= 1:
+            self.terminada = True
+            self.ganador = vivos[0].nombre if vivos else "Empate"
+        self.perfilador.marcar('colisiones')
+
+    def actualizar_efectos(self):
+        """Actualiza todos los efectos visuales y elimina los que han terminado en una sola pasada."""
+        for efecto in self.efectos:
+            # Cada efecto tiene su propia lógica de actualización.
+            efecto.actualizar()
+        self.efectos = [efecto for efecto in self.efectos if not efecto.ha_terminado()]
+        # Las partículas se actualizan en lote.
+        self.particulas.actualizar()
+        self.perfilador.marcar('efectos')
+
+    def _tanque_en_recorrido(self, bala, p0, p1, zona):
+        """
+        Devuelve `(tanque, distancia²)` del primer tanque vulnerable que cruza la bala, o `(None, inf)`.
+        Solo se prueban los tanques de las celdas que cubre `zona` (el rectángulo del recorrido).
+        """
+        objetivos = [t for t in self.rejilla_tanques.cercanos(zona)
+                     # La bala no debe dañar a quien la disparó y el tanque no debe ser invulnerable.
+                     if t.vidas > 0 and t is not bala.tirador and not t.invulnerable]
+        return primer_impacto_segmento(objetivos, p0, p1, bala.radio)
+
+    def _impactar_tanque(self, bala, tanque_impactado):
+        """Aplica el impacto de una bala en un tanque."""
+        tanque_impactado.vidas -= 1
+        if tanque_impactado.vidas <= 0:
+            self.rejilla_tanques.eliminar(tanque_impactado)
+        if bala.tirador is not None:
+            bala.tirador.puntuacion += 10
+            bala.tirador.impactos += 1
+        tanque_impactado.invulnerable = True
+        tanque_impactado.tiempo_invulnerable = self.reloj.get_ticks()
+
+        self.crear_efecto_explosion(tanque_impactado.x + 15, tanque_impactado.y + 15)
+
+    def _impactar_obstaculo(self, obstaculo):
+        """Aplica el impacto de una bala en un obstáculo y avisa a los observadores si cambia."""
+        if obstaculo.destructible:
+            destruido = obstaculo.recibir_daño()
+            if destruido:
+                self.destruir_obstaculo(obstaculo)
+            for observador in self.observadores:
+                observador.obstaculo_modificado(obstaculo, destruido)
+
+    def fijar_salud_obstaculo(self, obstaculo, salud):
+        """
+        Pone la salud de un obstáculo a un valor dado (p. ej. recibido del servidor en una
+        partida en red), destruyéndolo si llega a 0, y avisa a los observadores.
+        """
+        if salud == obstaculo.salud:
+            return
+        obstaculo.salud = salud
+        destruido = salud <= 0
+        if destruido:
+            self.destruir_obstaculo(obstaculo)
+        for observador in self.observadores:
+            observador.obstaculo_modificado(obstaculo, destruido)
+
+    def verificar_colisiones(self, tiempo_actual):
+        """
+        Verifica y maneja las colisiones de las balas con los obstáculos y los tanques.
+        Se prueba el segmento recorrido en el último paso (no solo la posición final), así que
+        una bala no atraviesa un obstáculo ni un tanque aunque un frame tarde mucho.
+        Gana el impacto más cercano al punto de partida.
+        """
+        for bala in self.balas.recorrer_inverso():
+            p0, p1 = bala.recorrido()
+            # Obstáculos y tanques: solo se consultan las celdas que cubre el recorrido
+            zona = rect_segmento(p0, p1, bala.radio)
+            obstaculo, distancia_obstaculo = primer_impacto_segmento(self.rejilla_obstaculos.cercanos(zona),
+                                                                     p0, p1, bala.radio)
+            tanque, distancia_tanque = self._tanque_en_recorrido(bala, p0, p1, zona)
+
+            if tanque is not None and distancia_tanque <= distancia_obstaculo:
+                self._impactar_tanque(bala, tanque)
+                self.balas.eliminar(bala)
+            elif obstaculo is not None:
+                self._impactar_obstaculo(obstaculo)
+                self.balas.eliminar(bala)
+            elif bala.esta_fuera_del_mundo(*self.tamaño_mundo) or bala.tiempo_agotado(tiempo_actual):
+                # Eliminar balas que están fuera del mundo o que han existido demasiado tiempo
+                self.balas.eliminar(bala)
+
+    def destruir_obstaculo(self, obstaculo):
+        """
+        Quita un obstáculo del mapa y de la rejilla espacial, con efecto de destrucción.
+        Se intercambia con el último de la lista (swap-remove, como en `PoolBalas`): O(1) aunque
+        caigan muchos seguidos en los mapas densos.
+        """
+        i = self._indices_obstaculos.pop(obstaculo)
+        ultimo = self.obstaculos.pop()
+        if ultimo is not obstaculo:
+            self.obstaculos[i] = ultimo
+            self._indices_obstaculos[ultimo] = i
+        self.rejilla_obstaculos.eliminar(obstaculo)
+        self.crear_efecto_explosion(obstaculo.x + 20, obstaculo.y + 20)
+
+    def actualizar_invulnerabilidad(self):
+        """Actualiza el estado de invulnerabilidad de los tanques."""
+        tiempo_actual = self.reloj.get_ticks()
+        for tanque in self.tanques:
+            if tanque.invulnerable and tiempo_actual - tanque.tiempo_invulnerable > 2000:
+                tanque.invulnerable = False
+
+    def crear_efecto_explosion(self, x, y):
+        """Crea un efecto visual de explosión con partículas y ondas expansivas."""
+        # Reproducir sonido de explosión
+        self.reproducir_sonido('explosion')
+
+        if not self.con_detalle(x, y):
+            return
+
+        # Se calcula un "presupuesto" de efectos para no sobrecargar el motor y causar lag.
+        espacio_disponible = s.MAX_EFECTOS - len(self.efectos)
+        if espacio_disponible <= 0:
+            return
+
+        # Efecto principal de explosión
+        self.efectos.append(effects.Explosion(x, y))
+        # Onda expansiva
+        self.efectos.append(effects.Onda(x, y))
+        # Destello central
+        self.efectos.append(effects.Destello(x, y))
+
+        # Partículas de fuego y humo (sistema vectorizado, con su propia capacidad)
+        self.particulas.emitir_fuego(x, y, s.PARTICULAS_EXPLOSION)
+        self.particulas.emitir_humo(x, y, s.HUMO_EXPLOSION)
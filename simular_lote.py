@@ -0,0 +1,262 @@
+"""
+Simulación masiva de partidas para evaluar cambios de equilibrio.
+
+Reparte partidas con semilla (mapa y entradas reproducibles) entre un pool de procesos, sin
+ventana ni mixer, y agrega el porcentaje de victorias, la duración de las partidas y la
+precisión de disparo de cada tanque en un JSON de resultados.
+
+Los ajustes de equilibrio se pasan con `--ajuste` (se pueden repetir):
+    NUM_ROCAS=40                      constante de settings.py (se aplica antes de crear la simulación)
+    tanque.velocidad_disparo=300      atributo de cada tanque al empezar la partida
+    Arbusto.salud=3                   salud de todos los obstáculos de ese tipo
+
+Uso (desde la raíz del proyecto):
+    python simular_lote.py --partidas 10000
+    python simular_lote.py --partidas 20000 --politica circulos --ajuste tanque.velocidad_disparo=300
+    python simular_lote.py --partidas 2000 --politica bots
+    python simular_lote.py --partidas 500 --procesos 1 --salida resultados.json
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from simulacion import Simulacion, EntradaTanque
+from bot import ControladorBot, MapaNavegacion
+from vision import Vision
+import entidades
+import settings as s
+
+RESULTADOS_SIN_GANADOR = ("Empate", "Sin terminar")
+
+
+# ---- POLÍTICAS DE ENTRADA ----
+# Cada política se crea por partida con un `random.Random` y devuelve las entradas de cada tick.
+
+class PoliticaAleatoria:
+    """Cada tanque mantiene una combinación de teclas al azar durante 10-60 ticks."""
+    def __init__(self, rng):
+        self.rng = rng
+        self.entradas = []
+        self.restantes = []
+
+    def __call__(self, sim):
+        if len(self.entradas) != len(sim.tanques):
+            self.entradas = [EntradaTanque()] * len(sim.tanques)
+            self.restantes = [0] * len(sim.tanques)
+        for i in range(len(sim.tanques)):
+            self.restantes[i] -= 1
+            if self.restantes[i] <= 0:
+                self.entradas[i] = EntradaTanque(self.rng.random() < 0.8, self.rng.random() < 0.3,
+                                                 self.rng.random() < 0.3)
+                self.restantes[i] = self.rng.randint(10, 60)
+        return self.entradas
+
+
+class PoliticaCirculos:
+    """Todos los tanques avanzan girando, cada uno con un radio de giro distinto según la semilla."""
+    def __init__(self, rng):
+        self.rng = rng
+        self.periodos = None
+
+    def __call__(self, sim):
+        if self.periodos is None:
+            self.periodos = [self.rng.randint(2, 6) for _ in sim.tanques]
+        return [EntradaTanque(True, sim.ticks % periodo == 0, False) for periodo in self.periodos]
+
+
+class PoliticaBots:
+    """Todos los tanques los controla `bot.ControladorBot` (comparten el mapa de navegación de la simulación)."""
+    def __init__(self, rng):
+        self.bots = None
+
+    def __call__(self, sim):
+        if self.bots is None:
+            navegacion, vision = MapaNavegacion.de(sim), Vision.de(sim)
+            self.bots = [ControladorBot(sim, i, navegacion, vision) for i in range(len(sim.tanques))]
+        return [bot() for bot in self.bots]
+
+
+POLITICAS = {
+    "aleatoria": PoliticaAleatoria,
+    "circulos": PoliticaCirculos,
+    "bots": PoliticaBots,
+}
+
+
+# ---- AJUSTES DE EQUILIBRIO ----
+
+def leer_ajustes(textos):
+    """Convierte ["clave=valor", ...] en una lista de (objetivo, atributo, valor). Lanza ValueError si no es válido."""
+    ajustes = []
+    for texto in textos:
+        clave, separador, valor = texto.partition("=")
+        if not separador:
+            raise ValueError(f"Ajuste sin '=': {texto}")
+        try:
+            valor = json.loads(valor)
+        except json.JSONDecodeError:
+            pass  # Se queda como texto
+        objetivo, punto, atributo = clave.rpartition(".")
+        if not punto:
+            if not hasattr(s, clave):
+                raise ValueError(f"settings.py no tiene {clave}")
+            ajustes.append(("settings", clave, valor))
+        elif objetivo == "tanque":
+            ajustes.append(("tanque", atributo, valor))
+        elif isinstance(getattr(entidades, objetivo, None), type) and issubclass(getattr(entidades, objetivo), entidades.Obstaculo):
+            ajustes.append((objetivo, atributo, valor))
+        else:
+            raise ValueError(f"Objetivo de ajuste desconocido: {objetivo}")
+    return ajustes
+
+
+def _aplicar_ajustes_partida(sim, ajustes):
+    """Aplica los ajustes de tanques y obstáculos a la partida recién creada."""
+    for objetivo, atributo, valor in ajustes:
+        if objetivo == "tanque":
+            for tanque in sim.tanques:
+                setattr(tanque, atributo, valor)
+        elif objetivo != "settings":
+            clase = getattr(entidades, objetivo)
+            for obstaculo in sim.obstaculos:
+                if isinstance(obstaculo, clase):
+                    setattr(obstaculo, atributo, valor)
+                    if atributo == "salud":
+                        obstaculo.salud_max = valor
+
+
+# ---- TRABAJADORES ----
+# Cada proceso crea una sola Simulacion y la reutiliza para todas sus partidas.
+
+_simulacion = None
+_ajustes = []
+
+
+def _iniciar_trabajador(ajustes, num_tanques=2):
+    global _simulacion, _ajustes
+    _ajustes = ajustes
+    for objetivo, atributo, valor in ajustes:
+        if objetivo == "settings":
+            setattr(s, atributo, valor)
+    _simulacion = Simulacion(con_efectos=False, num_tanques=num_tanques)
+
+
+def jugar_partida(semilla, politica, max_ticks):
+    """Juega una partida completa con la semilla dada. Devuelve sus estadísticas."""
+    sim = _simulacion
+    sim.reiniciar(semilla)
+    _aplicar_ajustes_partida(sim, _ajustes)
+    ganador = sim.jugar(POLITICAS[politica](random.Random(semilla)), max_ticks)
+    return {
+        "semilla": semilla,
+        "resultado": ganador or "Sin terminar",
+        "ticks": sim.ticks,
+        "segundos": sim.reloj.get_ticks() / 1000,  # Tiempo simulado, sea cual sea el FPS de la partida
+        "disparos": [t.disparos for t in sim.tanques],
+        "impactos": [t.impactos for t in sim.tanques],
+    }
+
+
+def _jugar_bloque(semillas, politica, max_ticks):
+    return [jugar_partida(semilla, politica, max_ticks) for semilla in semillas]
+
+
+def ejecutar_lote(partidas, procesos, semilla, politica, max_ticks, ajustes, num_tanques=2):
+    """Reparte las partidas en bloques entre `procesos` procesos. Devuelve la lista de estadísticas."""
+    semillas = [semilla + i for i in range(partidas)]
+    if procesos <= 1:
+        _iniciar_trabajador(ajustes, num_tanques)
+        return _jugar_bloque(semillas, politica, max_ticks)
+    # Bloques medianos: poco coste de comunicación y reparto equilibrado al final.
+    tam_bloque = max(1, min(200, partidas // (procesos * 8)))
+    bloques = [semillas[i:i + tam_bloque] for i in range(0, partidas, tam_bloque)]
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=(ajustes, num_tanques)) as pool:
+        resultados = pool.map(_jugar_bloque, bloques, [politica] * len(bloques), [max_ticks] * len(bloques))
+        return [partida for bloque in resultados for partida in bloque]
+
+
+def agregar(partidas, nombres):
+    """
+    Resume las estadísticas: victorias (de cada tanque de `nombres`, empates y partidas sin
+    terminar), duración (ticks y segundos) y precisión por tanque.
+    """
+    total = len(partidas)
+    ticks = np.array([p["ticks"] for p in partidas])
+    disparos = np.sum([p["disparos"] for p in partidas], axis=0)
+    impactos = np.sum([p["impactos"] for p in partidas], axis=0)
+    return {
+        "partidas": total,
+        "victorias": {r: sum(p["resultado"] == r for p in partidas) / total for r in (*nombres, *RESULTADOS_SIN_GANADOR)},
+        "duracion_ticks": {
+            "media": float(ticks.mean()),
+            "p50": float(np.percentile(ticks, 50)),
+            "p95": float(np.percentile(ticks, 95)),
+        },
+        "duracion_media_s": float(np.mean([p["segundos"] for p in partidas])),
+        "precision": [float(i / d) if d else 0.0 for i, d in zip(impactos, disparos)],
+        "disparos_por_partida": [float(d / total) for d in disparos],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partidas", type=int, default=1000)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de la primera partida (las demás, consecutivas)")
+    parser.add_argument("--politica", choices=sorted(POLITICAS), default="aleatoria")
+    parser.add_argument("--max-ticks", type=int, help="Ticks máximos por partida (por defecto, 3 minutos de juego)")
+    parser.add_argument("--tanques", type=int, default=2, help="Tanques por partida (más de 2: todos contra todos)")
+    parser.add_argument("--ajuste", action="append", default=[], metavar="CLAVE=VALOR")
+    parser.add_argument("--salida", default="resultados_lote.json")
+    parser.add_argument("--detalle", action="store_true", help="Incluir en la salida las estadísticas de cada partida")
+    args = parser.parse_args()
+
+    try:
+        ajustes = leer_ajustes(args.ajuste)
+        if args.max_ticks is None:
+            fps = next((valor for objetivo, atributo, valor in ajustes if (objetivo, atributo) == ("settings", "FPS")), s.FPS)
+            args.max_ticks = 3 * 60 * fps
+        prueba = Simulacion(con_efectos=False, num_tanques=args.tanques)
+        nombres = [t.nombre for t in prueba.tanques]
+    except ValueError as e:
+        parser.error(str(e))
+    if prueba.obstaculos_sin_sitio:
+        print(f"Advertencia: faltan {prueba.obstaculos_sin_sitio} obstáculos en el primer mapa (no caben).")
+
+    inicio = time.perf_counter()
+    partidas = ejecutar_lote(args.partidas, args.procesos, args.semilla, args.politica, args.max_ticks, ajustes,
+                             args.tanques)
+    duracion = time.perf_counter() - inicio
+
+    resumen = agregar(partidas, nombres)
+    salida = {
+        "configuracion": {"partidas": args.partidas, "semilla": args.semilla, "politica": args.politica,
+                          "max_ticks": args.max_ticks, "tanques": args.tanques, "ajustes": args.ajuste},
+        "resumen": resumen,
+        "rendimiento": {"segundos": round(duracion, 2), "procesos": args.procesos,
+                        "partidas_por_segundo": round(args.partidas / duracion, 1),
+                        "ticks_por_segundo": round(sum(p["ticks"] for p in partidas) / duracion)},
+    }
+    if args.detalle:
+        salida["partidas"] = partidas
+    with open(args.salida, "w") as archivo:
+        json.dump(salida, archivo, indent=2, ensure_ascii=False)
+
+    victorias = " | ".join(f"{r}: {v:.1%}" for r, v in resumen["victorias"].items())
+    print(f"{args.partidas} partidas en {duracion:.1f} s ({salida['rendimiento']['partidas_por_segundo']} partidas/s "
+          f"con {args.procesos} procesos)")
+    print(victorias)
+    print(f"Duración media: {resumen['duracion_media_s']:.1f} s | "
+          f"precisión: {', '.join(f'{p:.1%}' for p in resumen['precision'])}")
+    print(f"Resultados guardados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import math
+import pygame
+import settings as s
+
+
+class AtlasEfectos:
+    """
+    Caché de sprites para los efectos visuales de `effects.py`.
+    Cada sprite se dibuja una sola vez con opacidad completa. Para dibujarlo con otra opacidad se
+    usa una copia con el alpha ya multiplicado en sus píxeles (`con_alfa`, redondeado a
+    `NIVELES_ALFA` niveles): SDL mezcla mucho más rápido un sprite con alpha por píxel que uno
+    que además tiene alpha de superficie, y las copias se crean solo la primera vez.
+    """
+    # Formas disponibles
+    CIRCULO = 'circulo'      # Círculo relleno (Destello, Particula, Humo, Rastro)
+    ANILLO = 'anillo'        # Circunferencia de 2 px (Onda)
+    EXPLOSION = 'explosion'  # Círculo de color con núcleo brillante a media opacidad (Explosion)
+    # Opacidades distintas de las copias para dibujar en lote (`con_alfa`)
+    NIVELES_ALFA = 32
+
+    def __init__(self):
+        self._sprites = {}  # (forma, color, radio) -> Surface
+        self._con_alfa = {}  # (forma, color, radio, nivel) -> copia con la opacidad del nivel en sus píxeles
+        self.creados_al_vuelo = 0  # Sprites que no estaban precargados (debería quedarse en 0)
+
+    def precargar(self):
+        """
+        Pre-dibuja todas las combinaciones de forma, color y radio que pueden alcanzar los efectos.
+        Debe llamarse después de crear la ventana para convertir los sprites al formato de la pantalla.
+        """
+        combinaciones = []
+        combinaciones += [(self.EXPLOSION, s.AMARILLO_FUEGO, r) for r in range(1, 26)]
+        combinaciones += [(self.ANILLO, s.BLANCO_BRILLANTE, r) for r in range(1, 41)]
+        combinaciones += [(self.CIRCULO, s.BLANCO_BRILLANTE, r) for r in range(1, 13)]
+        combinaciones += [(self.CIRCULO, color, r)
+                          for color in (s.AMARILLO_FUEGO, s.NARANJA_FUEGO, s.ROJO_FUEGO)
+                          for r in range(2, 5)]
+        combinaciones += [(self.CIRCULO, s.GRIS, r) for r in range(3, 10)]
+        combinaciones += [(self.CIRCULO, color, 3) for color in (s.AZUL, s.ROJO)]
+        # Al cambiar de ventana se vuelven a convertir todos los sprites.
+        self._sprites.clear()
+        self._con_alfa.clear()
+        for forma, color, radio in combinaciones:
+            self._sprites[(forma, color, radio)] = self._crear(forma, color, radio)
+
+    def _crear(self, forma, color, radio):
+        """Dibuja un sprite con opacidad completa."""
+        surf = pygame.Surface((radio * 2, radio * 2), pygame.SRCALPHA)
+        centro = (radio, radio)
+        if forma == self.ANILLO:
+            pygame.draw.circle(surf, (*color, 255), centro, radio, 2)
+        else:
+            pygame.draw.circle(surf, (*color, 255), centro, radio)
+            if forma == self.EXPLOSION:
+                pygame.draw.circle(surf, (*s.BLANCO_BRILLANTE, 127), centro, max(1, radio - 2))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        return surf
+
+    def obtener(self, forma, color, radio):
+        """Devuelve el sprite de la combinación pedida, creándolo si no estaba precargado."""
+        clave = (forma, tuple(color[:3]), radio)
+        sprite = self._sprites.get(clave)
+        if sprite is None:
+            sprite = self._sprites[clave] = self._crear(forma, clave[1], radio)
+            self.creados_al_vuelo += 1
+        return sprite
+
+    def con_alfa(self, forma, color, radio, nivel):
+        """
+        Copia del sprite con la opacidad del `nivel` (0..NIVELES_ALFA-1) multiplicada en el alpha
+        de sus píxeles, para dibujarlo (también en lote con `Surface.blits`) sin alpha de superficie.
+        Se crea la primera vez.
+        """
+        clave = (forma, tuple(color[:3]), radio, nivel)
+        sprite = self._con_alfa.get(clave)
+        if sprite is None:
+            sprite = self.obtener(forma, color, radio).copy()
+            alpha = nivel * 255 // (self.NIVELES_ALFA - 1)
+            if alpha < 255:
+                sprite.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            self._con_alfa[clave] = sprite
+        return sprite
+
+    def dibujar(self, pantalla, forma, color, radio, alpha, x, y):
+        """Dibuja el sprite centrado en (x, y) con la opacidad indicada. Devuelve el Rect afectado (o None)."""
+        nivel = (alpha * (self.NIVELES_ALFA - 1) + 127) // 255
+        if radio <= 0 or nivel <= 0:
+            return None
+        sprite = self.con_alfa(forma, color, radio, nivel)
+        return pantalla.blit(sprite, (int(x) - radio, int(y) - radio))
+
+
+# Atlas compartido por todos los efectos.
+atlas_efectos = AtlasEfectos()
+
+
+class CacheTextos:
+    """
+    Caché de textos renderizados, con clave (fuente, texto, color).
+    `Font.render` solo se llama la primera vez que aparece una combinación; los valores
+    que cambian (puntuaciones, volumen) se renderizan de nuevo únicamente cuando cambian.
+    Se descartan las entradas más antiguas al superar `max_entradas`.
+    """
+    def __init__(self, max_entradas=256):
+        self.max_entradas = max_entradas
+        self._textos = {}  # (fuente, texto, color) -> Surface (en orden de uso)
+        self.renderizados = 0  # Llamadas reales a Font.render (útil para perfilar)
+
+    def render(self, fuente, texto, color):
+        """Devuelve la superficie del texto, renderizándola solo si no está en la caché."""
+        clave = (fuente, texto, color)
+        superficie = self._textos.pop(clave, None)
+        if superficie is None:
+            superficie = fuente.render(texto, True, color)
+            if pygame.display.get_surface() is not None:
+                superficie = superficie.convert_alpha()
+            self.renderizados += 1
+            if len(self._textos) >= self.max_entradas:
+                # El primer elemento del diccionario es el usado hace más tiempo.
+                del self._textos[next(iter(self._textos))]
+        self._textos[clave] = superficie
+        return superficie
+
+
+class CacheSpritesTanque:
+    """
+    Caché de tanques pre-dibujados (cuerpo, cañón e indicadores de vida), con clave
+    (color, tamaño, paso de ángulo, vidas, invulnerable). El ángulo del cañón se redondea a
+    `pasos_angulo` direcciones por vuelta, así que dibujar un tanque es un solo blit.
+    Los sprites se crean la primera vez que se piden y se descartan los más antiguos al superar
+    `max_entradas`. La variante invulnerable es translúcida.
+    """
+    LARGO_CAÑON = 20
+    GROSOR_CAÑON = 5
+    ALTO_VIDAS = 14  # Espacio sobre el cuerpo para los indicadores de vida
+    ALFA_INVULNERABLE = 150
+
+    def __init__(self, pasos_angulo=s.PASOS_ANGULO_TANQUE, max_entradas=s.MAX_SPRITES_TANQUE):
+        self.pasos_angulo = pasos_angulo
+        self.max_entradas = max_entradas
+        self._sprites = {}  # clave -> (Surface, (margen_x, margen_y)) (en orden de uso)
+        self.creados = 0  # Sprites dibujados de verdad (útil para perfilar)
+
+    def _crear(self, color, ancho, alto, paso, vidas, invulnerable):
+        """Dibuja el tanque sobre una superficie transparente. Devuelve (sprite, margen del cuerpo)."""
+        # Margen alrededor del cuerpo para que quepa el cañón en cualquier dirección.
+        margen = max(0, self.LARGO_CAÑON + self.GROSOR_CAÑON // 2 + 1 - min(ancho, alto) // 2)
+        arriba = max(margen, self.ALTO_VIDAS)
+        surf = pygame.Surface((max(ancho + 2 * margen, margen + 10 + vidas * 8), alto + margen + arriba),
+                              pygame.SRCALPHA)
+        # Cuerpo del tanque
+        pygame.draw.rect(surf, color, (margen, arriba, ancho, alto))
+        pygame.draw.rect(surf, s.BLANCO, (margen + 2, arriba + 2, ancho - 4, alto - 4), 2)
+        # Cañón, en la dirección del paso de ángulo.
+        angulo = paso * math.tau / self.pasos_angulo
+        centro = (margen + ancho // 2, arriba + alto // 2)
+        pygame.draw.line(surf, color, centro, (centro[0] + math.cos(angulo) * self.LARGO_CAÑON,
+                                               centro[1] + math.sin(angulo) * self.LARGO_CAÑON),
+                         self.GROSOR_CAÑON)
+        # Indicadores de vida sobre el tanque.
+        for i in range(vidas):
+            pygame.draw.circle(surf, s.ROJO, (margen + 5 + i * 8, arriba - 10), 4)
+            pygame.draw.circle(surf, s.BLANCO, (margen + 5 + i * 8, arriba - 10), 4, 1)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        if invulnerable:
+            surf.set_alpha(self.ALFA_INVULNERABLE)
+        return surf, (margen, arriba)
+
+    def obtener(self, color, ancho, alto, angulo, vidas, invulnerable=False):
+        """Devuelve (sprite, (margen_x, margen_y)): el cuerpo empieza en el sprite en ese margen."""
+        paso = round(angulo * self.pasos_angulo / math.tau) % self.pasos_angulo
+        clave = (tuple(color[:3]), ancho, alto, paso, vidas, invulnerable)
+        entrada = self._sprites.pop(clave, None)
+        if entrada is None:
+            entrada = self._crear(*clave)
+            self.creados += 1
+            if len(self._sprites) >= self.max_entradas:
+                # El primer elemento del diccionario es el usado hace más tiempo.
+                del self._sprites[next(iter(self._sprites))]
+        self._sprites[clave] = entrada
+        return entrada
+
+
+class CacheSpritesBala:
+    """
+    Caché de balas pre-dibujadas (estela y núcleo), con clave (color, radio, paso de dirección).
+    La dirección se redondea a `pasos_angulo` por vuelta; dibujar una bala es un solo blit sin
+    crear superficies. Los sprites se crean la primera vez que se piden y se descartan los más
+    antiguos al superar `max_entradas`.
+    """
+    NUM_ESTELAS = 4
+    SEPARACION_ESTELA = 3  # px entre círculos de la estela
+    ALFA_ESTELA = 150  # Opacidad del primer círculo (los siguientes se desvanecen)
+
+    def __init__(self, pasos_angulo=s.PASOS_ANGULO_BALA, max_entradas=s.MAX_SPRITES_BALA):
+        self.pasos_angulo = pasos_angulo
+        self.max_entradas = max_entradas
+        self._sprites = {}  # clave -> (Surface, centro) (en orden de uso)
+        self.creados = 0  # Sprites dibujados de verdad (útil para perfilar)
+
+    def _crear(self, color, radio, paso):
+        """Dibuja la bala centrada en el sprite. Devuelve (sprite, distancia del borde al centro)."""
+        centro = (self.NUM_ESTELAS - 1) * self.SEPARACION_ESTELA + radio + 1
+        surf = pygame.Surface((centro * 2, centro * 2), pygame.SRCALPHA)
+        # Transparente pero del color de la bala: al mezclar la estela solo se acumula su alpha.
+        surf.fill((*color, 0))
+        angulo = paso * math.tau / self.pasos_angulo
+        for i in range(self.NUM_ESTELAS):
+            distancia = i * self.SEPARACION_ESTELA
+            radio_estela = max(1, radio - i)
+            circulo = pygame.Surface((radio_estela * 2, radio_estela * 2), pygame.SRCALPHA)
+            alpha = int(self.ALFA_ESTELA * (1 - i / self.NUM_ESTELAS))
+            pygame.draw.circle(circulo, (*color, alpha), (radio_estela, radio_estela), radio_estela)
+            surf.blit(circulo, (round(centro - math.cos(angulo) * distancia) - radio_estela,
+                                round(centro - math.sin(angulo) * distancia) - radio_estela))
+        # Núcleo brillante
+        pygame.draw.circle(surf, color, (centro, centro), radio)
+        pygame.draw.circle(surf, s.BLANCO_BRILLANTE, (centro, centro), radio - 1)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        return surf, centro
+
+    def obtener(self, color, radio, angulo):
+        """Devuelve (sprite, centro): la bala está en (centro, centro) dentro del sprite."""
+        clave = (color, radio, round(angulo * self.pasos_angulo / math.tau) % self.pasos_angulo)
+        entrada = self._sprites.pop(clave, None)
+        if entrada is None:
+            entrada = self._crear(*clave)
+            self.creados += 1
+            if len(self._sprites) >= self.max_entradas:
+                # El primer elemento del diccionario es el usado hace más tiempo.
+                del self._sprites[next(iter(self._sprites))]
+        self._sprites[clave] = entrada
+        return entrada
+
+
+def crear_overlay(tamaño, color):
+    """Crea una vez una superficie translúcida de un color (p. ej. el oscurecido de pausa)."""
+    overlay = pygame.Surface(tamaño, pygame.SRCALPHA)
+    overlay.fill(color)
+    if pygame.display.get_surface() is not None:
+        overlay = overlay.convert_alpha()
+    return overlay
@@ -0,0 +1,270 @@
+"""
+Líneas de vista y raycasts sobre los obstáculos de una `Simulacion`.
+
+`Vision` recorre con DDA (Amanatides-Woo) las celdas de una rejilla uniforme que cruza cada
+rayo y solo prueba los obstáculos registrados en ellas, celda a celda, hasta el primer impacto.
+Cada consulta puede tratar los obstáculos destructibles como transparentes (p. ej. para
+decidir si merece la pena abrirse paso a tiros) y ensanchar los obstáculos `radio` píxeles
+(el radio de una bala). Las consultas por lotes avanzan todos los rayos a la vez con NumPy.
+
+Es un observador de la simulación: se reconstruye con cada mapa y, cuando un obstáculo se
+destruye en `verificar_colisiones`, lo quita de sus celdas.
+"""
+import math
+import numpy as np
+import settings as s
+
+
+class Vision:
+    """Servicio de consultas de visibilidad sobre el mapa de una `Simulacion`."""
+    def __init__(self, simulacion, tam_celda=None, radio_max=8):
+        """`radio_max`: mayor `radio` admitido en las consultas (los obstáculos se registran ensanchados así)."""
+        self.tam_celda = s.TAM_CELDA_REJILLA if tam_celda is None else tam_celda
+        self.radio_max = radio_max
+        simulacion.agregar_observador(self)
+
+    @classmethod
+    def de(cls, simulacion):
+        """Devuelve el servicio registrado en la simulación, creándolo si no existe."""
+        for observador in simulacion.observadores:
+            if isinstance(observador, cls):
+                return observador
+        return cls(simulacion)
+
+    # ---- OBSERVADOR DE LA SIMULACIÓN ----
+
+    def mapa_creado(self, simulacion):
+        """Registra los obstáculos del mapa en las celdas que tocan (ensanchados `radio_max`)."""
+        t = self.tam_celda
+        ancho, alto = simulacion.tamaño_mundo
+        self.columnas = max(1, math.ceil(ancho / t))
+        self.filas = max(1, math.ceil(alto / t))
+        self.obstaculos = list(simulacion.obstaculos)
+        self._indices = {obstaculo: i for i, obstaculo in enumerate(self.obstaculos)}
+        # Cajas cerradas [izquierda, arriba, derecha, abajo] con la misma semántica que `Rect.clipline`.
+        self.cajas = np.array([(o.rect.left, o.rect.top, o.rect.right - 1, o.rect.bottom - 1)
+                               for o in self.obstaculos], dtype=np.float64).reshape(-1, 4)
+        self._cajas = [tuple(caja) for caja in self.cajas.tolist()]
+        self.destructible = np.array([o.destructible for o in self.obstaculos], dtype=bool)
+        self._destructible = self.destructible.tolist()
+        self.activo = np.ones(len(self.obstaculos), dtype=bool)
+
+        self.celdas = [[] for _ in range(self.filas * self.columnas)]  # celda -> índices de obstáculo
+        self._celdas_de = []
+        r = self.radio_max
+        for i, (izquierda, arriba, derecha, abajo) in enumerate(self._cajas):
+            claves = [fila * self.columnas + col
+                      for fila in range(max(0, int((arriba - r) // t)), min(self.filas, int((abajo + r) // t) + 1))
+                      for col in range(max(0, int((izquierda - r) // t)), min(self.columnas, int((derecha + r) // t) + 1))]
+            for clave in claves:
+                self.celdas[clave].append(i)
+            self._celdas_de.append(claves)
+        # Copia en una tabla (celda, k) -> índice (-1 = vacío) para los lotes
+        capacidad = max(1, max(map(len, self.celdas), default=1))
+        self.tabla = np.full((self.filas * self.columnas, capacidad), -1, dtype=np.int32)
+        for clave, indices in enumerate(self.celdas):
+            self.tabla[clave, :len(indices)] = indices
+
+    def obstaculo_modificado(self, obstaculo, destruido):
+        """Un obstáculo destruido deja de tapar: se quita de sus celdas (y se desactiva para los lotes)."""
+        if not destruido:
+            return
+        i = self._indices.pop(obstaculo, None)
+        if i is None:
+            return
+        self.activo[i] = False
+        for clave in self._celdas_de[i]:
+            self.celdas[clave].remove(i)
+
+    # ---- CONSULTAS INDIVIDUALES ----
+
+    def raycast(self, p0, p1, radio=0, atravesar_destructibles=False):
+        """
+        Devuelve `(obstaculo, punto)` del primer obstáculo (ensanchado `radio`) que corta el
+        segmento p0-p1, o `(None, None)` si no hay ninguno.
+        """
+        x0, y0 = p0
+        dx, dy = p1[0] - x0, p1[1] - y0
+        indice, t = self._raycast(x0, y0, dx, dy, radio, atravesar_destructibles)
+        if indice < 0:
+            return None, None
+        return self.obstaculos[indice], (x0 + dx * t, y0 + dy * t)
+
+    def a_la_vista(self, p0, p1, radio=0, atravesar_destructibles=False):
+        """True si ningún obstáculo corta el segmento p0-p1."""
+        return self._raycast(p0[0], p0[1], p1[0] - p0[0], p1[1] - p0[1], radio, atravesar_destructibles)[0] < 0
+
+    def _raycast(self, x0, y0, dx, dy, radio, atravesar_destructibles):
+        """DDA sobre la rejilla. Devuelve (índice del obstáculo o -1, fracción del segmento)."""
+        if radio > self.radio_max:
+            raise ValueError(f"radio {radio} mayor que radio_max {self.radio_max}")
+        t = self.tam_celda
+        tramo = _recortar(x0, y0, dx, dy, 0, 0, self.columnas * t, self.filas * t)
+        if tramo is None:
+            return -1, math.inf
+        t_inicio, t_fin = tramo
+        col = min(self.columnas - 1, max(0, int((x0 + dx * t_inicio) // t)))
+        fila = min(self.filas - 1, max(0, int((y0 + dy * t_inicio) // t)))
+        if dx > 0:
+            paso_x, t_max_x, t_delta_x = 1, ((col + 1) * t - x0) / dx, t / dx
+        elif dx < 0:
+            paso_x, t_max_x, t_delta_x = -1, (col * t - x0) / dx, -t / dx
+        else:
+            paso_x, t_max_x, t_delta_x = 0, math.inf, math.inf
+        if dy > 0:
+            paso_y, t_max_y, t_delta_y = 1, ((fila + 1) * t - y0) / dy, t / dy
+        elif dy < 0:
+            paso_y, t_max_y, t_delta_y = -1, (fila * t - y0) / dy, -t / dy
+        else:
+            paso_y, t_max_y, t_delta_y = 0, math.inf, math.inf
+
+        cajas, destructible, celdas, columnas = self._cajas, self._destructible, self.celdas, self.columnas
+        while True:
+            t_salida = min(t_max_x, t_max_y)
+            mejor, mejor_t = -1, math.inf
+            for i in celdas[fila * columnas + col]:
+                if atravesar_destructibles and destructible[i]:
+                    continue
+                izquierda, arriba, derecha, abajo = cajas[i]
+                corte = _corte(x0, y0, dx, dy, izquierda - radio, arriba - radio, derecha + radio, abajo + radio)
+                if corte < mejor_t:
+                    mejor, mejor_t = i, corte
+            # Un impacto más allá de esta celda se confirma en la celda donde ocurre (puede haber otro antes).
+            if mejor >= 0 and mejor_t <= t_salida:
+                return mejor, mejor_t
+            if t_salida >= t_fin:
+                return -1, math.inf
+            if t_max_x < t_max_y:
+                col += paso_x
+                t_max_x += t_delta_x
+            else:
+                fila += paso_y
+                t_max_y += t_delta_y
+            if not (0 <= col < columnas and 0 <= fila < self.filas):
+                return -1, math.inf
+
+    # ---- CONSULTAS POR LOTES ----
+
+    def raycast_lote(self, origenes, destinos, radio=0, atravesar_destructibles=False):
+        """
+        Raycast de muchos segmentos a la vez. `origenes` y `destinos` son arrays (N, 2).
+        Devuelve `(indices, fracciones)`: índice en `self.obstaculos` del primer obstáculo que corta
+        cada segmento (-1 si ninguno) y fracción del segmento donde lo corta (inf si ninguno).
+        """
+        if radio > self.radio_max:
+            raise ValueError(f"radio {radio} mayor que radio_max {self.radio_max}")
+        origenes = np.asarray(origenes, dtype=np.float64).reshape(-1, 2)
+        destinos = np.asarray(destinos, dtype=np.float64).reshape(-1, 2)
+        n = len(origenes)
+        indices = np.full(n, -1, dtype=np.int32)
+        fracciones = np.full(n, np.inf)
+        if n == 0 or not len(self.obstaculos):
+            return indices, fracciones
+
+        t = self.tam_celda
+        x0, y0 = origenes[:, 0], origenes[:, 1]
+        dx, dy = destinos[:, 0] - x0, destinos[:, 1] - y0
+        t_inicio, t_fin = _recortar_lote(x0, y0, dx, dy, 0, 0, self.columnas * t, self.filas * t)
+        vivos = np.flatnonzero(t_inicio <= t_fin)
+        x0, y0, dx, dy = x0[vivos], y0[vivos], dx[vivos], dy[vivos]
+        t_fin = t_fin[vivos]
+        col = np.clip(((x0 + dx * t_inicio[vivos]) // t).astype(np.int64), 0, self.columnas - 1)
+        fila = np.clip(((y0 + dy * t_inicio[vivos]) // t).astype(np.int64), 0, self.filas - 1)
+        paso_x, paso_y = np.sign(dx).astype(np.int64), np.sign(dy).astype(np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_delta_x = np.where(dx != 0, t / np.abs(dx), np.inf)
+            t_delta_y = np.where(dy != 0, t / np.abs(dy), np.inf)
+            t_max_x = np.where(dx != 0, ((col + (dx > 0)) * t - x0) / dx, np.inf)
+            t_max_y = np.where(dy != 0, ((fila + (dy > 0)) * t - y0) / dy, np.inf)
+
+        opacos = self.activo & ~self.destructible if atravesar_destructibles else self.activo
+        cajas = self.cajas + np.array([-radio, -radio, radio, radio])
+        while len(vivos):
+            candidatos = self.tabla[fila * self.columnas + col]  # (n, capacidad)
+            validos = candidatos >= 0
+            validos[validos] = opacos[candidatos[validos]]
+            caja = cajas[candidatos]  # (n, capacidad, 4); las celdas vacías se descartan con `validos`
+            corte = _corte_lote(x0[:, None], y0[:, None], dx[:, None], dy[:, None],
+                                caja[..., 0], caja[..., 1], caja[..., 2], caja[..., 3])
+            corte[~validos] = np.inf
+            k = np.argmin(corte, axis=1)
+            mejor_t = corte[np.arange(len(vivos)), k]
+            t_salida = np.minimum(t_max_x, t_max_y)
+
+            impacto = mejor_t <= t_salida
+            indices[vivos[impacto]] = candidatos[impacto, k[impacto]]
+            fracciones[vivos[impacto]] = mejor_t[impacto]
+
+            en_x = t_max_x < t_max_y
+            col = col + np.where(en_x, paso_x, 0)
+            fila = fila + np.where(en_x, 0, paso_y)
+            t_max_x = np.where(en_x, t_max_x + t_delta_x, t_max_x)
+            t_max_y = np.where(en_x, t_max_y, t_max_y + t_delta_y)
+            sigue = (~impacto & (t_salida < t_fin) & (col >= 0) & (col < self.columnas)
+                     & (fila >= 0) & (fila < self.filas))
+            vivos, x0, y0, dx, dy, t_fin = vivos[sigue], x0[sigue], y0[sigue], dx[sigue], dy[sigue], t_fin[sigue]
+            col, fila, paso_x, paso_y = col[sigue], fila[sigue], paso_x[sigue], paso_y[sigue]
+            t_max_x, t_max_y, t_delta_x, t_delta_y = t_max_x[sigue], t_max_y[sigue], t_delta_x[sigue], t_delta_y[sigue]
+        return indices, fracciones
+
+    def a_la_vista_lote(self, origenes, destinos, radio=0, atravesar_destructibles=False):
+        """Array de bool: True donde ningún obstáculo corta el segmento."""
+        return self.raycast_lote(origenes, destinos, radio, atravesar_destructibles)[0] < 0
+
+
+# ---- INTERSECCIÓN SEGMENTO-CAJA (método de las franjas) ----
+# El segmento es p0 + t·(dx, dy) con t en [0, 1]; devuelven la t de entrada en la caja o inf.
+
+def _corte(x0, y0, dx, dy, izquierda, arriba, derecha, abajo):
+    if dx:
+        a, b = (izquierda - x0) / dx, (derecha - x0) / dx
+        entrada, salida = min(a, b), max(a, b)
+    elif izquierda <= x0 <= derecha:
+        entrada, salida = -math.inf, math.inf
+    else:
+        return math.inf
+    if dy:
+        a, b = (arriba - y0) / dy, (abajo - y0) / dy
+        entrada, salida = max(entrada, min(a, b)), min(salida, max(a, b))
+    elif not arriba <= y0 <= abajo:
+        return math.inf
+    entrada = max(entrada, 0.0)
+    return entrada if entrada <= min(salida, 1.0) else math.inf
+
+
+def _recortar(x0, y0, dx, dy, izquierda, arriba, derecha, abajo):
+    """Tramo (t_inicio, t_fin) del segmento dentro de la caja, o None."""
+    entrada = _corte(x0, y0, dx, dy, izquierda, arriba, derecha, abajo)
+    if entrada == math.inf:
+        return None
+    # La salida es la entrada del segmento recorrido al revés.
+    salida = 1.0 - _corte(x0 + dx, y0 + dy, -dx, -dy, izquierda, arriba, derecha, abajo)
+    return entrada, salida
+
+
+def _franja_lote(p0, d, minimo, maximo):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a, b = (minimo - p0) / d, (maximo - p0) / d
+    dentro = (minimo <= p0) & (p0 <= maximo)
+    quieto = d == 0
+    entrada = np.where(quieto, np.where(dentro, -np.inf, np.inf), np.minimum(a, b))
+    salida = np.where(quieto, np.where(dentro, np.inf, -np.inf), np.maximum(a, b))
+    return entrada, salida
+
+
+def _tramo_lote(x0, y0, dx, dy, izquierda, arriba, derecha, abajo):
+    entrada_x, salida_x = _franja_lote(x0, dx, izquierda, derecha)
+    entrada_y, salida_y = _franja_lote(y0, dy, arriba, abajo)
+    entrada = np.maximum(np.maximum(entrada_x, entrada_y), 0.0)
+    salida = np.minimum(np.minimum(salida_x, salida_y), 1.0)
+    return entrada, salida
+
+
+def _corte_lote(x0, y0, dx, dy, izquierda, arriba, derecha, abajo):
+    entrada, salida = _tramo_lote(x0, y0, dx, dy, izquierda, arriba, derecha, abajo)
+    return np.where(entrada <= salida, entrada, np.inf)
+
+
+def _recortar_lote(x0, y0, dx, dy, izquierda, arriba, derecha, abajo):
+    """(t_inicio, t_fin) de cada segmento dentro de la caja; t_inicio > t_fin si no la toca."""
+    return _tramo_lote(x0, y0, dx, dy, izquierda, arriba, derecha, abajo)
@@ -0,0 +1,109 @@
+import pygame
+import settings as s
+
+
+class MezcladorVoces:
+    """
+    Reparte los sonidos entre un número fijo de canales del mixer (`CANALES_AUDIO`).
+    - Cada sonido tiene un máximo de voces a la vez (`VOCES_MAX`): si se supera, la voz más
+      antigua de ese sonido vuelve a empezar con el nuevo disparo en lugar de abrir otra.
+      Los sonidos en bucle (el motor de cada tanque) no se quitan la voz entre sí: sobre el
+      límite se descartan y su fuente vuelve a pedirla más tarde.
+    - Sin canales libres se roba el de la voz menos prioritaria (`PRIORIDAD_SONIDOS`) y, a
+      igual prioridad, la más antigua; si todas son más prioritarias, el sonido se descarta
+      (un sonido en bucle solo roba a voces estrictamente menos prioritarias).
+    - Si se roba una voz con `fuente`, se avisa con `fuente.voz_robada(nombre)`.
+    - Varios avisos del mismo sonido en un mismo tick suenan una sola vez.
+    Los canales se piden al mixer en el primer sonido, así que sin audio (modo headless o
+    mientras el mixer se carga) no toca pygame.mixer.
+    """
+    def __init__(self, canales=s.CANALES_AUDIO, voces_max=s.VOCES_MAX, prioridades=s.PRIORIDAD_SONIDOS):
+        self.num_canales = canales
+        self.voces_max = voces_max
+        self.prioridades = prioridades
+        self.canales = None  # Se crean al primer sonido
+        self.voces = [None] * canales  # Por canal: (nombre, prioridad, orden, fuente) del último sonido
+        self._orden = 0  # Contador creciente: cuanto menor, más antigua la voz
+        self._ultimo_tick = {}  # nombre -> tick del último disparo (para fusionar repeticiones)
+        # Estadísticas
+        self.reproducidos = 0
+        self.fusionados = 0
+        self.robados = 0
+        self.descartados = 0
+
+    def _preparar_canales(self):
+        pygame.mixer.set_num_channels(self.num_canales)
+        self.canales = [pygame.mixer.Channel(i) for i in range(self.num_canales)]
+
+    def _activas(self):
+        """Índices de los canales que siguen sonando (los demás quedan libres)."""
+        activas = []
+        for i, canal in enumerate(self.canales):
+            if self.voces[i] is not None:
+                if canal.get_busy():
+                    activas.append(i)
+                else:
+                    self.voces[i] = None
+        return activas
+
+    def reproducir(self, nombre, sonido, tick, bucle=False, fuente=None):
+        """Reproduce `sonido` como voz de `nombre` en el tick `tick`. Devuelve False si se descarta o fusiona."""
+        if not bucle:
+            if self._ultimo_tick.get(nombre) == tick:
+                self.fusionados += 1
+                return False
+            self._ultimo_tick[nombre] = tick
+        if self.canales is None:
+            self._preparar_canales()
+
+        prioridad = self.prioridades.get(nombre, 0)
+        activas = self._activas()
+        mismas = [i for i in activas if self.voces[i][0] == nombre]
+        if len(mismas) >= self.voces_max.get(nombre, self.num_canales):
+            if bucle:
+                # Otro bucle igual (p. ej. el motor de otro tanque) no se corta: este espera hueco.
+                self.descartados += 1
+                return False
+            # Límite del sonido alcanzado: se reutiliza su voz más antigua.
+            canal = min(mismas, key=lambda i: self.voces[i][2])
+            self.robados += 1
+        elif len(activas) < self.num_canales:
+            canal = self.voces.index(None)
+        else:
+            # Sin canales libres: la voz menos prioritaria y más antigua, si no es más prioritaria que esta.
+            canal = min(activas, key=lambda i: (self.voces[i][1], self.voces[i][2]))
+            if self.voces[canal][1] > prioridad or (bucle and self.voces[canal][1] == prioridad):
+                self.descartados += 1
+                return False
+            self.robados += 1
+
+        anterior = self.voces[canal]
+        self._orden += 1
+        self.voces[canal] = (nombre, prioridad, self._orden, fuente)
+        self.canales[canal].play(sonido, -1 if bucle else 0)
+        self.reproducidos += 1
+        if anterior is not None and anterior[3] is not None:
+            anterior[3].voz_robada(anterior[0])
+        return True
+
+    def reiniciar(self):
+        """
+        Nueva partida: olvida los ticks de los últimos disparos (la simulación vuelve a contar
+        desde 0) y corta las voces ligadas a una fuente (el motor de los tanques anteriores).
+        """
+        self._ultimo_tick.clear()
+        if self.canales is None or not pygame.mixer.get_init():
+            return
+        for i, voz in enumerate(self.voces):
+            if voz is not None and voz[3] is not None:
+                self.canales[i].stop()
+                self.voces[i] = None
+
+    def detener(self, nombre, fuente=None):
+        """Detiene las voces de `nombre` (solo las de `fuente`, si se indica)."""
+        if self.canales is None or not pygame.mixer.get_init():
+            return
+        for i, voz in enumerate(self.voces):
+            if voz is not None and voz[0] == nombre and (fuente is None or voz[3] is fuente):
+                self.canales[i].stop()
+                self.voces[i] = None